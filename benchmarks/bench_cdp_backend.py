@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+瀏覽器後端效能比較
+在本機測試頁面上比較 Selenium (chromedriver) 與直接 CDP 連線的
+啟動時間、單一指令延遲、載入並取得頁面原始碼的時間，以及多頁並行載入的總時間
+
+執行方式: uv run python benchmarks/bench_cdp_backend.py (需要 websocket-client)
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+from cdp_browser import CdpBrowser, cdp_available
+from driver_watchdog import process_tree
+from fixture_server import serve_fixtures
+
+# 頁面: 載入完成的 CSS 選擇器
+PAGES = {
+    "hot-list.html": ".e7-container",
+    "trending-table.html": "tbody tr",
+}
+ROUNDS = 5
+COMMANDS = 200
+PARALLEL_PAGES = 4
+
+
+def start_selenium() -> webdriver.Chrome:
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    service = Service(ChromeDriverManager().install())
+    return webdriver.Chrome(service=service, options=options)
+
+
+def timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_selenium(base_url: str) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    drivers: List[webdriver.Chrome] = []
+    results["啟動 (ms)"] = timed(lambda: drivers.append(start_selenium()))
+    driver = drivers[0]
+    
+    try:
+        results["行程數"] = len(process_tree(driver.service.process.pid))
+        
+        start = time.perf_counter()
+        for _ in range(COMMANDS):
+            driver.execute_script("return document.title")
+        results["單一指令 (ms)"] = (time.perf_counter() - start) * 1000 / COMMANDS
+        
+        for page, selector in PAGES.items():
+            def load() -> None:
+                driver.get(f"{base_url}/{page}")
+                WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+                driver.page_source
+            results[f"{page} (ms)"] = statistics.median(timed(load) for _ in range(ROUNDS))
+        
+        # Selenium 同一個 driver 不能並行，依序以分頁載入
+        def load_tabs() -> None:
+            for i in range(PARALLEL_PAGES):
+                if i:
+                    driver.switch_to.new_window('tab')
+                driver.get(f"{base_url}/hot-list.html")
+                driver.page_source
+        results[f"{PARALLEL_PAGES} 頁 (ms)"] = timed(load_tabs)
+    finally:
+        driver.quit()
+    return results
+
+
+def bench_cdp(base_url: str) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    browsers: List[CdpBrowser] = []
+    results["啟動 (ms)"] = timed(lambda: browsers.append(CdpBrowser()))
+    browser = browsers[0]
+    
+    try:
+        results["行程數"] = len(process_tree(browser.process.pid))
+        page = browser.new_page()
+        
+        start = time.perf_counter()
+        for _ in range(COMMANDS):
+            page.evaluate("document.title")
+        results["單一指令 (ms)"] = (time.perf_counter() - start) * 1000 / COMMANDS
+        
+        for name, selector in PAGES.items():
+            def load() -> None:
+                page.navigate(f"{base_url}/{name}")
+                page.wait_for(selector, timeout=15)
+                page.page_source()
+            results[f"{name} (ms)"] = statistics.median(timed(load) for _ in range(ROUNDS))
+        page.close()
+        
+        # 同一條連線的多個分頁並行載入
+        urls = [f"{base_url}/hot-list.html?page={i}" for i in range(PARALLEL_PAGES)]
+        results[f"{PARALLEL_PAGES} 頁 (ms)"] = timed(
+            lambda: browser.render_pages(urls, lambda page, url: page.page_source(), max_pages=PARALLEL_PAGES))
+    finally:
+        browser.close()
+    return results
+
+
+def main() -> None:
+    """主函數"""
+    print("🧪 瀏覽器後端效能比較")
+    print("=" * 50)
+    if not cdp_available():
+        print("❌ 需要安裝 websocket-client 並能找到 Chrome 執行檔 (CHROME_PATH)")
+        return
+    
+    with serve_fixtures(asset_delay=0) as base_url:
+        results = {
+            "Selenium": bench_selenium(base_url),
+            "CDP": bench_cdp(base_url),
+        }
+    
+    metrics = list(results["Selenium"])
+    print(f"{'項目':<24}{'Selenium':>12}{'CDP':>12}")
+    print("-" * 48)
+    for metric in metrics:
+        print(f"{metric:<24}{results['Selenium'][metric]:>12.1f}{results['CDP'][metric]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
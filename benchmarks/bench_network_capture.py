@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+網路擷取效能比較
+在本機測試頁面 (與真實網站一樣先發出 XHR 再延遲渲染) 上比較 DOM 解析與網路擷取的耗時與筆數
+
+執行方式: uv run python benchmarks/bench_network_capture.py
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+from driver_watchdog import DriverSupervisor
+from google_trends import parse_google_trends_batchexecute, parse_google_trends_html
+from network_capture import capture_responses, enable_network_capture
+from ptt_trends import parse_ptt_api_body, parse_ptt_html
+from fixture_server import serve_fixtures
+
+ROUNDS = 3
+
+# 頁面: (渲染完成的 CSS 選擇器, DOM 解析函式, API 網址樣式, API 解析函式)
+CASES: Dict[str, Tuple[str, Callable, str, Callable]] = {
+    "xhr-hot-list.html": (".e7-container", parse_ptt_html, r'/api/ptt-hot\.json', parse_ptt_api_body),
+    "xhr-trending.html": ("tbody tr", parse_google_trends_html, r'/api/trends-batchexecute',
+                          parse_google_trends_batchexecute),
+}
+
+
+def start_driver() -> webdriver.Chrome:
+    """啟動開啟 performance log 的 headless Chrome"""
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    enable_network_capture(options)
+    
+    service = Service(ChromeDriverManager().install())
+    return webdriver.Chrome(service=service, options=options)
+
+
+def measure_dom(supervisor: DriverSupervisor, url: str, ready_selector: str,
+                parser: Callable) -> Tuple[float, int]:
+    """等待渲染完成後解析頁面原始碼"""
+    start = time.perf_counter()
+    supervisor.get(url)
+    WebDriverWait(supervisor.driver, 15).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector))
+    )
+    items = parser(supervisor.driver.page_source)
+    return (time.perf_counter() - start) * 1000, len(items)
+
+
+def measure_capture(supervisor: DriverSupervisor, url: str, pattern: str,
+                    parser: Callable) -> Tuple[float, int]:
+    """讀取 API 回應後直接解析 JSON"""
+    start = time.perf_counter()
+    responses = capture_responses(supervisor, url, [pattern])
+    items = [item for response in responses for item in parser(response.body)]
+    return (time.perf_counter() - start) * 1000, len(items)
+
+
+def main() -> None:
+    """主函數"""
+    print("🧪 網路擷取效能比較")
+    print("=" * 50)
+    
+    supervisor = DriverSupervisor(start_driver)
+    results: Dict[str, Dict[str, List[Tuple[float, int]]]] = {}
+    
+    try:
+        with serve_fixtures(asset_delay=0) as base_url:
+            for page, (ready_selector, dom_parser, pattern, api_parser) in CASES.items():
+                url = f"{base_url}/{page}"
+                results[page] = {"DOM 解析": [], "網路擷取": []}
+                for _ in range(ROUNDS):
+                    results[page]["DOM 解析"].append(measure_dom(supervisor, url, ready_selector, dom_parser))
+                    results[page]["網路擷取"].append(measure_capture(supervisor, url, pattern, api_parser))
+    finally:
+        supervisor.quit()
+    
+    for page, modes in results.items():
+        print(f"\n📋 {page}")
+        print("-" * 30)
+        for mode, samples in modes.items():
+            timings = [elapsed for elapsed, _ in samples]
+            print(f"{mode}: 中位數 {statistics.median(timings):.0f} ms, {samples[-1][1]} 筆")
+
+
+if __name__ == "__main__":
+    main()
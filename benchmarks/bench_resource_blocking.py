@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+資源阻擋效能比較
+在本機測試頁面上比較啟用與停用資源阻擋時的頁面載入時間與瀏覽器記憶體
+
+執行方式: uv run python benchmarks/bench_resource_blocking.py
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from browser_profile import (
+    NO_BLOCKING,
+    BrowserProfile,
+    apply_browser_profile,
+    apply_profile_options,
+)
+from fixture_server import serve_fixtures
+
+PAGES = ["hot-list.html", "trending-table.html"]
+ROUNDS = 5
+
+# 測試頁面的追蹤器放在本機 /analytics/ 路徑下，需要額外的阻擋樣式
+BLOCKING = BrowserProfile(extra_patterns=('*/analytics/*', '*/media/*'))
+
+
+def start_driver(profile: BrowserProfile) -> webdriver.Chrome:
+    """以指定的設定啟動 headless Chrome"""
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    apply_profile_options(options, profile)
+    
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=options)
+    apply_browser_profile(driver, profile)
+    return driver
+
+
+def chrome_rss_mb(driver: webdriver.Chrome) -> Optional[float]:
+    """計算 chromedriver 及其子行程 (Chrome) 的 RSS 總和，需要 psutil"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    
+    root = psutil.Process(driver.service.process.pid)
+    processes = [root] + root.children(recursive=True)
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / 1024 / 1024
+
+
+def measure(profile: BrowserProfile, base_url: str) -> Dict[str, List[float]]:
+    """量測每個頁面的載入時間"""
+    driver = start_driver(profile)
+    timings: Dict[str, List[float]] = {page: [] for page in PAGES}
+    memory: List[float] = []
+    
+    try:
+        for _ in range(ROUNDS):
+            for page in PAGES:
+                start = time.perf_counter()
+                driver.get(f"{base_url}/{page}")
+                timings[page].append((time.perf_counter() - start) * 1000)
+            rss = chrome_rss_mb(driver)
+            if rss is not None:
+                memory.append(rss)
+    finally:
+        driver.quit()
+    
+    timings['rss_mb'] = memory
+    return timings
+
+
+def main() -> None:
+    """主函數"""
+    print("🧪 資源阻擋效能比較")
+    print("=" * 50)
+    
+    with serve_fixtures(asset_delay=0.2) as base_url:
+        results = {
+            "不阻擋": measure(NO_BLOCKING, base_url),
+            "阻擋": measure(BLOCKING, base_url),
+        }
+    
+    for name, timings in results.items():
+        print(f"\n📋 {name}")
+        print("-" * 30)
+        for page in PAGES:
+            values = timings[page]
+            print(f"{page}: 中位數 {statistics.median(values):.0f} ms, 最大 {max(values):.0f} ms")
+        if timings['rss_mb']:
+            print(f"Chrome RSS: {max(timings['rss_mb']):.0f} MB")
+        else:
+            print("Chrome RSS: 需要安裝 psutil 才能量測")
+
+
+if __name__ == "__main__":
+    main()
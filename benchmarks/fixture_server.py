@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本機測試頁面伺服器
+提供 fixtures/ 中的頁面，並以人工延遲模擬圖片、字型、影音與追蹤器等外部資源
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# 模擬資源的路徑前綴與對應的 Content-Type
+ASSET_TYPES = {
+    '/img/': 'image/png',
+    '/fonts/': 'font/woff2',
+    '/media/': 'video/mp4',
+    '/analytics/': 'application/javascript',
+}
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """提供測試頁面與延遲資源的處理器"""
+    asset_delay = 0.2
+    asset_size = 64 * 1024
+    
+    def do_GET(self) -> None:
+        for prefix, content_type in ASSET_TYPES.items():
+            if self.path.startswith(prefix):
+                self.send_asset(content_type)
+                return
+        super().do_GET()
+    
+    def send_asset(self, content_type: str) -> None:
+        time.sleep(self.asset_delay)
+        body = b'' if content_type == 'application/javascript' else b'\0' * self.asset_size
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@contextmanager
+def serve_fixtures(asset_delay: float = 0.2, port: int = 0) -> Iterator[str]:
+    """在背景執行測試伺服器，回傳基底網址"""
+    handler = type('DelayedFixtureHandler', (FixtureHandler,), {'asset_delay': asset_delay})
+    server = ThreadingHTTPServer(('127.0.0.1', port), partial(handler, directory=str(FIXTURES_DIR)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    with serve_fixtures() as base_url:
+        print(f"🌐 測試頁面伺服器: {base_url}/hot-list.html")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
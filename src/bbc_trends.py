@@ -5,18 +5,33 @@ BBC 中文新聞爬蟲 - Python 版本
 爬取 BBC 中文網 RSS 新聞資料
 """
 
-import json
 import time
 import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Optional
 from pathlib import Path
 import sys
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 
+from payload_archive import archive_payload
+from snapshot_writer import SnapshotBatch, write_snapshot
+from trend_item import TrendItem, parse_rfc822
+
+# RSS 來源 (依序合併，重複的文章以前面的來源為準)
+BBC_FEEDS = [
+    "https://feeds.bbci.co.uk/zhongwen/trad/rss.xml",
+    # "https://feeds.bbci.co.uk/zhongwen/simp/rss.xml",
+]
+
+# 同時下載的 RSS 來源數
+BBC_MAX_WORKERS = 4
+
 def get_random_user_agent() -> str:
     """獲取隨機 User-Agent"""
     try:
@@ -31,7 +46,7 @@ def random_delay(min_seconds: float = 1.0, max_seconds: float = 3.0) -> None:
     print(f"⏳ 隨機延遲 {delay:.2f} 秒...")
     time.sleep(delay)
 
-def parse_rss_feed(xml_content: str) -> List[Dict[str, Any]]:
+def parse_rss_feed(xml_content: str) -> List[TrendItem]:
     """解析 RSS XML 內容"""
     articles = []
     
@@ -64,18 +79,26 @@ def parse_rss_feed(xml_content: str) -> List[Dict[str, Any]]:
                     if img_tag and img_tag.get('src'):
                         thumbnail_url = img_tag.get('src')
                 
-                article = {
-                    "title": title_elem.get_text().strip() if title_elem else "",
-                    "link": link_elem.get_text().strip() if link_elem else "",
-                    "description": description_elem.get_text().strip() if description_elem else "",
-                    "pubDate": pub_date_elem.get_text().strip() if pub_date_elem else "",
-                    "guid": guid_elem.get_text().strip() if guid_elem else "",
-                    "thumbnail": thumbnail_url
-                }
+                title = title_elem.get_text().strip() if title_elem else ""
+                link = link_elem.get_text().strip() if link_elem else ""
+                pub_date = pub_date_elem.get_text().strip() if pub_date_elem else ""
+                guid = guid_elem.get_text().strip() if guid_elem else ""
                 
                 # 只添加有標題和連結的文章
-                if article["title"] and article["link"]:
-                    articles.append(article)
+                if title and link:
+                    articles.append(TrendItem(
+                        "bbc",
+                        title,
+                        link,
+                        timestamp=parse_rfc822(pub_date),
+                        key=f"bbc:{guid}" if guid else None,
+                        extra={
+                            "description": description_elem.get_text().strip() if description_elem else "",
+                            "pubDate": pub_date,
+                            "guid": guid,
+                            "thumbnail": thumbnail_url
+                        },
+                    ))
                     
             except Exception as e:
                 print(f"⚠️ 解析文章時發生錯誤: {e}")
@@ -88,48 +111,90 @@ def parse_rss_feed(xml_content: str) -> List[Dict[str, Any]]:
         print(f"❌ 解析 RSS XML 時發生錯誤: {e}")
         return []
 
-def scrape_bbc_rss() -> Optional[List[Dict[str, Any]]]:
-    """爬取 BBC 中文網 RSS 新聞"""
-    rss_url = "https://feeds.bbci.co.uk/zhongwen/trad/rss.xml"
-    
-    headers = {
+def create_session() -> requests.Session:
+    """建立共用連線池的 HTTP Session"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=BBC_MAX_WORKERS,
+        pool_maxsize=BBC_MAX_WORKERS,
+        max_retries=Retry(total=2, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
         'User-Agent': get_random_user_agent(),
         'Accept': 'application/rss+xml, application/xml, text/xml',
         'Accept-Language': 'zh-TW,zh;q=0.9,en;q=0.8',
         'Accept-Encoding': 'gzip, deflate, br',
         'Connection': 'keep-alive',
         'Upgrade-Insecure-Requests': '1',
-    }
-    
+    })
+    return session
+
+def fetch_feed(session: requests.Session, feed_url: str) -> List[TrendItem]:
+    """下載並解析單一 RSS 來源"""
     try:
-        print("🚀 開始爬取 BBC 中文網 RSS...")
-        random_delay(1, 2)
-        
-        response = requests.get(rss_url, headers=headers, timeout=30)
+        response = session.get(feed_url, timeout=30)
         response.raise_for_status()
         response.encoding = 'utf-8'
         
-        print("✅ 成功獲取 RSS 內容")
+        print(f"✅ 成功獲取 RSS 內容: {feed_url}")
+        archive_payload("bbc", feed_url, response.text, "application/rss+xml")
+        return parse_rss_feed(response.text)
+    
+    except requests.exceptions.RequestException as e:
+        print(f"❌ HTTP 請求錯誤 ({feed_url}): {e}")
+        return []
+
+def merge_articles(feed_results: List[List[TrendItem]]) -> List[TrendItem]:
+    """合併多個 RSS 來源，依 guid 或連結去重並依發布時間由新到舊排序 (無法解析時間的排在最後)"""
+    merged: List[TrendItem] = []
+    # guid 與連結都建立索引，任一相同即視為同一篇文章
+    index: Dict[str, int] = {}
+    
+    for articles in feed_results:
+        for article in articles:
+            keys = [key for key in (article.extra.get("guid"), article.link) if key]
+            position = next((index[key] for key in keys if key in index), None)
+            
+            if position is None:
+                position = len(merged)
+                merged.append(article)
+            for key in keys:
+                index.setdefault(key, position)
+    
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    merged.sort(key=lambda article: article.timestamp or oldest, reverse=True)
+    return merged
+
+def scrape_bbc_rss(feeds: Optional[List[str]] = None) -> Optional[List[TrendItem]]:
+    """並行爬取 BBC 中文網 (及其他設定的) RSS 新聞並合併去重"""
+    feeds = feeds or BBC_FEEDS
+    
+    try:
+        print(f"🚀 開始爬取 BBC 中文網 RSS ({len(feeds)} 個來源)...")
+        random_delay(1, 2)
+        
+        session = create_session()
+        with session, ThreadPoolExecutor(max_workers=BBC_MAX_WORKERS) as executor:
+            # executor.map 保持 BBC_FEEDS 的順序，重複文章以前面的來源為準
+            feed_results = list(executor.map(lambda url: fetch_feed(session, url), feeds))
         
-        # 解析 RSS
-        articles = parse_rss_feed(response.text)
+        articles = merge_articles(feed_results)
         
         if articles:
-            print(f"📰 成功爬取 {len(articles)} 篇 BBC 中文新聞")
+            print(f"📰 成功爬取 {len(articles)} 篇 BBC 中文新聞 (合併前 {sum(len(r) for r in feed_results)} 篇)")
             return articles
         else:
             print("❌ 沒有找到任何新聞文章")
             return None
             
-    except requests.exceptions.RequestException as e:
-        print(f"❌ HTTP 請求錯誤: {e}")
-        return None
     except Exception as e:
         print(f"❌ 爬取過程中發生錯誤: {e}")
         return None
 
-def save_bbc_data(articles: List[Dict[str, Any]]) -> None:
-    """儲存 BBC 新聞資料"""
+def save_bbc_data(articles: List[TrendItem], batch: Optional[SnapshotBatch] = None) -> None:
+    """儲存 BBC 新聞資料 (傳入 batch 時暫存，commit 時寫入並更新世代紀錄)"""
     # 確保 data 目錄存在
     data_dir = Path("data")
     data_dir.mkdir(exist_ok=True)
@@ -141,22 +206,25 @@ def save_bbc_data(articles: List[Dict[str, Any]]) -> None:
         "title": "BBC Chinese",
         "description": "BBC Chinese - BBC News , 中文 - 主頁",
         "link": "https://www.bbc.com/zhongwen/trad",
+        "feeds": BBC_FEEDS,
         "total_articles": len(articles),
-        "articles": articles
+        "articles": [article.to_dict() for article in articles]
     }
     
     # 儲存為 JSON
     output_path = data_dir / "bbc-trends.json"
+    if batch is not None:
+        batch.add(output_path, output_data)
+        return
     
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
+        write_snapshot(output_path, output_data)
         print(f"💾 資料已儲存至: {output_path}")
     except Exception as e:
         print(f"❌ 儲存資料時發生錯誤: {e}")
 
-def main() -> None:
-    """主函數"""
+def main() -> bool:
+    """主函數，回傳是否成功取得資料"""
     print("📰 BBC 中文新聞爬蟲 - Python 版本")
     print("==================================================")
     
@@ -166,15 +234,18 @@ def main() -> None:
         
         if articles:
             # 儲存資料
-            save_bbc_data(articles)
+            with SnapshotBatch("bbc") as batch:
+                save_bbc_data(articles, batch)
             
             # 顯示結果摘要
             print("✅ 擷取完成:")
             for i, article in enumerate(articles[:3], 1):
-                print(f"  {i}. {article['title'][:60]}...")
+                print(f"  {i}. {article.title[:60]}...")
             print(f"📊 總共找到 {len(articles)} 篇新聞")
+            return True
         else:
             print("❌ 沒有找到任何新聞資料")
+            return False
     
     except KeyboardInterrupt:
         print("\n⏹️ 使用者中斷執行")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+瀏覽器資源阻擋設定
+透過 Chrome 偏好設定與 CDP 網址阻擋，丟棄爬蟲用不到的圖片、影音、字型與追蹤器
+"""
+
+from typing import Dict, List, Sequence
+
+# 各類資源對應的 CDP 網址阻擋樣式 (Network.setBlockedURLs 支援 * 萬用字元)
+BLOCKED_URL_PATTERNS: Dict[str, List[str]] = {
+    'images': [
+        '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    ],
+    'media': [
+        '*.mp4', '*.webm', '*.m3u8', '*.ts', '*.mp3', '*.m4a', '*.ogg', '*.wav',
+    ],
+    'fonts': [
+        '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+        '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+    ],
+    'trackers': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*googletagservices.com*',
+        '*doubleclick.net*', '*googlesyndication.com*', '*adservice.google.*',
+        '*facebook.net*', '*connect.facebook.com*', '*scorecardresearch.com*',
+        '*hotjar.com*', '*criteo.com*', '*taboola.com*', '*outbrain.com*',
+        '*clarity.ms*', '*amazon-adsystem.com*',
+    ],
+}
+
+# 預設阻擋的資源類型
+DEFAULT_BLOCKED_RESOURCES = ('images', 'media', 'fonts', 'trackers')
+
+
+class BrowserProfile:
+    """瀏覽器資源阻擋設定類"""
+    def __init__(self, block: Sequence[str] = DEFAULT_BLOCKED_RESOURCES,
+                 extra_patterns: Sequence[str] = ()):
+        unknown = [name for name in block if name not in BLOCKED_URL_PATTERNS]
+        if unknown:
+            raise ValueError(f"未知的資源類型: {unknown}")
+        self.block = tuple(block)
+        self.extra_patterns = tuple(extra_patterns)
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.block or self.extra_patterns)
+    
+    def url_patterns(self) -> List[str]:
+        """回傳要交給 Network.setBlockedURLs 的網址樣式"""
+        patterns: List[str] = []
+        for name in self.block:
+            patterns.extend(BLOCKED_URL_PATTERNS[name])
+        patterns.extend(self.extra_patterns)
+        return patterns
+
+
+# 不阻擋任何資源的設定 (用於比較或除錯)
+NO_BLOCKING = BrowserProfile(block=())
+
+
+def apply_profile_options(options, profile: BrowserProfile) -> None:
+    """在啟動 Chrome 前套用偏好設定
+
+    很多圖片網址沒有副檔名 (例如 PTT 的 imgur 快取)，網址樣式擋不到，
+    因此圖片改用 Chrome 的內容設定整類停用；img 的 src 屬性仍會保留在 DOM 中。
+    """
+    if 'images' in profile.block:
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+        })
+        options.add_argument('--blink-settings=imagesEnabled=false')
+
+
+def apply_browser_profile(driver, profile: BrowserProfile) -> None:
+    """在瀏覽器啟動後透過 CDP 啟用網址阻擋"""
+    if not profile.enabled:
+        return
+    
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': profile.url_patterns()})
+    except Exception as e:
+        # 非 Chromium 瀏覽器或遠端驅動不支援 CDP 時，仍可繼續爬取
+        print(f"⚠️ 無法啟用資源阻擋: {e}")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+瀏覽器分頁工具
+在同一個瀏覽器中同時開啟多個分頁，讓多個頁面的載入時間重疊
+"""
+
+from typing import Dict, List, Sequence
+from urllib.parse import urlparse
+
+from driver_watchdog import DriverSupervisor
+
+
+def open_tabs(supervisor: DriverSupervisor, urls: Sequence[str]) -> List[str]:
+    """為每個網址開啟一個分頁並回傳分頁代碼
+
+    第一個網址使用目前的分頁 (受導覽期限保護)，其餘用 window.open 開啟，不會阻塞等待載入
+    """
+    handles = []
+    
+    supervisor.get(urls[0])
+    driver = supervisor.driver
+    handles.append(driver.current_window_handle)
+    
+    for url in urls[1:]:
+        known_handles = set(driver.window_handles)
+        driver.execute_script("window.open(arguments[0], '_blank');", url)
+        new_handles = [h for h in driver.window_handles if h not in known_handles]
+        handles.append(new_handles[0] if new_handles else driver.current_window_handle)
+    
+    return handles
+
+
+def close_other_tabs(supervisor: DriverSupervisor, keep: str) -> None:
+    """關閉 keep 以外的所有分頁以釋放記憶體"""
+    driver = supervisor.driver
+    for handle in driver.window_handles:
+        if handle != keep:
+            driver.switch_to.window(handle)
+            driver.close()
+    driver.switch_to.window(keep)
+
+
+def plan_waves(urls: Sequence[str], per_host: int) -> List[List[str]]:
+    """將網址分成多批，每批中同一主機最多 per_host 個"""
+    waves: List[List[str]] = []
+    host_counts: List[Dict[str, int]] = []
+    
+    for url in urls:
+        host = urlparse(url).netloc
+        for wave, counts in zip(waves, host_counts):
+            if counts.get(host, 0) < per_host:
+                wave.append(url)
+                counts[host] = counts.get(host, 0) + 1
+                break
+        else:
+            waves.append([url])
+            host_counts.append({host: 1})
+    
+    return waves
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+直接透過 DevTools Protocol 控制 headless Chrome
+不經過 chromedriver：啟動 Chrome 後以一條 WebSocket 連線控制多個分頁 (flatten 模式的 sessionId)，
+只提供爬蟲需要的 導覽、等待、執行 JavaScript、取得頁面原始碼，需要安裝 websocket-client
+"""
+
+import itertools
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    import websocket
+except ImportError:  # 沒有 websocket-client 時只能使用 Selenium
+    websocket = None
+
+from browser_profile import BrowserProfile
+from driver_watchdog import MANAGED_BROWSER_FLAG, kill_process_tree
+
+# 爬蟲使用的瀏覽器後端: 'selenium' (預設) 或 'cdp'
+BROWSER_BACKEND = os.environ.get('BROWSER_BACKEND', 'selenium')
+
+# Chrome 執行檔 (未設定 CHROME_PATH 時依序尋找)
+CHROME_CANDIDATES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+CDP_STARTUP_TIMEOUT = 15
+CDP_COMMAND_TIMEOUT = 30
+
+DEVTOOLS_URL_PATTERN = re.compile(r'DevTools listening on (ws://\S+)')
+
+
+class CdpError(RuntimeError):
+    """CDP 指令回傳錯誤或逾時"""
+
+
+def cdp_available() -> bool:
+    return websocket is not None and find_chrome() is not None
+
+
+def find_chrome() -> Optional[str]:
+    if os.environ.get('CHROME_PATH'):
+        return os.environ['CHROME_PATH']
+    for name in CHROME_CANDIDATES:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+class CdpConnection:
+    """單一 WebSocket 連線，背景執行緒分派回應與事件 (多個執行緒可同時送出指令)"""
+    def __init__(self, ws_url: str):
+        if websocket is None:
+            raise RuntimeError("使用 CDP 後端需要安裝 websocket-client: uv add websocket-client")
+        self.ws = websocket.create_connection(ws_url, enable_multithread=True, suppress_origin=True)
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.pending: Dict[int, Dict[str, Any]] = {}
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.closed = False
+        self.reader = threading.Thread(target=self._read_loop, daemon=True)
+        self.reader.start()
+    
+    def _read_loop(self) -> None:
+        while not self.closed:
+            try:
+                message = json.loads(self.ws.recv())
+            except Exception:
+                break
+            if "id" in message:
+                with self.lock:
+                    slot = self.pending.get(message["id"])
+                if slot is not None:
+                    slot["message"] = message
+                    slot["event"].set()
+            else:
+                for listener in list(self.listeners):
+                    listener(message)
+        # 連線中斷時讓所有等待中的指令返回
+        self.closed = True
+        with self.lock:
+            for slot in self.pending.values():
+                slot["event"].set()
+    
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None,
+             session_id: Optional[str] = None, timeout: float = CDP_COMMAND_TIMEOUT) -> Dict[str, Any]:
+        """送出指令並等待結果"""
+        if self.closed:
+            raise CdpError(f"連線已關閉: {method}")
+        message_id = next(self.ids)
+        slot: Dict[str, Any] = {"event": threading.Event(), "message": None}
+        with self.lock:
+            self.pending[message_id] = slot
+        payload: Dict[str, Any] = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            payload["sessionId"] = session_id
+        try:
+            self.ws.send(json.dumps(payload))
+            if not slot["event"].wait(timeout):
+                raise CdpError(f"{method} 超過 {timeout:.0f} 秒沒有回應")
+        finally:
+            with self.lock:
+                self.pending.pop(message_id, None)
+        
+        message = slot["message"]
+        if message is None:
+            raise CdpError(f"連線已關閉: {method}")
+        if "error" in message:
+            raise CdpError(f"{method}: {message['error'].get('message')}")
+        return message.get("result", {})
+    
+    def close(self) -> None:
+        self.closed = True
+        try:
+            self.ws.close()
+        except Exception:
+            pass
+
+
+class CdpPage:
+    """單一分頁 (attach 後的 session)"""
+    def __init__(self, browser: 'CdpBrowser', target_id: str, session_id: str):
+        self.browser = browser
+        self.target_id = target_id
+        self.session_id = session_id
+        self.loaded = threading.Event()
+        browser.connection.listeners.append(self._on_event)
+    
+    def _on_event(self, message: Dict[str, Any]) -> None:
+        if message.get("sessionId") == self.session_id and message.get("method") == "Page.loadEventFired":
+            self.loaded.set()
+    
+    def send(self, method: str, params: Optional[Dict[str, Any]] = None,
+             timeout: float = CDP_COMMAND_TIMEOUT) -> Dict[str, Any]:
+        return self.browser.connection.send(method, params, self.session_id, timeout)
+    
+    def navigate(self, url: str, timeout: float = 30) -> None:
+        """導覽並等待 load 事件"""
+        self.loaded.clear()
+        result = self.send("Page.navigate", {"url": url}, timeout)
+        if result.get("errorText"):
+            raise CdpError(f"導覽失敗 {url}: {result['errorText']}")
+        if not self.loaded.wait(timeout):
+            raise CdpError(f"頁面載入超過 {timeout:.0f} 秒: {url}")
+    
+    def evaluate(self, expression: str, timeout: float = CDP_COMMAND_TIMEOUT) -> Any:
+        """執行 JavaScript 並回傳可 JSON 序列化的結果 (Promise 會等待完成)"""
+        result = self.send("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": True,
+        }, timeout)
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            raise CdpError(f"JavaScript 錯誤: {details.get('exception', {}).get('description') or details.get('text')}")
+        return result.get("result", {}).get("value")
+    
+    def wait_for(self, selector: str, timeout: float = 10, poll: float = 0.1) -> bool:
+        """等待符合 CSS 選擇器的元素出現"""
+        expression = f"document.querySelector({json.dumps(selector)}) !== null"
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.evaluate(expression):
+                return True
+            time.sleep(poll)
+        return False
+    
+    def count(self, selector: str) -> int:
+        return self.evaluate(f"document.querySelectorAll({json.dumps(selector)}).length") or 0
+    
+    def page_source(self) -> str:
+        return self.evaluate("document.documentElement.outerHTML") or ""
+    
+    def close(self) -> None:
+        try:
+            self.browser.connection.listeners.remove(self._on_event)
+            self.browser.connection.send("Target.closeTarget", {"targetId": self.target_id})
+        except (ValueError, CdpError):
+            pass
+
+
+class CdpBrowser:
+    """以 --remote-debugging-port 啟動的 headless Chrome 與其 WebSocket 連線"""
+    def __init__(self, profile: Optional[BrowserProfile] = None, user_agent: Optional[str] = None,
+                 extra_args: Sequence[str] = ()):
+        chrome = find_chrome()
+        if chrome is None:
+            raise RuntimeError("找不到 Chrome 執行檔，請設定 CHROME_PATH")
+        self.profile = profile
+        self.user_agent = user_agent
+        self.user_data_dir = tempfile.mkdtemp(prefix="cdp-chrome-")
+        args = [
+            chrome,
+            '--headless=new',
+            '--remote-debugging-port=0',
+            f'--user-data-dir={self.user_data_dir}',
+            '--no-sandbox',
+            '--disable-dev-shm-usage',
+            '--disable-gpu',
+            '--no-first-run',
+            '--no-default-browser-check',
+            '--window-size=1920,1080',
+            MANAGED_BROWSER_FLAG,
+            *extra_args,
+            'about:blank',
+        ]
+        if profile is not None and 'images' in profile.block:
+            args.insert(-1, '--blink-settings=imagesEnabled=false')
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        try:
+            self.connection = CdpConnection(self._devtools_url())
+        except Exception:
+            self.close()
+            raise
+    
+    def _devtools_url(self) -> str:
+        """從 Chrome 的 stderr 讀取 browser 層級的 WebSocket 網址"""
+        found: Dict[str, str] = {}
+        ready = threading.Event()
+        
+        def read() -> None:
+            # 找到網址後繼續讀取，避免 stderr 管線塞滿讓 Chrome 卡住
+            for line in self.process.stderr:
+                match = DEVTOOLS_URL_PATTERN.search(line)
+                if match and not ready.is_set():
+                    found["url"] = match.group(1)
+                    ready.set()
+            ready.set()
+        
+        threading.Thread(target=read, daemon=True).start()
+        ready.wait(CDP_STARTUP_TIMEOUT)
+        if "url" not in found:
+            raise CdpError(f"Chrome 啟動超過 {CDP_STARTUP_TIMEOUT} 秒仍未提供 DevTools 連線")
+        return found["url"]
+    
+    def new_page(self) -> CdpPage:
+        """開新分頁並套用資源阻擋與 User-Agent"""
+        target_id = self.connection.send("Target.createTarget", {"url": "about:blank"})["targetId"]
+        session_id = self.connection.send("Target.attachToTarget", {"targetId": target_id, "flatten": True})["sessionId"]
+        page = CdpPage(self, target_id, session_id)
+        page.send("Page.enable")
+        page.send("Network.enable")
+        if self.profile is not None and self.profile.enabled:
+            page.send("Network.setBlockedURLs", {"urls": self.profile.url_patterns()})
+        if self.user_agent:
+            page.send("Network.setUserAgentOverride", {"userAgent": self.user_agent})
+        page.send("Page.addScriptToEvaluateOnNewDocument", {
+            "source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})",
+        })
+        return page
+    
+    def render_pages(self, urls: Sequence[str], handler: Callable[[CdpPage, str], Any],
+                     max_pages: int = 4) -> Dict[str, Any]:
+        """以多個分頁並行載入網址，handler(page, url) 的結果依網址回傳 (失敗時為例外物件)"""
+        def run(url: str) -> Any:
+            page = None
+            try:
+                page = self.new_page()
+                page.navigate(url)
+                return handler(page, url)
+            except Exception as e:
+                return e
+            finally:
+                if page is not None:
+                    page.close()
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_pages, len(urls)))) as executor:
+            return dict(zip(urls, executor.map(run, urls)))
+    
+    def close(self) -> None:
+        """關閉連線並結束 Chrome 行程樹"""
+        connection = getattr(self, "connection", None)
+        if connection is not None:
+            try:
+                connection.send("Browser.close", timeout=5)
+            except CdpError:
+                pass
+            connection.close()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            kill_process_tree(self.process.pid)
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+    
+    def __enter__(self) -> 'CdpBrowser':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
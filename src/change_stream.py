@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+資料變動事件串流
+每次寫出快照時把項目層級的差異 (新增、移除、變更) 附加到 cache/changes.ndjson，
+`main.py serve` 以 Server-Sent Events 推送給下游，事件帶有遞增序號，斷線重連時從 Last-Event-ID 補送
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows 沒有 fcntl，只在單一行程寫入時使用
+    fcntl = None
+
+CHANGE_LOG = Path("cache") / "changes.ndjson"
+
+# 事件檔保留的事件數 (超過 CHANGE_LOG_RETENTION + CHANGE_LOG_SLACK 時壓縮)
+CHANGE_LOG_RETENTION = 1000
+CHANGE_LOG_SLACK = 200
+
+SSE_POLL_SECONDS = 1.0
+SSE_HEARTBEAT_SECONDS = 15
+
+
+def _item_list(data: Any) -> List[Any]:
+    """取出資料檔中的項目陣列 (trends/articles，或 Reddit listing 的 children)"""
+    if not isinstance(data, dict):
+        return []
+    for field in ("trends", "articles"):
+        if isinstance(data.get(field), list):
+            return data[field]
+    listing = data.get("original_data")
+    if isinstance(listing, dict):
+        return [
+            child.get("data", child) if isinstance(child, dict) else child
+            for child in (listing.get("data") or {}).get("children") or []
+        ]
+    return []
+
+
+def item_diff(old: Any, new: Any, key_func: Callable[[Any], str]) -> Dict[str, List[Any]]:
+    """比較新舊快照的項目: added (新項目)、removed (移除的鍵)、changed (內容變更的項目)"""
+    old_items = {key_func(item): item for item in _item_list(old)}
+    new_items = {key_func(item): item for item in _item_list(new)}
+    return {
+        "added": [item for key, item in new_items.items() if key not in old_items],
+        "removed": [key for key in old_items if key not in new_items],
+        "changed": [
+            {"key": key, "item": item}
+            for key, item in new_items.items()
+            if key in old_items and old_items[key] != item
+        ],
+    }
+
+
+def _read_events(log_path: Path) -> List[Dict[str, Any]]:
+    events = []
+    try:
+        with open(log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return events
+
+
+def _last_seq(log_path: Path) -> int:
+    """讀取事件檔最後一行的序號 (只讀檔尾)"""
+    try:
+        with open(log_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 65536))
+            lines = f.read().decode('utf-8', errors='ignore').splitlines()
+    except FileNotFoundError:
+        return 0
+    for line in reversed(lines):
+        try:
+            return json.loads(line)["seq"]
+        except (json.JSONDecodeError, KeyError):
+            continue
+    return 0
+
+
+def append_change(path: Path, snapshot_seq: int, diff: Dict[str, List[Any]],
+                  log_path: Path = CHANGE_LOG) -> Optional[int]:
+    """附加一筆變動事件並回傳事件序號；沒有任何項目變動時不產生事件"""
+    if not any(diff.values()):
+        return None
+    
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    # 多個爬蟲行程同時寫入時以獨立的鎖檔確保序號連續 (事件檔壓縮時會被替換)
+    with open(log_path.with_suffix('.lock'), 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            seq = _last_seq(log_path) + 1
+            event = {
+                "seq": seq,
+                "source": Path(path).stem,
+                "file": Path(path).as_posix(),
+                "snapshot_seq": snapshot_seq,
+                "created": datetime.now(timezone.utc).isoformat(),
+                **diff,
+            }
+            with open(log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+            if seq % CHANGE_LOG_SLACK == 0:
+                _compact(log_path)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    
+    print(f"📡 變動事件 #{seq}: 新增 {len(diff['added'])}、移除 {len(diff['removed'])}、變更 {len(diff['changed'])}")
+    return seq
+
+
+def _compact(log_path: Path) -> None:
+    """只保留最近 CHANGE_LOG_RETENTION 筆事件 (呼叫端需持有檔案鎖)"""
+    events = _read_events(log_path)
+    if len(events) <= CHANGE_LOG_RETENTION + CHANGE_LOG_SLACK:
+        return
+    tmp_path = log_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for event in events[-CHANGE_LOG_RETENTION:]:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    tmp_path.replace(log_path)
+
+
+def events_since(since: int, log_path: Path = CHANGE_LOG) -> Tuple[List[Dict[str, Any]], bool]:
+    """回傳序號大於 since 的事件，以及客戶端是否需要重新下載完整快照
+
+    中間有已被壓縮掉的事件，或 since 大於事件檔最後的序號 (事件檔被刪除或重新建立，序號從 1 重新開始) 時都需要
+    """
+    events = _read_events(log_path)
+    last_seq = events[-1]["seq"] if events else 0
+    expired = bool(events) and since > 0 and events[0]["seq"] > since + 1
+    gap = expired or since > last_seq
+    return [event for event in events if event["seq"] > since], gap
+
+
+def format_sse(event: Dict[str, Any], name: str = "change") -> bytes:
+    data = json.dumps(event, ensure_ascii=False)
+    return f"id: {event.get('seq', '')}\nevent: {name}\ndata: {data}\n\n".encode('utf-8')
+
+
+class ChangeStreamServer(ThreadingHTTPServer):
+    """每個伺服器有自己的事件檔與停止旗標，關閉時只結束自己的串流"""
+    daemon_threads = True
+    
+    def __init__(self, address: Tuple[str, int], log_path: Path = CHANGE_LOG):
+        super().__init__(address, ChangeStreamHandler)
+        self.log_path = log_path
+        self.stopping = threading.Event()
+
+
+class ChangeStreamHandler(BaseHTTPRequestHandler):
+    """GET /events?since=<序號>&source=<資料檔名稱> 以 SSE 推送變動事件"""
+    server: ChangeStreamServer
+    
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/events":
+            self.send_error(404)
+            return
+        
+        query = parse_qs(url.query)
+        sources = set(query.get("source", []))
+        try:
+            since = int(self.headers.get("Last-Event-ID") or query.get("since", ["0"])[0])
+        except ValueError:
+            since = 0
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        
+        try:
+            for chunk in self.stream(since, sources):
+                self.wfile.write(chunk)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+    
+    def stream(self, since: int, sources: set) -> Iterator[bytes]:
+        """先補送 since 之後的事件，再持續輪詢事件檔"""
+        last_heartbeat = time.monotonic()
+        last_stat = None
+        log_path = self.server.log_path
+        while not self.server.stopping.is_set():
+            # 事件檔沒有變動時不重新讀取
+            try:
+                stat = log_path.stat()
+                current_stat = (stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                current_stat = None
+            if current_stat != last_stat:
+                last_stat = current_stat
+                events, gap = events_since(since, log_path)
+                if gap:
+                    # 缺少的事件已被壓縮或事件檔重新開始編號，客戶端需要重新下載完整快照
+                    last_seq = _last_seq(log_path)
+                    if since > last_seq:
+                        since = last_seq
+                        yield format_sse({"seq": since, "reason": "log restarted"}, name="reset")
+                    else:
+                        yield format_sse({"seq": since, "reason": "events expired"}, name="reset")
+                for event in events:
+                    since = event["seq"]
+                    if not sources or event["source"] in sources:
+                        yield format_sse(event)
+            if time.monotonic() - last_heartbeat >= SSE_HEARTBEAT_SECONDS:
+                last_heartbeat = time.monotonic()
+                yield b": heartbeat\n\n"
+            self.server.stopping.wait(SSE_POLL_SECONDS)
+    
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def serve_changes(host: str = "0.0.0.0", port: int = 8765, log_path: Path = CHANGE_LOG) -> None:
+    """啟動 SSE 伺服器直到中斷"""
+    server = ChangeStreamServer((host, port), log_path)
+    print(f"📡 變動事件串流: http://{host}:{server.server_address[1]}/events")
+    try:
+        server.serve_forever()
+    finally:
+        server.stopping.set()
+        server.server_close()
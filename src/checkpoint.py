@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬取進度檢查點
+長時間的爬取在每個目標完成時把項目與狀態附加到 cache/checkpoints/<名稱>.ndjson，
+中途當機或逾時後在時間窗內重新執行會略過已完成的目標，最後的輸出由日誌內容組成
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+CHECKPOINT_DIR = Path("cache") / "checkpoints"
+
+# 日誌在這段時間內 (秒) 可以接續，超過後視為新的一次執行
+CHECKPOINT_WINDOW = 60 * 60
+
+
+class CheckpointJournal:
+    """附加式的進度日誌，每行一筆紀錄: run (開始)、target (單一目標完成)"""
+    def __init__(self, name: str, window: float = CHECKPOINT_WINDOW,
+                 checkpoint_dir: Path = CHECKPOINT_DIR):
+        self.path = checkpoint_dir / f"{name}.ndjson"
+        self.window = window
+        self.targets: Dict[str, Dict[str, Any]] = {}
+        self.started: Optional[float] = None
+        self.resumed = self._load()
+        if not self.resumed:
+            self._start()
+    
+    def _load(self) -> bool:
+        """讀取時間窗內的日誌，回傳是否接續上次的執行"""
+        if not self.path.exists():
+            return False
+        
+        records = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # 寫到一半中斷的最後一行直接捨棄
+                        break
+        except OSError as e:
+            print(f"⚠️ 讀取檢查點失敗: {e}")
+            return False
+        
+        if not records or records[0].get("type") != "run":
+            return False
+        if time.time() - records[0]["started"] > self.window:
+            return False
+        
+        self.started = records[0]["started"]
+        for record in records[1:]:
+            if record.get("type") == "target":
+                self.targets[record["target"]] = record
+        if self.targets:
+            print(f"♻️ 接續上次的執行，已完成 {len(self.targets)} 個目標: {self.path}")
+        # 重寫日誌以去掉可能殘缺的最後一行
+        self._rewrite([records[0], *self.targets.values()])
+        return True
+    
+    def _start(self) -> None:
+        self.started = time.time()
+        self._rewrite([{"type": "run", "started": self.started}])
+    
+    def _rewrite(self, records: List[Dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        tmp_path.replace(self.path)
+    
+    def is_done(self, target: str) -> bool:
+        return target in self.targets
+    
+    def items(self, target: str) -> List[Any]:
+        """已完成目標的項目"""
+        return self.targets.get(target, {}).get("items", [])
+    
+    def record(self, target: str, items: List[Any], **fields: Any) -> None:
+        """記錄目標完成 (項目需可 JSON 序列化)，立即寫入磁碟"""
+        record = {"type": "target", "target": target, "finished": time.time(), "items": items, **fields}
+        self.targets[target] = record
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def finish(self) -> None:
+        """輸出已寫出，刪除日誌"""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
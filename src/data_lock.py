@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+資料檔的跨行程鎖
+每個資料檔旁有一個 .<檔名>.lock，寫入者持有獨佔鎖、讀取者持有共享鎖 (fcntl.flock 建議鎖)，
+同時鎖多個檔案時一律依路徑排序取得，避免多個行程互相等待
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+try:
+    import fcntl
+except ImportError:  # Windows 沒有 fcntl，只在單一行程寫入時使用
+    fcntl = None
+
+_held = threading.local()
+
+
+def lock_path(path: Path) -> Path:
+    path = Path(path)
+    return path.parent / f".{path.name}.lock"
+
+
+def _held_locks() -> Dict[str, List]:
+    """目前執行緒持有的鎖: 正規化路徑 → [鎖檔, 重入次數, 是否為共享鎖]"""
+    if not hasattr(_held, "locks"):
+        _held.locks = {}
+    return _held.locks
+
+
+@contextmanager
+def locked_files(paths: Iterable[Path], shared: bool = False) -> Iterator[None]:
+    """鎖住多個資料檔 (同一執行緒可重入，已持有的鎖直接沿用)
+
+    已持有共享鎖時不能再要求獨佔鎖 (升級需要先釋放，其他讀者可能同時等待升級而互相卡住)，會拋出 RuntimeError
+    """
+    held = _held_locks()
+    acquired = []
+    try:
+        for key in sorted({os.path.normpath(os.path.abspath(path)) for path in paths}):
+            if key in held:
+                if held[key][2] and not shared:
+                    raise RuntimeError(f"已持有 {key} 的共享鎖，無法升級為獨佔鎖")
+                held[key][1] += 1
+                acquired.append(key)
+                continue
+            path = lock_path(Path(key))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            lock = open(path, 'a')
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                except BaseException:
+                    lock.close()
+                    raise
+            held[key] = [lock, 1, shared]
+            acquired.append(key)
+        yield
+    finally:
+        for key in reversed(acquired):
+            held[key][1] -= 1
+            if held[key][1] == 0:
+                lock = held.pop(key)[0]
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+                lock.close()
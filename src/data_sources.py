@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+資料檔來源表
+各來源的資料檔樣式與項目陣列欄位，由全文搜尋、輪詢排程與發佈共用
+"""
+
+from pathlib import Path
+
+DATA_DIR = Path("data")
+
+# 來源: (檔案樣式, 項目陣列欄位)，Reddit 的項目在 listing 中另外處理
+DATA_SOURCES = [
+    ("google", "google-trends*.json", "trends"),
+    ("ptt", "ptt-*.json", "articles"),
+    ("komica", "komica-trends*.json", "trends"),
+    ("bbc", "bbc-trends.json", "articles"),
+]
+REDDIT_FILES = "reddit-*.json"
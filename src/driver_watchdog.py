@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+瀏覽器記憶體監控與驅動回收
+追蹤 chromedriver 與 Chrome 行程樹的 RSS，依頁數或記憶體回收驅動，
+為每次導覽設定硬性期限，並清除殘留的 chromedriver/Chrome 行程
+"""
+
+import os
+import signal
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from selenium.common.exceptions import TimeoutException
+
+try:
+    import psutil
+except ImportError:  # 沒有 psutil 時改讀 /proc (僅限 Linux)
+    psutil = None
+
+# 加在由本專案啟動的 Chrome 命令列上的標記，用來辨識殘留行程
+MANAGED_BROWSER_FLAG = '--trend-scraper-managed'
+
+# 預設回收策略
+DEFAULT_MAX_PAGES = 20
+DEFAULT_MAX_RSS_MB = 1024
+DEFAULT_NAVIGATION_TIMEOUT = 30.0
+# 頁面載入逾時後，再等多久仍未返回就直接終止瀏覽器
+KILL_GRACE_SECONDS = 5.0
+
+PROC_DIR = Path("/proc")
+
+
+def _proc_parent_map() -> Dict[int, int]:
+    """讀取 /proc 取得 pid -> ppid 對照表"""
+    parents = {}
+    for entry in PROC_DIR.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            # comm 欄位可能含空白，從最後一個右括號之後開始切割
+            fields = stat[stat.rindex(')') + 2:].split()
+            parents[int(entry.name)] = int(fields[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    return parents
+
+
+def _proc_cmdline(pid: int) -> str:
+    try:
+        return (PROC_DIR / str(pid) / "cmdline").read_bytes().replace(b'\0', b' ').decode('utf-8', 'replace')
+    except OSError:
+        return ""
+
+
+def process_tree(root_pid: int) -> List[int]:
+    """回傳根行程及其所有子孫行程的 pid"""
+    if psutil is not None:
+        try:
+            root = psutil.Process(root_pid)
+            return [root_pid] + [child.pid for child in root.children(recursive=True)]
+        except psutil.Error:
+            return []
+    
+    if not PROC_DIR.exists():
+        return []
+    
+    parents = _proc_parent_map()
+    if root_pid not in parents:
+        return []
+    
+    pids = [root_pid]
+    for pid in pids:
+        pids.extend(child for child, parent in parents.items() if parent == pid)
+    return pids
+
+
+def process_rss_bytes(pid: int) -> int:
+    """回傳單一行程的 RSS (bytes)"""
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return 0
+    
+    try:
+        resident_pages = int((PROC_DIR / str(pid) / "statm").read_text().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def tree_rss_mb(root_pid: int) -> float:
+    """回傳整個行程樹的 RSS 總和 (MB)"""
+    return sum(process_rss_bytes(pid) for pid in process_tree(root_pid)) / 1024 / 1024
+
+
+def kill_process_tree(root_pid: int) -> None:
+    """由子行程開始強制終止整個行程樹"""
+    for pid in reversed(process_tree(root_pid)):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except (OSError, ProcessLookupError):
+            continue
+
+
+def kill_orphaned_browsers() -> int:
+    """終止父行程已結束的 chromedriver 與帶有本專案標記的 Chrome，回傳終止的行程數"""
+    candidates = []
+    
+    # 在容器中以 PID 1 執行時，自己啟動的行程父行程也是 1，無法分辨是否殘留
+    if os.getpid() == 1:
+        return 0
+    
+    if psutil is not None:
+        for process in psutil.process_iter(['pid', 'ppid', 'name', 'cmdline']):
+            info = process.info
+            cmdline = ' '.join(info.get('cmdline') or [])
+            if info.get('ppid') == 1 and ('chromedriver' in (info.get('name') or '') or MANAGED_BROWSER_FLAG in cmdline):
+                candidates.append(info['pid'])
+    elif PROC_DIR.exists():
+        for pid, parent in _proc_parent_map().items():
+            cmdline = _proc_cmdline(pid)
+            if parent == 1 and ('chromedriver' in cmdline or MANAGED_BROWSER_FLAG in cmdline):
+                candidates.append(pid)
+    
+    for pid in candidates:
+        kill_process_tree(pid)
+    
+    if candidates:
+        print(f"🧹 已清除 {len(candidates)} 個殘留的瀏覽器行程")
+    return len(candidates)
+
+
+class DriverSupervisor:
+    """管理單一 WebDriver 的生命週期：依頁數/記憶體回收並限制每次導覽的時間"""
+    def __init__(self, factory: Callable[[], Any],
+                 max_pages: int = DEFAULT_MAX_PAGES,
+                 max_rss_mb: float = DEFAULT_MAX_RSS_MB,
+                 navigation_timeout: float = DEFAULT_NAVIGATION_TIMEOUT):
+        self.factory = factory
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.navigation_timeout = navigation_timeout
+        self.pages = 0
+        self._driver = None
+        self._orphans_checked = False
+    
+    @property
+    def driver(self) -> Any:
+        """取得目前的驅動，必要時建立新的"""
+        if self._driver is None:
+            # 第一次啟動前先清除前一次執行殘留的瀏覽器
+            if not self._orphans_checked:
+                kill_orphaned_browsers()
+                self._orphans_checked = True
+            self._driver = self.factory()
+            self.pages = 0
+            try:
+                self._driver.set_page_load_timeout(self.navigation_timeout)
+            except Exception as e:
+                print(f"⚠️ 無法設定頁面載入逾時: {e}")
+        return self._driver
+    
+    def driver_pid(self) -> Optional[int]:
+        """回傳 chromedriver 的 pid (遠端驅動時為 None)"""
+        try:
+            return self._driver.service.process.pid
+        except AttributeError:
+            return None
+    
+    def rss_mb(self) -> float:
+        """回傳目前驅動行程樹的 RSS (MB)"""
+        pid = self.driver_pid()
+        return tree_rss_mb(pid) if pid else 0.0
+    
+    def maybe_recycle(self) -> None:
+        """超過頁數或記憶體上限時回收驅動"""
+        if self._driver is None:
+            return
+        
+        if self.pages >= self.max_pages:
+            self.recycle(f"已載入 {self.pages} 頁")
+            return
+        
+        rss = self.rss_mb()
+        if rss > self.max_rss_mb:
+            self.recycle(f"記憶體 {rss:.0f} MB 超過上限 {self.max_rss_mb} MB")
+    
+    def recycle(self, reason: str) -> None:
+        """關閉目前的驅動，下次使用時重新建立"""
+        print(f"♻️ 回收瀏覽器: {reason}")
+        self.quit(release=False)
+    
+    def get(self, url: str) -> None:
+        """在硬性期限內導覽至指定網址，逾時則終止並回收瀏覽器"""
+        self.maybe_recycle()
+        driver = self.driver
+        pid = self.driver_pid()
+        
+        # 頁面載入逾時通常會由 chromedriver 回報；若整個驅動卡住，計時器會直接終止行程樹
+        killed = threading.Event()
+        
+        def kill() -> None:
+            killed.set()
+            print(f"⏱️ 導覽超過 {self.navigation_timeout + KILL_GRACE_SECONDS:.0f} 秒未返回，強制終止瀏覽器")
+            if pid:
+                kill_process_tree(pid)
+            elif hasattr(driver, 'discard'):
+                # 遠端瀏覽器沒有本機行程，直接結束工作階段讓卡住的指令返回
+                driver.discard()
+        
+        timer = threading.Timer(self.navigation_timeout + KILL_GRACE_SECONDS, kill)
+        timer.daemon = True
+        timer.start()
+        
+        try:
+            driver.get(url)
+        except Exception as e:
+            if killed.is_set():
+                self._driver = None
+                raise TimeoutException(f"導覽逾時已終止瀏覽器: {url}") from e
+            if isinstance(e, TimeoutException):
+                # 頁面載入逾時後瀏覽器狀態不可靠，直接回收
+                self.recycle("頁面載入逾時")
+            raise
+        finally:
+            timer.cancel()
+        
+        if killed.is_set():
+            self._driver = None
+            raise TimeoutException(f"導覽逾時已終止瀏覽器: {url}")
+        
+        self.pages += 1
+    
+    def quit(self, release: bool = True) -> None:
+        """關閉驅動，失敗時強制終止行程樹 (release 為 False 時遠端工作階段不放回池中)"""
+        if self._driver is None:
+            return
+        
+        pid = self.driver_pid()
+        try:
+            if not release and hasattr(self._driver, 'discard'):
+                self._driver.discard()
+            else:
+                self._driver.quit()
+        except Exception as e:
+            print(f"⚠️ 關閉瀏覽器時出錯: {e}")
+        finally:
+            if pid and process_tree(pid):
+                kill_process_tree(pid)
+            self._driver = None
+    
+    def __enter__(self) -> 'DriverSupervisor':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.quit()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文章內容補充
+以有上限的並行工作池下載各資料檔中文章連結的頁面，擷取首段摘要、圖片與中繼資料，
+結果依網址快取並設定有效期限，未過期的網址不會重複下載
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+import lxml.html
+import requests
+from requests.adapters import HTTPAdapter
+
+from bbc_trends import get_random_user_agent
+from data_lock import locked_files
+from snapshot_writer import SnapshotBatch
+
+ENRICHMENT_CACHE_FILE = Path("cache") / "enrichment.json"
+
+# 快取有效期限 (秒)
+ENRICHMENT_TTL = 24 * 60 * 60
+# 同時下載的頁面數
+ENRICHMENT_MAX_WORKERS = 6
+# 每次執行最多實際下載的頁面數
+ENRICHMENT_FETCH_BUDGET = 60
+# 首段摘要最短長度與最大長度
+MIN_PARAGRAPH_LENGTH = 20
+MAX_SUMMARY_LENGTH = 200
+
+# 要補充內容的資料檔: (檔案, 文章陣列欄位, 世代批次名稱)
+ENRICHMENT_TARGETS = [
+    ("data/ptt-trends.json", "articles", "ptt"),
+    ("data/komica-trends.json", "trends", "komica"),
+    ("data/bbc-trends.json", "articles", "bbc"),
+]
+
+
+def _meta_content(doc: Any, *names: str) -> str:
+    """依序尋找 meta property/name，回傳第一個非空的 content"""
+    for name in names:
+        values = doc.xpath(f'//meta[@property="{name}" or @name="{name}"]/@content')
+        for value in values:
+            if value.strip():
+                return value.strip()
+    return ""
+
+
+def extract_summary(html: str, url: str) -> Dict[str, str]:
+    """從文章頁面擷取首段摘要、圖片與中繼資料"""
+    doc = lxml.html.fromstring(html, base_url=url)
+    doc.make_links_absolute(url, resolve_base_href=True)
+    
+    summary = ""
+    for paragraph in doc.iter('p'):
+        text = ' '.join(paragraph.text_content().split())
+        if len(text) >= MIN_PARAGRAPH_LENGTH:
+            summary = text
+            break
+    if not summary:
+        summary = _meta_content(doc, 'og:description', 'description')
+    
+    image = _meta_content(doc, 'og:image', 'twitter:image')
+    if not image:
+        images = doc.xpath('//article//img/@src | //img/@src')
+        image = images[0] if images else ""
+    
+    return {
+        "title": _meta_content(doc, 'og:title') or (doc.findtext('.//title') or "").strip(),
+        "summary": summary[:MAX_SUMMARY_LENGTH],
+        "image": urljoin(url, image) if image else "",
+        "siteName": _meta_content(doc, 'og:site_name'),
+        "publishedTime": _meta_content(doc, 'article:published_time', 'pubdate'),
+    }
+
+
+class EnrichmentCache:
+    """以網址為鍵、帶有效期限的補充內容快取"""
+    def __init__(self, path: Path = ENRICHMENT_CACHE_FILE, ttl: float = ENRICHMENT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ 讀取補充內容快取失敗: {e}")
+    
+    def get(self, url: str, now: Optional[float] = None) -> Optional[Dict[str, str]]:
+        """回傳未過期的快取內容"""
+        now = time.time() if now is None else now
+        entry = self.entries.get(url)
+        if entry and now - entry.get("fetched_at", 0) < self.ttl:
+            return entry.get("data")
+        return None
+    
+    def put(self, url: str, data: Dict[str, str]) -> None:
+        self.entries[url] = {"fetched_at": time.time(), "data": data}
+    
+    def save(self) -> None:
+        """移除過期項目後寫回檔案"""
+        now = time.time()
+        self.entries = {
+            url: entry for url, entry in self.entries.items()
+            if now - entry.get("fetched_at", 0) < self.ttl
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            tmp_path.replace(self.path)
+        except OSError as e:
+            print(f"⚠️ 儲存補充內容快取失敗: {e}")
+
+
+def create_session() -> requests.Session:
+    """建立共用連線池的 HTTP Session"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=ENRICHMENT_MAX_WORKERS, pool_maxsize=ENRICHMENT_MAX_WORKERS)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': get_random_user_agent(),
+        'Accept': 'text/html,application/xhtml+xml',
+        'Accept-Language': 'zh-TW,zh;q=0.9,en;q=0.8',
+    })
+    # PTT 18 禁看板需要的 cookie
+    session.cookies.set('over18', '1')
+    return session
+
+
+def fetch_summary(session: requests.Session, url: str) -> Optional[Dict[str, str]]:
+    """下載單一文章頁面並擷取摘要"""
+    try:
+        response = session.get(url, timeout=15)
+        response.raise_for_status()
+        return extract_summary(response.text, response.url)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"⚠️ 補充內容失敗 {url}: {e}")
+        return None
+
+
+def enrich_items(items: List[Dict[str, Any]], cache: EnrichmentCache,
+                 session: requests.Session, budget: List[int],
+                 url_key: str = "link") -> int:
+    """為文章加上 enrichment 欄位，回傳實際下載的頁面數
+
+    budget 為本次執行剩餘的下載額度 (以單一元素的 list 在多個資料檔間共用)
+    """
+    pending: List[str] = []
+    for item in items:
+        url = item.get(url_key)
+        if not url or not url.startswith('http'):
+            continue
+        cached = cache.get(url)
+        if cached is not None:
+            item["enrichment"] = cached
+        elif url not in pending and len(pending) < budget[0]:
+            pending.append(url)
+    
+    if not pending:
+        return 0
+    
+    budget[0] -= len(pending)
+    with ThreadPoolExecutor(max_workers=ENRICHMENT_MAX_WORKERS) as executor:
+        results = dict(zip(pending, executor.map(lambda url: fetch_summary(session, url), pending)))
+    
+    for url, data in results.items():
+        if data is not None:
+            cache.put(url, data)
+    
+    for item in items:
+        data = results.get(item.get(url_key))
+        if data is not None:
+            item["enrichment"] = data
+    
+    return len(pending)
+
+
+def _load(path: Path) -> Any:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def enrich_data_files(targets: List = ENRICHMENT_TARGETS,
+                      fetch_budget: int = ENRICHMENT_FETCH_BUDGET) -> int:
+    """為各資料檔的文章補充內容並寫回，回傳實際下載的頁面數"""
+    cache = EnrichmentCache()
+    budget = [fetch_budget]
+    fetched = 0
+    
+    with create_session() as session:
+        for filename, items_key, source in targets:
+            path = Path(filename)
+            if not path.exists():
+                continue
+            
+            # 下載不持有鎖 (結果進入快取)，避免長時間擋住爬蟲寫入
+            items = _load(path).get(items_key) or []
+            count = enrich_items(items, cache, session, budget)
+            fetched += count
+            print(f"📝 {filename}: {len(items)} 篇文章，新下載 {count} 頁")
+            
+            # 持有鎖重新讀取最新版本，只套用快取中的內容後經由世代批次寫回 (世代紀錄的雜湊一併更新)
+            batch = SnapshotBatch(source)
+            with locked_files([path, batch.path]):
+                data = _load(path)
+                enrich_items(data.get(items_key) or [], cache, session, [0])
+                batch.add(path, data)
+                batch.commit()
+    
+    cache.save()
+    if budget[0] <= 0:
+        print(f"⚠️ 已達本次下載上限 {fetch_budget} 頁，其餘文章留待下次補充")
+    return fetched
@@ -5,41 +5,99 @@ Google 熱搜爬蟲 - Python 版本
 爬取台灣 Google 熱搜榜資料
 """
 
-import json
+import os
 import time
 import random
 import re
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterable, Iterator, List, Dict, Optional
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
 from fake_useragent import UserAgent
 
+import requests
+from bs4 import BeautifulSoup
 
-def setup_driver() -> webdriver.Chrome:
+from browser_profile import BrowserProfile, apply_browser_profile, apply_profile_options
+from driver_watchdog import MANAGED_BROWSER_FLAG, DriverSupervisor
+from network_capture import capture_responses, enable_network_capture, parse_json_body
+from payload_archive import archive_payload
+from remote_browser import create_driver
+from snapshot_writer import SnapshotBatch, write_snapshot
+from trend_item import TAIPEI, TrendItem, parse_count, parse_relative_time, parse_rfc822
+
+class GoogleTrendsTarget:
+    """Google 熱搜目標配置類"""
+    def __init__(self, geo: str, hours: int, filename: str, description: str):
+        self.geo = geo
+        self.hours = hours
+        self.filename = filename
+        self.description = description
+    
+    @property
+    def url(self) -> str:
+        """Selenium 表格頁面網址"""
+        return f'https://trends.google.com.tw/trending?geo={self.geo}&hours={self.hours}'
+    
+    @property
+    def feed_url(self) -> str:
+        """RSS 熱搜摘要網址 (不支援 hours 參數，改以 pubDate 篩選)"""
+        return f'https://trends.google.com/trending/rss?geo={self.geo}'
+
+# Google 熱搜配置 (第一個目標沿用原本的 google-trends.json 檔名)
+GOOGLE_TARGETS = [
+    GoogleTrendsTarget(
+        geo='TW',
+        hours=4,
+        filename='data/google-trends.json',
+        description='台灣 Google 熱搜 (4 小時)'
+    ),
+]
+
+# 取得資料的方式: 'feed' 先以 HTTP 讀取 RSS，失敗時改用 Selenium；'selenium' 只使用 Selenium
+GOOGLE_BACKEND = 'feed'
+
+GOOGLE_TRENDS_URL = GOOGLE_TARGETS[0].url
+
+
+# 瀏覽器資源阻擋設定 (Google Trends 頁面只讀取表格文字)
+BROWSER_PROFILE = BrowserProfile(block=('images', 'media', 'fonts', 'trackers'))
+
+# 網路擷取模式: Selenium 載入頁面時直接讀取 batchexecute 回應，取不到時才解析表格
+# (會在每個瀏覽器開啟 performance log，預設關閉，設定 GOOGLE_NETWORK_CAPTURE=1 開啟)
+GOOGLE_NETWORK_CAPTURE = os.environ.get('GOOGLE_NETWORK_CAPTURE', '0') == '1'
+GOOGLE_CAPTURE_PATTERNS = [r'/_/TrendsUi/data/batchexecute']
+GOOGLE_CAPTURE_TIMEOUT = 10
+
+
+def setup_driver():
     """設定 Chrome WebDriver"""
     options = Options()
     options.add_argument('--headless')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
     options.add_argument('--disable-setuid-sandbox')
+    options.add_argument(MANAGED_BROWSER_FLAG)
     
     # 使用隨機 User-Agent
     ua = UserAgent()
     user_agent = ua.random
     options.add_argument(f'--user-agent={user_agent}')
     
+    # 套用資源阻擋的偏好設定
+    apply_profile_options(options, BROWSER_PROFILE)
+    
+    if GOOGLE_NETWORK_CAPTURE:
+        enable_network_capture(options)
+    
     # 自動下載並安裝最新的 ChromeDriver
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    driver = create_driver(options)
+    apply_browser_profile(driver, BROWSER_PROFILE)
     
     return driver
 
@@ -51,9 +109,238 @@ def random_delay(min_seconds: float = 3, max_seconds: float = 13) -> None:
     time.sleep(delay)
 
 
-def scrape_google_trends() -> List[Dict[str, str]]:
+def build_trend_entry(trend_texts: Iterable[str], count_text: str, time_text: str,
+                      now: Optional[datetime] = None,
+                      started_at: Optional[datetime] = None) -> Optional[TrendItem]:
+    """由表格欄位文字建立單筆趨勢資料，資料不齊全時回傳 None
+
+    搜尋量與相對開始時間在這裡轉成數值分數與 UTC 時間；
+    已知確切時間時傳入 started_at，開始時間改以台灣時間表示，不會隨爬取時間改變
+    """
+    # 提取趨勢關鍵字
+    trend_text = ""
+    for text in trend_texts:
+        text = text.strip()
+        if (text and 
+            "次搜尋" not in text and 
+            "活躍" not in text and 
+            "持續時間" not in text and 
+            "·" not in text):
+            trend_text = text
+            break
+    
+    # 提取搜尋量
+    search_volume = ""
+    count_matches = re.findall(r'(\d+[\d,]*\+)', count_text.strip())
+    for match in count_matches:
+        if re.match(r'^\d+[\d,]*\+$', match):
+            search_volume = match
+            break
+    
+    # 提取開始時間
+    if started_at is not None:
+        started_time = format_started(started_at)
+    else:
+        time_match = re.search(r'(\d+\s*[小時分鐘]+前)', time_text.strip())
+        started_time = time_match.group(1) if time_match else ""
+    
+    # 如果所有資料都齊全才回傳
+    if trend_text and search_volume and started_time:
+        return TrendItem(
+            "google",
+            trend_text,
+            score=parse_count(search_volume),
+            timestamp=started_at or parse_relative_time(started_time, now),
+            extra={"searchVolume": search_volume, "started": started_time},
+        )
+    return None
+
+
+def parse_google_trends_html(html: str) -> List[TrendItem]:
+    """從封存的頁面原始碼解析熱搜表格"""
+    trends = []
+    soup = BeautifulSoup(html, 'lxml')
+    
+    for row in soup.select("tbody tr"):
+        cells = row.find_all("td")
+        if len(cells) <= 3:
+            continue
+        
+        trend_texts = [div.get_text("\n") for div in cells[1].find_all("div")]
+        trend = build_trend_entry(trend_texts, cells[2].get_text("\n"), cells[3].get_text("\n"))
+        if trend:
+            trends.append(trend)
+    
+    return trends
+
+
+def format_search_volume(traffic: str) -> str:
+    """將 RSS 的 approx_traffic (例如 2000+) 轉成表格的格式 (例如 2,000+)"""
+    match = re.match(r'^\s*([\d,]+)\s*(\+?)', traffic)
+    if not match:
+        return ""
+    return f"{int(match.group(1).replace(',', '')):,}{match.group(2)}"
+
+
+def format_started(published: datetime) -> str:
+    """將確切的開始時間轉成台灣時間 (例如 2025-01-20 18:00)
+
+    不使用表格的相對時間 (1 小時前)，否則每次爬取同一個趨勢的內容都不同，被增量與變動事件視為變更
+    """
+    return published.astimezone(TAIPEI).strftime('%Y-%m-%d %H:%M')
+
+
+def parse_google_trends_feed(xml_content: str, hours: Optional[int] = None,
+                             now: Optional[datetime] = None) -> List[TrendItem]:
+    """解析 Google Trends RSS，轉換成與表格相同的欄位；指定 hours 時只保留該時間內開始的趨勢"""
+    now = now or datetime.now(timezone.utc)
+    trends = []
+    soup = BeautifulSoup(xml_content, 'xml')
+    
+    for item in soup.find_all('item'):
+        title_elem = item.find('title')
+        traffic_elem = item.find('approx_traffic')
+        pub_date_elem = item.find('pubDate')
+        if not (title_elem and traffic_elem and pub_date_elem):
+            continue
+        
+        # pubDate 的時區為 -0000 時 parsedate_to_datetime 會回傳不含時區的時間，統一轉成 UTC
+        published = parse_rfc822(pub_date_elem.get_text().strip())
+        if published is None:
+            continue
+        
+        if hours is not None and now - published > timedelta(hours=hours):
+            continue
+        
+        trend = build_trend_entry(
+            [title_elem.get_text()],
+            format_search_volume(traffic_elem.get_text()),
+            "",
+            started_at=published
+        )
+        if trend:
+            trends.append(trend)
+    
+    return trends
+
+
+def _is_trend_row(value) -> bool:
+    """batchexecute 中的趨勢列: [關鍵字, _, 地區, [開始時間], _, _, 搜尋量, ...]"""
+    return (
+        isinstance(value, list) and len(value) > 6 and
+        isinstance(value[0], str) and bool(value[0]) and
+        isinstance(value[3], list) and bool(value[3]) and isinstance(value[3][0], (int, float)) and
+        isinstance(value[6], int)
+    )
+
+
+def _find_trend_rows(value) -> Iterator[list]:
+    if _is_trend_row(value):
+        yield value
+    elif isinstance(value, list):
+        for child in value:
+            yield from _find_trend_rows(child)
+
+
+def parse_google_trends_batchexecute(body: str) -> List[TrendItem]:
+    """解析趨勢頁面的 batchexecute 回應 (每個 wrb.fr 項目的第三欄是另一層 JSON 字串)"""
+    trends = []
+    seen = set()
+    
+    for line in body.splitlines():
+        line = line.strip()
+        if not line.startswith('['):
+            continue
+        try:
+            envelopes = parse_json_body(line)
+        except ValueError:
+            continue
+        
+        for envelope in envelopes:
+            if not (isinstance(envelope, list) and len(envelope) > 2 and
+                    envelope[0] == 'wrb.fr' and isinstance(envelope[2], str)):
+                continue
+            try:
+                payload = parse_json_body(envelope[2])
+            except ValueError:
+                continue
+            
+            for row in _find_trend_rows(payload):
+                if row[0] in seen:
+                    continue
+                published = datetime.fromtimestamp(row[3][0], timezone.utc)
+                trend = build_trend_entry(
+                    [row[0]],
+                    format_search_volume(f"{row[6]}+"),
+                    "",
+                    started_at=published
+                )
+                if trend:
+                    seen.add(row[0])
+                    trends.append(trend)
+    
+    return trends
+
+
+def capture_google_trends(supervisor: DriverSupervisor, url: str) -> List[TrendItem]:
+    """以網路擷取模式載入趨勢頁面，直接解析頁面發出的 batchexecute 回應"""
+    trends = []
+    responses = capture_responses(supervisor, url, GOOGLE_CAPTURE_PATTERNS, timeout=GOOGLE_CAPTURE_TIMEOUT)
+    
+    for response in responses:
+        archive_payload("google_api", response.url, response.body, "application/json")
+        for trend in parse_google_trends_batchexecute(response.body):
+            if all(trend.key != existing.key for existing in trends):
+                trends.append(trend)
+    
+    print(f"📡 擷取 {len(responses)} 個 API 回應，解析出 {len(trends)} 個趨勢")
+    return trends
+
+
+def fetch_google_trends_feed(target: GoogleTrendsTarget,
+                             feed_cache: Optional[Dict[str, str]] = None) -> List[TrendItem]:
+    """以 HTTP 讀取 Google Trends RSS 熱搜摘要 (同一次執行中相同 geo 只下載一次)"""
+    feed_cache = {} if feed_cache is None else feed_cache
+    
+    if target.feed_url not in feed_cache:
+        headers = {
+            'User-Agent': UserAgent().random,
+            'Accept': 'application/rss+xml, application/xml, text/xml',
+            'Accept-Language': 'zh-TW,zh;q=0.9,en;q=0.8',
+        }
+        
+        try:
+            print(f"📡 讀取 RSS 熱搜摘要: {target.feed_url}")
+            response = requests.get(target.feed_url, headers=headers, timeout=30)
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+        except requests.exceptions.RequestException as e:
+            print(f"❌ RSS 請求錯誤: {e}")
+            return []
+        
+        archive_payload("google_feed", target.feed_url, response.text, "application/rss+xml")
+        feed_cache[target.feed_url] = response.text
+    
+    trends = parse_google_trends_feed(feed_cache[target.feed_url], target.hours)
+    print(f"📊 RSS 取得 {len(trends)} 個趨勢")
+    return trends
+
+
+def collect_google_trends(target: GoogleTrendsTarget,
+                          feed_cache: Optional[Dict[str, str]] = None) -> List[TrendItem]:
+    """依 GOOGLE_BACKEND 取得單一目標的熱搜，RSS 沒有資料時改用 Selenium"""
+    if GOOGLE_BACKEND == 'feed':
+        trends = fetch_google_trends_feed(target, feed_cache)
+        if trends:
+            return trends
+        print("⚠️ RSS 沒有資料，改用 Selenium 爬取表格")
+    
+    return scrape_google_trends(target.url)
+
+
+def scrape_google_trends(url: str = GOOGLE_TRENDS_URL) -> List[TrendItem]:
     """爬取 Google 熱搜資料"""
-    driver = setup_driver()
+    supervisor = DriverSupervisor(setup_driver)
     trends = []
     
     try:
@@ -62,8 +349,16 @@ def scrape_google_trends() -> List[Dict[str, str]]:
         # 隨機延遲避免被偵測
         random_delay(3, 13)
         
-        # 前往 Google 趨勢頁面
-        driver.get('https://trends.google.com.tw/trending?geo=TW&hours=4')
+        # 前往 Google 趨勢頁面 (擷取模式下同時讀取 API 回應)
+        if GOOGLE_NETWORK_CAPTURE:
+            trends = capture_google_trends(supervisor, url)
+            if trends:
+                return trends
+            # 頁面已經載入，直接改用表格解析
+            print("⚠️ 沒有擷取到 API 資料，改用表格解析")
+        else:
+            supervisor.get(url)
+        driver = supervisor.driver
         
         # 頁面載入後再次延遲
         random_delay(3, 8)
@@ -77,6 +372,9 @@ def scrape_google_trends() -> List[Dict[str, str]]:
         except TimeoutException:
             print("⚠️ 等待元素載入超時")
         
+        # 封存渲染後的頁面供離線重新解析
+        archive_payload("google", url, driver.page_source)
+        
         # 找到所有表格行
         rows = driver.find_elements(By.CSS_SELECTOR, "tbody tr")
         print(f"📊 找到 {len(rows)} 個表格行")
@@ -95,40 +393,11 @@ def scrape_google_trends() -> List[Dict[str, str]]:
                 count_cell = cells[2]
                 time_cell = cells[3]
                 
-                # 提取趨勢關鍵字
-                trend_text = ""
-                trend_divs = trend_cell.find_elements(By.TAG_NAME, "div")
-                for div in trend_divs:
-                    text = div.text.strip()
-                    if (text and 
-                        "次搜尋" not in text and 
-                        "活躍" not in text and 
-                        "持續時間" not in text and 
-                        "·" not in text):
-                        trend_text = text
-                        break
-                
-                # 提取搜尋量
-                count_text = count_cell.text.strip()
-                search_volume = ""
-                count_matches = re.findall(r'(\d+[\d,]*\+)', count_text)
-                for match in count_matches:
-                    if re.match(r'^\d+[\d,]*\+$', match):
-                        search_volume = match
-                        break
-                
-                # 提取開始時間
-                time_text = time_cell.text.strip()
-                time_match = re.search(r'(\d+\s*[小時分鐘]+前)', time_text)
-                started_time = time_match.group(1) if time_match else ""
-                
-                # 如果所有資料都齊全，加入到結果中
-                if trend_text and search_volume and started_time:
-                    trends.append({
-                        "googleTrend": trend_text,
-                        "searchVolume": search_volume,
-                        "started": started_time
-                    })
+                # 依序讀取趨勢欄位中的 div 文字 (找到關鍵字即停止)、搜尋量與開始時間
+                trend_texts = (div.text for div in trend_cell.find_elements(By.TAG_NAME, "div"))
+                trend = build_trend_entry(trend_texts, count_cell.text, time_cell.text)
+                if trend:
+                    trends.append(trend)
                     
             except Exception as e:
                 print(f"⚠️ 解析行時出錯: {e}")
@@ -138,47 +407,61 @@ def scrape_google_trends() -> List[Dict[str, str]]:
         print(f"❌ 爬取過程中出錯: {e}")
     
     finally:
-        driver.quit()
+        supervisor.quit()
     
     return trends
 
-def save_trends_data(trends: List[Dict[str, str]]) -> Path:
+def save_trends_data(trends: List[TrendItem], filename: str = GOOGLE_TARGETS[0].filename,
+                     batch: Optional[SnapshotBatch] = None) -> Path:
     """儲存趨勢資料到 JSON 檔案"""
     data = {
         "updated": datetime.now().isoformat() + "Z",
-        "trends": trends
+        "trends": [trend.to_dict() for trend in trends]
     }
     
     # 確保 data 資料夾存在
     data_dir = Path("data")
     data_dir.mkdir(exist_ok=True)
     
-    # 寫入 JSON 檔案
-    output_file = data_dir / "google-trends.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # 寫入 JSON 檔案 (傳入 batch 時暫存，commit 時與同一批的檔案一起寫入)
+    output_file = Path(filename)
+    if batch is not None:
+        batch.add(output_file, data)
+        return output_file
+    write_snapshot(output_file, data)
     
     print(f"💾 資料已儲存至: {output_file}")
     return output_file
 
 
-def main() -> None:
-    """主函數"""
+def main() -> bool:
+    """主函數，回傳是否成功取得資料"""
     print("🔍 Google 熱搜爬蟲 - Python 版本")
     print("=" * 50)
     
-    # 爬取資料
-    trends = scrape_google_trends()
-    
-    if trends:
-        # 儲存資料
-        save_trends_data(trends)
+    success = True
+    feed_cache: Dict[str, str] = {}
+    # 所有目標 (地區/時間區間) 的資料檔同一批寫入
+    with SnapshotBatch("google") as batch:
+        for target in GOOGLE_TARGETS:
+            print(f"\n📋 處理: {target.description}")
+            print("-" * 40)
+            
+            # 爬取資料
+            trends = collect_google_trends(target, feed_cache)
+            
+            if trends:
+                # 儲存資料
+                save_trends_data(trends, target.filename, batch)
+                
+                # 顯示結果摘要
+                print("✅ 擷取完成:", [trend.title for trend in trends[:5]])
+                print(f"📊 總共找到 {len(trends)} 個趨勢")
+            else:
+                print("❌ 沒有找到任何趨勢資料")
+                success = False
         
-        # 顯示結果摘要
-        print("✅ 擷取完成:", trends[:5])
-        print(f"📊 總共找到 {len(trends)} 個趨勢")
-    else:
-        print("❌ 沒有找到任何趨勢資料")
+    return success
 
 if __name__ == "__main__":
     main()
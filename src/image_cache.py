@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+圖片快取
+並行下載資料檔中的縮圖，依內容雜湊去重並產生縮小版本，
+再把資料檔中的圖片網址改寫為本機路徑 (原始網址保留在 <欄位>Original)
+"""
+
+import hashlib
+import html
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from PIL import Image
+except ImportError:  # 沒有 Pillow 時只保存原圖，不產生縮圖
+    Image = None
+
+from bbc_trends import get_random_user_agent
+from data_lock import locked_files
+from snapshot_writer import SnapshotBatch
+
+DATA_DIR = Path("data")
+IMAGE_DIR = DATA_DIR / "images"
+# 索引與圖片放在一起，隨資料檔一起保存，跨次執行也不需重新下載
+IMAGE_INDEX_FILE = IMAGE_DIR / "index.json"
+
+IMAGE_MAX_WORKERS = 8
+# 單張圖片大小上限
+IMAGE_MAX_BYTES = 5 * 1024 * 1024
+# 縮圖寬度與 JPEG 品質
+THUMBNAIL_WIDTH = 320
+THUMBNAIL_QUALITY = 80
+# 圖片目錄大小上限，超過時依最近使用時間淘汰
+IMAGE_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+CONTENT_TYPE_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+}
+
+# 圖片欄位: (檔案樣式, 文章陣列欄位, 圖片欄位, 世代批次名稱)，Reddit 另外處理
+IMAGE_TARGETS = [
+    ("ptt-trends*.json", "articles", "imageUrl", "ptt"),
+    ("ptt-all-*.json", "articles", "imageUrl", "ptt"),
+    ("bbc-trends.json", "articles", "thumbnail", "bbc"),
+]
+REDDIT_IMAGE_FILES = "reddit-*.json"
+REDDIT_BATCH = "reddit"
+
+
+def content_digest(content: bytes) -> str:
+    """計算圖片內容的 SHA-256"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def make_thumbnail(content: bytes, width: int = THUMBNAIL_WIDTH) -> Optional[bytes]:
+    """產生指定寬度的 JPEG 縮圖 (原圖較窄時維持原尺寸)"""
+    if Image is None:
+        return None
+    try:
+        with Image.open(BytesIO(content)) as image:
+            image = image.convert('RGB')
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                image = image.resize((width, height), Image.LANCZOS)
+            output = BytesIO()
+            image.save(output, format='JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+            return output.getvalue()
+    except Exception as e:
+        print(f"⚠️ 產生縮圖失敗: {e}")
+        return None
+
+
+class ImageCache:
+    """以內容雜湊保存圖片，記錄網址對應與最近使用時間"""
+    def __init__(self, image_dir: Path = IMAGE_DIR, max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        self.image_dir = image_dir
+        self.index_path = image_dir / "index.json"
+        self.max_bytes = max_bytes
+        self.urls: Dict[str, str] = {}
+        self.objects: Dict[str, Dict[str, Any]] = {}
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                self.urls = index.get("urls", {})
+                self.objects = index.get("objects", {})
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️ 讀取圖片索引失敗: {e}")
+    
+    def lookup(self, url: str) -> Optional[str]:
+        """回傳網址對應的本機縮圖路徑 (相對於 data/)，並更新使用時間"""
+        digest = self.urls.get(url)
+        entry = self.objects.get(digest) if digest else None
+        if entry is None or not (DATA_DIR / entry["thumbnail"]).exists():
+            return None
+        entry["last_used"] = time.time()
+        return entry["thumbnail"]
+    
+    def store(self, url: str, content: bytes, content_type: str) -> str:
+        """保存圖片與縮圖，相同內容只保存一份"""
+        digest = content_digest(content)
+        self.urls[url] = digest
+        entry = self.objects.get(digest)
+        if entry is not None and (DATA_DIR / entry["thumbnail"]).exists():
+            entry["last_used"] = time.time()
+            return entry["thumbnail"]
+        
+        object_dir = self.image_dir / digest[:2]
+        object_dir.mkdir(parents=True, exist_ok=True)
+        extension = CONTENT_TYPE_EXTENSIONS.get(content_type.split(';')[0].strip(), '.img')
+        original_path = object_dir / f"{digest}{extension}"
+        original_path.write_bytes(content)
+        size = len(content)
+        
+        thumbnail = make_thumbnail(content)
+        thumbnail_path = original_path
+        if thumbnail is not None:
+            thumbnail_path = object_dir / f"{digest}-{THUMBNAIL_WIDTH}.jpg"
+            thumbnail_path.write_bytes(thumbnail)
+            size += len(thumbnail)
+        
+        self.objects[digest] = {
+            "original": original_path.relative_to(DATA_DIR).as_posix(),
+            "thumbnail": thumbnail_path.relative_to(DATA_DIR).as_posix(),
+            "size": size,
+            "last_used": time.time(),
+        }
+        return self.objects[digest]["thumbnail"]
+    
+    def touch_paths(self, paths: set) -> set:
+        """更新資料檔仍在使用的本機圖片 (相對於 data/ 的路徑) 的使用時間，回傳對應的內容雜湊"""
+        now = time.time()
+        digests = set()
+        for digest, entry in self.objects.items():
+            if entry["thumbnail"] in paths or entry["original"] in paths:
+                entry["last_used"] = now
+                digests.add(digest)
+        return digests
+    
+    def evict(self, keep: set = frozenset()) -> int:
+        """目錄超過大小上限時，淘汰最久未使用的圖片 (本次用到的圖片不淘汰)，回傳淘汰數量"""
+        total = sum(entry["size"] for entry in self.objects.values())
+        evicted = 0
+        for digest, entry in sorted(self.objects.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if digest in keep:
+                continue
+            for key in ("original", "thumbnail"):
+                (DATA_DIR / entry[key]).unlink(missing_ok=True)
+            total -= entry["size"]
+            del self.objects[digest]
+            evicted += 1
+        
+        if evicted:
+            self.urls = {url: digest for url, digest in self.urls.items() if digest in self.objects}
+            print(f"🧹 淘汰 {evicted} 張最久未使用的圖片")
+        return evicted
+    
+    def save(self) -> None:
+        self.image_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"urls": self.urls, "objects": self.objects}, f, ensure_ascii=False)
+        tmp_path.replace(self.index_path)
+
+
+def create_session() -> requests.Session:
+    """建立共用連線池的 HTTP Session"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=IMAGE_MAX_WORKERS, pool_maxsize=IMAGE_MAX_WORKERS)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': get_random_user_agent(),
+        'Accept': 'image/avif,image/webp,image/*,*/*;q=0.8',
+    })
+    return session
+
+
+def download_image(session: requests.Session, url: str) -> Optional[Tuple[bytes, str]]:
+    """下載單張圖片，回傳 (內容, Content-Type)"""
+    try:
+        with session.get(url, timeout=15, stream=True) as response:
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '')
+            if not content_type.startswith('image/'):
+                print(f"⚠️ 不是圖片 {url}: {content_type}")
+                return None
+            content = response.raw.read(IMAGE_MAX_BYTES + 1, decode_content=True)
+            if len(content) > IMAGE_MAX_BYTES:
+                print(f"⚠️ 圖片過大，略過 {url}")
+                return None
+            return content, content_type
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ 下載圖片失敗 {url}: {e}")
+        return None
+
+
+def reddit_image_url(post: Dict[str, Any]) -> str:
+    """取得 Reddit 貼文的預覽圖或縮圖網址"""
+    images = (post.get("preview") or {}).get("images") or []
+    for image in images:
+        resolutions = image.get("resolutions") or []
+        # 選擇寬度不小於縮圖寬度的最小預覽，沒有則用原圖
+        candidates = [r for r in resolutions if r.get("width", 0) >= THUMBNAIL_WIDTH]
+        source = candidates[0] if candidates else image.get("source") or {}
+        if source.get("url"):
+            return html.unescape(source["url"])
+    return post.get("thumbnail") or ""
+
+
+def image_slots(path: Path, data: Any) -> List[Tuple[Dict, str, str]]:
+    """找出單一資料檔中的圖片欄位: [(物件, 欄位, 原始網址)]
+
+    已改寫為本機路徑的欄位以 <欄位>Original 的原始網址列出，之後的執行仍會更新使用時間
+    """
+    slots = []
+    for pattern, items_key, field, _ in IMAGE_TARGETS:
+        if not path.match(pattern):
+            continue
+        for item in data.get(items_key) or []:
+            url = item.get(field) or ""
+            if not url.startswith('http'):
+                url = item.get(f"{field}Original") or ""
+            if url.startswith('http'):
+                slots.append((item, field, url))
+    
+    if path.match(REDDIT_IMAGE_FILES):
+        # Reddit 資料檔的 listing 存在 original_data 底下
+        listing = data.get("original_data", data)
+        for child in (listing.get("data") or {}).get("children") or []:
+            post = child.get("data") or {}
+            url = reddit_image_url(post)
+            if not url.startswith('http'):
+                url = post.get("thumbnailOriginal") or ""
+            if url.startswith('http'):
+                slots.append((post, "thumbnail", url))
+    return slots
+
+
+def batch_name(path: Path) -> str:
+    """資料檔所屬的世代批次"""
+    for pattern, _, _, source in IMAGE_TARGETS:
+        if path.match(pattern):
+            return source
+    return REDDIT_BATCH
+
+
+def data_files(data_dir: Path = DATA_DIR) -> List[Path]:
+    patterns = [pattern for pattern, _, _, _ in IMAGE_TARGETS] + [REDDIT_IMAGE_FILES]
+    return sorted({path for pattern in patterns for path in data_dir.glob(pattern)})
+
+
+def _load(path: Path) -> Any:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def collect_image_slots(data_dir: Path = DATA_DIR) -> Dict[Path, Tuple[Any, List[Tuple[Dict, str, str]]]]:
+    """讀取資料檔並找出需要處理的圖片欄位: {檔案: (資料, [(物件, 欄位, 網址)])}"""
+    files = {}
+    for path in data_files(data_dir):
+        data = _load(path)
+        files[path] = (data, image_slots(path, data))
+    return files
+
+
+def cache_data_images(data_dir: Path = DATA_DIR) -> int:
+    """下載資料檔中的圖片並改寫為本機路徑，回傳新下載的圖片數"""
+    cache = ImageCache()
+    files = collect_image_slots(data_dir)
+    
+    urls = {url for _, slots in files.values() for _, _, url in slots}
+    pending = sorted(url for url in urls if cache.lookup(url) is None)
+    print(f"🖼️ 共 {len(urls)} 張圖片，需要下載 {len(pending)} 張")
+    
+    if pending:
+        with create_session() as session, ThreadPoolExecutor(max_workers=IMAGE_MAX_WORKERS) as executor:
+            for url, result in zip(pending, executor.map(lambda url: download_image(session, url), pending)):
+                if result is not None:
+                    cache.store(url, *result)
+    
+    groups: Dict[str, List[Path]] = {}
+    for path in files:
+        groups.setdefault(batch_name(path), []).append(path)
+    
+    used_paths = set()
+    for source, paths in groups.items():
+        # 下載期間爬蟲可能已寫入新版，持有鎖重新讀取後再改寫，同一來源的資料檔以同一個世代寫入
+        batch = SnapshotBatch(source)
+        with locked_files([*paths, batch.path]):
+            for path in paths:
+                data = _load(path)
+                changed = False
+                for item, field, url in image_slots(path, data):
+                    local_path = cache.lookup(url)
+                    if local_path is not None and item[field] != local_path:
+                        item[f"{field}Original"] = url
+                        item[field] = local_path
+                        changed = True
+                    if not item[field].startswith('http'):
+                        used_paths.add(item[field])
+                if changed:
+                    batch.add(path, data)
+            batch.commit()
+    
+    # 以資料檔實際引用的本機路徑判斷哪些圖片仍在使用
+    cache.evict(keep=cache.touch_paths(used_paths))
+    cache.save()
+    
+    if Image is None:
+        print("⚠️ 未安裝 Pillow，只保存原圖，不產生縮圖")
+    return len(pending)
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+爬蟲工作佇列
+協調者把 (來源, 目標, 參數) 的工作放進佇列，任意數量的 worker 租用工作並回報結果。
+租約逾時未完成的工作會重新排入佇列，失敗的工作依退避時間重試，超過次數後標記為失敗。
+本機使用 SQLite，正式環境可使用 Redis (需要安裝 redis 套件)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import redis
+except ImportError:  # 沒有 redis 套件時只能使用 SQLite 佇列
+    redis = None
+
+DEFAULT_QUEUE_URL = os.environ.get('TREND_QUEUE_URL', 'sqlite:///cache/jobs.db')
+
+# 租約秒數、最多嘗試次數與重試退避 (秒，依嘗試次數倍增)
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 60
+
+
+class Job:
+    """單一爬蟲工作"""
+    __slots__ = ('id', 'source', 'target', 'params', 'attempts', 'max_attempts', 'owner')
+    
+    def __init__(self, id: str, source: str, target: str, params: Dict[str, Any],
+                 attempts: int = 0, max_attempts: int = DEFAULT_MAX_ATTEMPTS, owner: str = ""):
+        self.id = id
+        self.source = source
+        self.target = target
+        self.params = params
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+        self.owner = owner
+    
+    def __repr__(self) -> str:
+        return f"Job({self.id}, {self.source}, {self.target}, attempt {self.attempts}/{self.max_attempts})"
+
+
+def retry_delay(attempts: int) -> float:
+    return RETRY_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0))
+
+
+class SqliteJobQueue:
+    """以 SQLite 實作的工作佇列 (同一台機器的多個行程可共用)"""
+    def __init__(self, path: Path = Path("cache") / "jobs.db"):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # LeaseKeeper 會在背景執行緒延長租約，連線需可跨執行緒使用並以鎖串行化
+        self.connection = sqlite3.connect(str(path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.lock = threading.RLock()
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                owner TEXT NOT NULL DEFAULT '',
+                lease_expires REAL NOT NULL DEFAULT 0,
+                not_before REAL NOT NULL DEFAULT 0,
+                error TEXT NOT NULL DEFAULT '',
+                result TEXT,
+                updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, not_before);
+        """)
+    
+    def enqueue(self, source: str, target: str, params: Dict[str, Any],
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Optional[str]:
+        """放入工作，同一目標已在佇列或執行中時略過並回傳 None"""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                existing = self.connection.execute(
+                    "SELECT id FROM jobs WHERE source = ? AND target = ? AND status IN ('queued', 'leased')",
+                    (source, target)).fetchone()
+                if existing:
+                    self.connection.execute("COMMIT")
+                    return None
+                job_id = uuid.uuid4().hex
+                self.connection.execute(
+                    "INSERT INTO jobs (id, source, target, params, status, max_attempts, updated) "
+                    "VALUES (?, ?, ?, ?, 'queued', ?, ?)",
+                    (job_id, source, target, json.dumps(params, ensure_ascii=False), max_attempts, time.time()))
+                self.connection.execute("COMMIT")
+                return job_id
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+    
+    def lease(self, owner: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Job]:
+        """租用一個可執行的工作 (排隊中或租約已逾時)"""
+        with self.lock:
+            now = time.time()
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                # 租約逾時且已用完嘗試次數的工作不再重試
+                self.connection.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'lease expired', updated = ? "
+                    "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+                    (now, now))
+                row = self.connection.execute(
+                    "SELECT id, source, target, params, attempts, max_attempts FROM jobs "
+                    "WHERE (status = 'queued' AND not_before <= ?) OR (status = 'leased' AND lease_expires < ?) "
+                    "ORDER BY not_before, updated LIMIT 1",
+                    (now, now)).fetchone()
+                if row is None:
+                    self.connection.execute("COMMIT")
+                    return None
+                self.connection.execute(
+                    "UPDATE jobs SET status = 'leased', owner = ?, attempts = attempts + 1, "
+                    "lease_expires = ?, updated = ? WHERE id = ?",
+                    (owner, now + lease_seconds, now, row[0]))
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            return Job(row[0], row[1], row[2], json.loads(row[3]), row[4] + 1, row[5], owner)
+    
+    def extend(self, job: Job, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """延長租約，工作已被其他 worker 接手時回傳 False"""
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+                (time.time() + lease_seconds, time.time(), job.id, job.owner))
+            return cursor.rowcount == 1
+    
+    def complete(self, job: Job, result: Any) -> bool:
+        """回報成功並保存結果，租約已失效時回傳 False"""
+        with self.lock:
+            cursor = self.connection.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = '', updated = ? "
+                "WHERE id = ? AND owner = ? AND status = 'leased'",
+                (json.dumps(result, ensure_ascii=False), time.time(), job.id, job.owner))
+            return cursor.rowcount == 1
+    
+    def fail(self, job: Job, error: str) -> str:
+        """回報失敗，還有重試次數時延後重新排隊，回傳新的狀態"""
+        with self.lock:
+            status = 'queued' if job.attempts < job.max_attempts else 'failed'
+            self.connection.execute(
+                "UPDATE jobs SET status = ?, error = ?, not_before = ?, updated = ? "
+                "WHERE id = ? AND owner = ? AND status = 'leased'",
+                (status, error[:500], time.time() + retry_delay(job.attempts), time.time(), job.id, job.owner))
+            return status
+    
+    def results(self) -> List[Dict[str, Any]]:
+        """讀取所有已完成工作的結果 (不移除，寫入成功後再以 ack_results 移除)"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, source, target, result FROM jobs WHERE status = 'done' ORDER BY updated").fetchall()
+            return [{"id": row[0], "source": row[1], "target": row[2], "result": json.loads(row[3])} for row in rows]
+    
+    def ack_results(self, ids: List[str]) -> None:
+        """移除已寫入的結果"""
+        with self.lock:
+            self.connection.executemany("DELETE FROM jobs WHERE id = ? AND status = 'done'", [(id,) for id in ids])
+    
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return dict(self.connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+
+# 原子租用: 先把逾時租約 (用完嘗試次數的標記為失敗) 與到期的延後工作放回佇列，再取出一個工作並登記租約
+REDIS_LEASE_SCRIPT = """
+local now = tonumber(ARGV[1])
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+    redis.call('ZREM', KEYS[2], id)
+    local job = redis.call('HMGET', KEYS[4] .. id, 'attempts', 'max_attempts', 'source', 'target')
+    if tonumber(job[1]) >= tonumber(job[2]) then
+        redis.call('HSET', KEYS[4] .. id, 'status', 'failed', 'error', 'lease expired')
+        redis.call('HDEL', KEYS[5], job[3] .. ':' .. job[4])
+    else
+        redis.call('RPUSH', KEYS[1], id)
+    end
+end
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)) do
+    redis.call('ZREM', KEYS[3], id)
+    redis.call('RPUSH', KEYS[1], id)
+end
+local id = redis.call('LPOP', KEYS[1])
+if not id then
+    return nil
+end
+redis.call('ZADD', KEYS[2], now + tonumber(ARGV[2]), id)
+redis.call('HINCRBY', KEYS[4] .. id, 'attempts', 1)
+redis.call('HSET', KEYS[4] .. id, 'owner', ARGV[3], 'status', 'leased')
+return id
+"""
+
+# 原子放入: 登記去重鍵、建立工作與排隊在同一個腳本中完成，中途失敗不會留下沒有工作的去重鍵
+REDIS_ENQUEUE_SCRIPT = """
+if redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[2], 'source', ARGV[3], 'target', ARGV[4], 'params', ARGV[5],
+           'status', 'queued', 'attempts', 0, 'max_attempts', ARGV[6], 'owner', '')
+redis.call('RPUSH', KEYS[3], ARGV[2])
+return 1
+"""
+
+# 以下腳本先確認租約仍屬於呼叫的 worker (工作雜湊的 owner)，確認與更新之間不會被其他 worker 接手
+REDIS_EXTEND_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'owner') ~= ARGV[1] or redis.call('HGET', KEYS[1], 'status') ~= 'leased' then
+    return 0
+end
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[2])
+return 1
+"""
+
+REDIS_COMPLETE_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'owner') ~= ARGV[1] or redis.call('HGET', KEYS[1], 'status') ~= 'leased' then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[2])
+redis.call('HDEL', KEYS[3], ARGV[3])
+redis.call('RPUSH', KEYS[4], ARGV[4])
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+REDIS_FAIL_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'owner') ~= ARGV[1] or redis.call('HGET', KEYS[1], 'status') ~= 'leased' then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[2])
+redis.call('HSET', KEYS[1], 'status', ARGV[4], 'error', ARGV[5])
+if ARGV[4] == 'queued' then
+    redis.call('ZADD', KEYS[3], ARGV[6], ARGV[2])
+else
+    redis.call('HDEL', KEYS[4], ARGV[3])
+end
+return 1
+"""
+
+# 移除已寫入的結果 (依結果中的工作 id)，讀取之後才完成的結果保留到下一次收集
+REDIS_ACK_SCRIPT = """
+local acked = {}
+for _, id in ipairs(ARGV) do
+    acked[id] = true
+end
+for _, raw in ipairs(redis.call('LRANGE', KEYS[1], 0, -1)) do
+    if acked[cjson.decode(raw)['id']] then
+        redis.call('LREM', KEYS[1], 1, raw)
+    end
+end
+return 1
+"""
+
+
+class RedisJobQueue:
+    """以 Redis (或相容服務) 實作的工作佇列，多台機器的 worker 可共用"""
+    def __init__(self, url: str, prefix: str = "trend"):
+        if redis is None:
+            raise RuntimeError("使用 Redis 佇列需要安裝 redis 套件: uv add redis")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.queued_key = f"{prefix}:jobs:queued"
+        self.leased_key = f"{prefix}:jobs:leased"
+        self.delayed_key = f"{prefix}:jobs:delayed"
+        self.active_key = f"{prefix}:jobs:active"
+        self.results_key = f"{prefix}:jobs:results"
+        self.job_prefix = f"{prefix}:job:"
+        self.lease_script = self.client.register_script(REDIS_LEASE_SCRIPT)
+        self.enqueue_script = self.client.register_script(REDIS_ENQUEUE_SCRIPT)
+        self.extend_script = self.client.register_script(REDIS_EXTEND_SCRIPT)
+        self.complete_script = self.client.register_script(REDIS_COMPLETE_SCRIPT)
+        self.fail_script = self.client.register_script(REDIS_FAIL_SCRIPT)
+        self.ack_script = self.client.register_script(REDIS_ACK_SCRIPT)
+    
+    def enqueue(self, source: str, target: str, params: Dict[str, Any],
+                max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> Optional[str]:
+        """放入工作，同一目標已在佇列或執行中時略過並回傳 None"""
+        job_id = uuid.uuid4().hex
+        created = self.enqueue_script(
+            keys=[self.active_key, self.job_prefix + job_id, self.queued_key],
+            args=[f"{source}:{target}", job_id, source, target,
+                  json.dumps(params, ensure_ascii=False), max_attempts])
+        return job_id if created else None
+    
+    def lease(self, owner: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[Job]:
+        """租用一個可執行的工作 (排隊中、延後時間已到或租約已逾時)"""
+        job_id = self.lease_script(
+            keys=[self.queued_key, self.leased_key, self.delayed_key, self.job_prefix, self.active_key],
+            args=[time.time(), lease_seconds, owner])
+        if job_id is None:
+            return None
+        data = self.client.hgetall(self.job_prefix + job_id)
+        return Job(job_id, data["source"], data["target"], json.loads(data["params"]),
+                   int(data["attempts"]), int(data["max_attempts"]), owner)
+    
+    def extend(self, job: Job, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> bool:
+        """延長租約，工作已被其他 worker 接手時回傳 False"""
+        return bool(self.extend_script(
+            keys=[self.job_prefix + job.id, self.leased_key],
+            args=[job.owner, job.id, time.time() + lease_seconds]))
+    
+    def complete(self, job: Job, result: Any) -> bool:
+        """回報成功並保存結果，租約已失效時回傳 False"""
+        return bool(self.complete_script(
+            keys=[self.job_prefix + job.id, self.leased_key, self.active_key, self.results_key],
+            args=[job.owner, job.id, f"{job.source}:{job.target}", json.dumps(
+                {"id": job.id, "source": job.source, "target": job.target, "result": result}, ensure_ascii=False)]))
+    
+    def fail(self, job: Job, error: str) -> str:
+        """回報失敗，還有重試次數時延後重新排隊，回傳新的狀態"""
+        status = 'queued' if job.attempts < job.max_attempts else 'failed'
+        updated = self.fail_script(
+            keys=[self.job_prefix + job.id, self.leased_key, self.delayed_key, self.active_key],
+            args=[job.owner, job.id, f"{job.source}:{job.target}", status, error[:500],
+                  time.time() + retry_delay(job.attempts)])
+        return status if updated else 'lost'
+    
+    def results(self) -> List[Dict[str, Any]]:
+        """讀取所有已完成工作的結果 (不移除，寫入成功後再以 ack_results 移除)"""
+        return [json.loads(item) for item in self.client.lrange(self.results_key, 0, -1)]
+    
+    def ack_results(self, ids: List[str]) -> None:
+        """移除已寫入的結果"""
+        if ids:
+            self.ack_script(keys=[self.results_key], args=ids)
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": self.client.llen(self.queued_key) + self.client.zcard(self.delayed_key),
+            "leased": self.client.zcard(self.leased_key),
+            "done": self.client.llen(self.results_key),
+        }
+
+
+def create_queue(url: str = DEFAULT_QUEUE_URL):
+    """依網址建立佇列: sqlite:///路徑 或 redis://主機:埠/資料庫"""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisJobQueue(url)
+    if url.startswith('sqlite:///'):
+        return SqliteJobQueue(Path(url[len('sqlite:///'):]))
+    raise ValueError(f"不支援的佇列網址: {url}")
@@ -5,24 +5,66 @@ Komica(K島) 熱門文章爬蟲 - Python 版本
 爬取 K島 今日熱門文章 Top 50
 """
 
-import json
 import time
 import random
 import re
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
+from urllib.parse import urljoin
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
 from fake_useragent import UserAgent
 
+from bs4 import BeautifulSoup
+
+from browser_profile import BrowserProfile, apply_browser_profile, apply_profile_options
+from browser_tabs import close_other_tabs, open_tabs, plan_waves
+from cdp_browser import BROWSER_BACKEND, CdpBrowser, cdp_available
+from driver_watchdog import MANAGED_BROWSER_FLAG, DriverSupervisor
+from payload_archive import archive_payload
+from remote_browser import create_driver
+from snapshot_writer import SnapshotBatch, write_snapshot
+from trend_item import TrendItem, parse_local_time
+
+class KomicaBoard:
+    """Komica 看板配置類"""
+    def __init__(self, host: str, board: str, filename: str, description: str):
+        self.host = host
+        self.board = board
+        self.filename = filename
+        self.description = description
+    
+    @property
+    def url(self) -> str:
+        return f'https://{self.host}/{self.board}/catlist.php'
+    
+    def thread_link(self, thread_id: str) -> str:
+        return f'https://{self.host}/{self.board}/pixmicat.php?res={thread_id}'
+
+# Komica 看板配置 (第一個看板沿用原本的 komica-trends.json 檔名)
+KOMICA_BOARDS = [
+    KomicaBoard(
+        host='gita.komica1.org',
+        board='00b',
+        filename='data/komica-trends.json',
+        description='K島 綜合'
+    ),
+]
+
+# 多個看板依回覆數合併排名後的輸出檔案
+KOMICA_MERGED_FILENAME = 'data/komica-trends-merged.json'
+
+# 同一主機同時載入的分頁數上限
+KOMICA_MAX_TABS_PER_HOST = 2
+
+# 瀏覽器資源阻擋設定 (Komica 只讀取 pre 標籤中的文字)
+BROWSER_PROFILE = BrowserProfile(block=('images', 'media', 'fonts', 'trackers'))
+
 def setup_driver():
     """設定 Chrome WebDriver"""
     options = Options()
@@ -30,19 +72,25 @@ def setup_driver():
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
     options.add_argument('--disable-setuid-sandbox')
+    options.add_argument(MANAGED_BROWSER_FLAG)
     
     # 使用隨機 User-Agent
     ua = UserAgent()
     user_agent = ua.random
     options.add_argument(f'--user-agent={user_agent}')
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    # 套用資源阻擋的偏好設定
+    apply_profile_options(options, BROWSER_PROFILE)
+    
+    driver = create_driver(options)
+    apply_browser_profile(driver, BROWSER_PROFILE)
     
     return driver
 
-def parse_komica_line(line: str, link: str = None) -> Optional[Dict]:
-    """解析 Komica 文章行資料"""
+def parse_komica_line(line: str, link: str = None,
+                      board: Optional[KomicaBoard] = None) -> Optional[TrendItem]:
+    """解析 Komica 文章行資料 (回覆數與發文時間轉成數值分數與 UTC 時間)"""
+    board = board or KOMICA_BOARDS[0]
     try:
         # 移除行尾的"在新分頁開啟"文字
         line = line.replace('在新分頁開啟', '').strip()
@@ -68,17 +116,22 @@ def parse_komica_line(line: str, link: str = None) -> Optional[Dict]:
             if link:
                 final_link = link
             else:
-                final_link = f"https://gita.komica1.org/00b/pixmicat.php?res={thread_id}"
+                final_link = board.thread_link(thread_id)
             
-            return {
-                "replyCount": reply_count,
-                "date": date,
-                "time": time,
-                "title": title,
-                "description": description,
-                "link": final_link,
-                "rawText": line  # 保留原始文字以備查看
-            }
+            # 原始行文字已隨頁面封存 (payload_archive)，不再重複保留
+            return TrendItem(
+                "komica",
+                title,
+                final_link,
+                score=reply_count,
+                timestamp=parse_local_time(f"{date} {time}"),
+                extra={
+                    "replyCount": reply_count,
+                    "date": date,
+                    "time": time,
+                    "description": description
+                },
+            )
             
     except Exception as e:
         print(f"⚠️ 解析行資料時出錯: {e}")
@@ -86,138 +139,237 @@ def parse_komica_line(line: str, link: str = None) -> Optional[Dict]:
     
     return None
 
-def scrape_komica_trends():
-    """爬取 Komica 熱門文章"""
-    driver = setup_driver()
+def parse_komica_page(html: str, board: Optional[KomicaBoard] = None) -> List[TrendItem]:
+    """從 catlist 頁面原始碼解析今日熱門討論串"""
+    board = board or KOMICA_BOARDS[0]
     trends = []
+    soup = BeautifulSoup(html, 'lxml')
     
-    try:
-        print("🚀 開始爬取 Komica 熱門文章...")
-        
-        # 前往 Komica 頁面
-        driver.get('https://gita.komica1.org/00b/catlist.php')
-        
-        print("⏳ 載入網頁...")
-        
-        # 等待 pre 標籤載入
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "pre"))
-            )
-            print("✅ 找到 pre 標籤")
-        except TimeoutException:
-            print("⚠️ 等待 pre 元素載入超時")
-        
-        # 找到所有 pre 標籤
-        pre_elements = driver.find_elements(By.TAG_NAME, "pre")
-        print(f"找到 pre 標籤數量: {len(pre_elements)}")
-        
-        # 找到包含今日熱門的 pre 標籤
-        today_threads_pre = None
+    # 找到所有 pre 標籤
+    pre_elements = soup.find_all('pre')
+    print(f"找到 pre 標籤數量: {len(pre_elements)}")
+    
+    # 找到包含今日熱門的 pre 標籤
+    today_threads_pre = None
+    for i, pre in enumerate(pre_elements):
+        if "Top 50 Threads [Today]" in pre.get_text():
+            today_threads_pre = pre
+            print(f"✅ 在第 {i+1} 個 pre 標籤中找到今日熱門討論串")
+            break
+    
+    if not today_threads_pre:
+        print("❌ 未找到包含今日熱門討論串的 pre 標籤")
+        # 列出所有 pre 標籤的內容供除錯
         for i, pre in enumerate(pre_elements):
-            pre_text = pre.text
-            if "Top 50 Threads [Today]" in pre_text:
-                today_threads_pre = pre
-                print(f"✅ 在第 {i+1} 個 pre 標籤中找到今日熱門討論串")
-                break
-        
-        if not today_threads_pre:
-            print("❌ 未找到包含今日熱門討論串的 pre 標籤")
-            # 列出所有 pre 標籤的內容供除錯
-            for i, pre in enumerate(pre_elements):
-                content = pre.text[:100]  # 只顯示前100個字元
-                print(f"Pre {i+1}: {content}...")
-            return []
-        
-        # 解析內容
-        print("🔍 開始解析今日熱門討論串內容...")
+            content = pre.get_text()[:100]  # 只顯示前100個字元
+            print(f"Pre {i+1}: {content}...")
+        return []
+    
+    # 解析內容
+    print("🔍 開始解析今日熱門討論串內容...")
+    
+    # 獲取 HTML 內容而不是純文字
+    content = today_threads_pre.decode_contents()
+    
+    # 按行分割
+    lines = content.split('\n')
+    
+    # 找到包含連結的行
+    for line in lines:
+        line = line.strip()
         
-        # 獲取 HTML 內容而不是純文字
-        content = today_threads_pre.get_attribute('innerHTML')
+        # 跳過空行
+        if not line:
+            continue
         
-        # 按行分割
-        lines = content.split('\n')
+        # 檢查是否包含連結
+        if 'href=' in line and 'res=' in line:
+            # 提取連結
+            link_match = re.search(r'href="([^"]+)"', line)
+            if link_match:
+                # 相對連結以看板網址補齊
+                link = urljoin(board.url, link_match.group(1))
+                
+                # 移除 HTML 標籤，保留純文字
+                raw_text = re.sub(r'<[^>]*>', '', line)
+                
+                # 移除標題部分
+                if 'Top 50 Threads [Today]' in raw_text:
+                    raw_text = raw_text.replace('Top 50 Threads [Today]', '').strip()
+                
+                # 確保還有內容
+                if raw_text and '|' in raw_text:
+                    trend_data = parse_komica_line(raw_text, link, board)
+                    if trend_data:
+                        trends.append(trend_data)
+                        print(f"✅ 第 {len(trends)} 篇: {trend_data.title[:40]}...")
+    
+    return trends
+
+def extract_board_trends(supervisor: DriverSupervisor, board: KomicaBoard) -> List[TrendItem]:
+    """從目前分頁解析單一看板的今日熱門討論串"""
+    driver = supervisor.driver
+    
+    # 等待 pre 標籤載入
+    try:
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.TAG_NAME, "pre"))
+        )
+        print("✅ 找到 pre 標籤")
+    except TimeoutException:
+        print("⚠️ 等待 pre 元素載入超時")
+    
+    # 取得頁面原始碼後一次解析，並封存供離線重新解析
+    page_source = driver.page_source
+    archive_payload("komica", board.url, page_source)
+    return parse_komica_page(page_source, board)
+
+def scrape_komica_boards_cdp(boards: List[KomicaBoard]) -> Dict[str, List[TrendItem]]:
+    """以 CDP 後端在同一條連線的多個分頁並行爬取看板 (不經過 chromedriver)"""
+    boards_by_url = {board.url: board for board in boards}
+    results: Dict[str, List[TrendItem]] = {board.filename: [] for board in boards}
+    
+    def handle(page, url: str) -> List[TrendItem]:
+        if not page.wait_for("pre", timeout=10):
+            print("⚠️ 等待 pre 元素載入超時")
+        page_source = page.page_source()
+        archive_payload("komica", url, page_source)
+        return parse_komica_page(page_source, boards_by_url[url])
+    
+    print(f"🚀 開始以 CDP 爬取 Komica 熱門文章 ({len(boards)} 個看板)...")
+    with CdpBrowser(BROWSER_PROFILE, UserAgent().random) as browser:
+        for wave in plan_waves(list(boards_by_url), KOMICA_MAX_TABS_PER_HOST):
+            for url, trends in browser.render_pages(wave, handle, max_pages=len(wave)).items():
+                board = boards_by_url[url]
+                if isinstance(trends, Exception):
+                    print(f"❌ 處理 {board.description} 時出錯: {trends}")
+                    continue
+                results[board.filename] = trends
+                print(f"📊 {board.description} 找到 {len(trends)} 篇熱門文章")
+    
+    return results
+
+def scrape_komica_boards(boards: Optional[List[KomicaBoard]] = None) -> Dict[str, List[TrendItem]]:
+    """在同一個瀏覽器中以分頁並行爬取多個看板 (同一主機同時最多 KOMICA_MAX_TABS_PER_HOST 個)"""
+    boards = boards or KOMICA_BOARDS
+    
+    if BROWSER_BACKEND == 'cdp' and cdp_available():
+        try:
+            return scrape_komica_boards_cdp(boards)
+        except Exception as e:
+            print(f"⚠️ CDP 後端失敗，改用 Selenium: {e}")
+    
+    boards_by_url = {board.url: board for board in boards}
+    results: Dict[str, List[TrendItem]] = {board.filename: [] for board in boards}
+    supervisor = DriverSupervisor(setup_driver)
+    
+    try:
+        print(f"🚀 開始爬取 Komica 熱門文章 ({len(boards)} 個看板)...")
         
-        # 找到包含連結的行
-        for line in lines:
-            line = line.strip()
+        for wave in plan_waves(list(boards_by_url), KOMICA_MAX_TABS_PER_HOST):
+            print("⏳ 載入網頁...")
+            handles = open_tabs(supervisor, wave)
             
-            # 跳過空行
-            if not line:
-                continue
+            for url, handle in zip(wave, handles):
+                board = boards_by_url[url]
+                print(f"\n📋 處理: {board.description} ({url})")
+                print("-" * 40)
+                try:
+                    supervisor.driver.switch_to.window(handle)
+                    results[board.filename] = extract_board_trends(supervisor, board)
+                    print(f"📊 {board.description} 找到 {len(results[board.filename])} 篇熱門文章")
+                except Exception as e:
+                    print(f"❌ 處理 {board.description} 時出錯: {e}")
             
-            # 檢查是否包含連結
-            if 'href=' in line and 'res=' in line:
-                # 提取連結
-                import re
-                link_match = re.search(r'href="([^"]+)"', line)
-                if link_match:
-                    link = link_match.group(1)
-                    
-                    # 移除 HTML 標籤，保留純文字
-                    raw_text = re.sub(r'<[^>]*>', '', line)
-                    
-                    # 移除標題部分
-                    if 'Top 50 Threads [Today]' in raw_text:
-                        raw_text = raw_text.replace('Top 50 Threads [Today]', '').strip()
-                    
-                    # 確保還有內容
-                    if raw_text and '|' in raw_text:
-                        trend_data = parse_komica_line(raw_text, link)
-                        if trend_data:
-                            trends.append(trend_data)
-                            print(f"✅ 第 {len(trends)} 篇: {trend_data['title'][:40]}...")
-        
-        print(f"📊 總共找到 {len(trends)} 篇熱門文章")
+            # 下一批沿用第一個分頁，其餘關閉
+            close_other_tabs(supervisor, handles[0])
         
     except Exception as e:
         print(f"❌ 爬取過程中出錯: {e}")
     
     finally:
-        driver.quit()
+        supervisor.quit()
     
-    return trends
+    return results
+
+def scrape_komica_trends() -> List[TrendItem]:
+    """爬取 Komica 熱門文章 (預設看板)"""
+    board = KOMICA_BOARDS[0]
+    return scrape_komica_boards([board])[board.filename]
 
-def save_komica_data(trends):
+def merge_komica_trends(results: Dict[str, List[TrendItem]]) -> List[TrendItem]:
+    """合併多個看板的熱門文章，依連結去重並依回覆數排名"""
+    boards_by_filename = {board.filename: board for board in KOMICA_BOARDS}
+    merged: Dict[str, TrendItem] = {}
+    
+    for filename, trends in results.items():
+        board = boards_by_filename.get(filename)
+        for trend in trends:
+            if trend.key not in merged:
+                merged[trend.key] = trend.with_extra(board=board.board if board else "")
+    
+    return sorted(merged.values(), key=lambda trend: trend.score, reverse=True)
+
+def save_komica_data(trends: List[TrendItem], filename: str = KOMICA_BOARDS[0].filename,
+                     batch: Optional[SnapshotBatch] = None):
     """儲存 Komica 資料到 JSON 檔案"""
     data = {
         "updated": datetime.now().isoformat() + "Z",
-        "trends": trends
+        "trends": [trend.to_dict() for trend in trends]
     }
     
     # 確保 data 資料夾存在
     data_dir = Path("data")
     data_dir.mkdir(exist_ok=True)
     
-    # 寫入 JSON 檔案
-    output_file = data_dir / "komica-trends.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # 寫入 JSON 檔案 (傳入 batch 時暫存，commit 時與同一批的檔案一起寫入)
+    output_file = Path(filename)
+    if batch is not None:
+        batch.add(output_file, data)
+        return output_file
+    write_snapshot(output_file, data)
     
     print(f"💾 資料已儲存至: {output_file}")
     return output_file
 
-def main():
-    """主函數"""
+def main() -> bool:
+    """主函數，回傳是否成功取得資料"""
     print("🎯 Komica(K島) 熱門文章爬蟲 - Python 版本")
     print("=" * 50)
     
     # 爬取資料
-    trends = scrape_komica_trends()
+    results = scrape_komica_boards(KOMICA_BOARDS)
     
-    if trends:
-        # 儲存資料
-        save_komica_data(trends)
+    # 各看板與合併檔同一批寫入，讀者不會看到新舊混雜的一組檔案
+    with SnapshotBatch("komica") as batch:
+        for board in KOMICA_BOARDS:
+            trends = results.get(board.filename, [])
+            if trends:
+                # 儲存資料
+                save_komica_data(trends, board.filename, batch)
+                print(f"✅ {board.description}: {len(trends)} 篇熱門文章")
+            else:
+                print(f"❌ {board.description}: 沒有找到任何熱門文章")
         
+        if len(KOMICA_BOARDS) > 1:
+            trends = merge_komica_trends(results)
+            if trends:
+                save_komica_data(trends, KOMICA_MERGED_FILENAME, batch)
+        else:
+            trends = results.get(KOMICA_BOARDS[0].filename, [])
+    
+    if trends:
         # 顯示結果摘要
         print("✅ 爬取完成!")
         print(f"📊 總共找到 {len(trends)} 篇熱門文章")
         
         # 顯示前幾篇文章標題
         for i, trend in enumerate(trends[:5], 1):
-            print(f"{i}. [{trend.get('replyCount', 0)} 回覆] {trend.get('title', 'N/A')[:50]}...")
+            print(f"{i}. [{trend.score} 回覆] {trend.title[:50]}...")
+        return True
     else:
         print("❌ 沒有找到任何熱門文章")
+        return False
 
 if __name__ == "__main__":
     main()
@@ -5,10 +5,14 @@
 統一執行所有爬蟲任務
 """
 
+import os
 import sys
+import time
+import signal
 import argparse
+import subprocess
 from pathlib import Path
-from typing import Callable, List, Tuple
+from typing import Callable, List, Optional, Tuple
 
 # 添加當前目錄到 Python 路徑
 current_dir = Path(__file__).parent
@@ -16,11 +20,24 @@ sys.path.append(str(current_dir))
 
 # 導入各個爬蟲模組
 try:
-    from google_trends import main as google_main
-    from ptt_trends import main as ptt_main
-    from komica_trends import main as komica_main
-    from reddit_trends import main as reddit_main
-    from bbc_trends import main as bbc_main
+    from google_trends import (
+        main as google_main, parse_google_trends_batchexecute, parse_google_trends_feed, parse_google_trends_html
+    )
+    from ptt_trends import main as ptt_main, parse_ptt_api_body, parse_ptt_html
+    from komica_trends import main as komica_main, parse_komica_page
+    from reddit_trends import main as reddit_main, parse_reddit_payload
+    from bbc_trends import main as bbc_main, parse_rss_feed
+    from payload_archive import reparse_archive
+    from source_health import SourceHealth
+    from enrichment import ENRICHMENT_FETCH_BUDGET, enrich_data_files
+    from image_cache import cache_data_images
+    from search_index import SearchIndex
+    from profiling import RunProfiler
+    from job_queue import DEFAULT_LEASE_SECONDS, DEFAULT_QUEUE_URL, create_queue
+    from change_stream import serve_changes
+    from publisher import PUBLISH_GROUPS, PUBLISH_URL, Publisher, collect_files, create_store, restore_files
+    from poll_schedule import PollSchedule, source_fingerprint
+    from scrape_jobs import JOB_RUNNERS, default_worker_id, enqueue_jobs, run_worker, save_job_results
 except ImportError as e:
     print(f"❌ 導入爬蟲模組失敗: {e}")
     print("請確保已安裝所有依賴套件: uv sync")
@@ -32,7 +49,9 @@ def run_google_scraper() -> bool:
     print("🔍 執行 Google 熱搜爬蟲")
     print("=" * 50)
     try:
-        google_main()
+        if not google_main():
+            print("❌ Google 熱搜爬蟲沒有取得資料\n")
+            return False
         print("✅ Google 熱搜爬蟲執行完成\n")
         return True
     except Exception as e:
@@ -44,7 +63,9 @@ def run_ptt_scraper() -> bool:
     print("📰 執行 PTT 熱門文章爬蟲")
     print("=" * 50)
     try:
-        ptt_main()
+        if not ptt_main():
+            print("❌ PTT 熱門文章爬蟲沒有取得資料\n")
+            return False
         print("✅ PTT 熱門文章爬蟲執行完成\n")
         return True
     except Exception as e:
@@ -57,7 +78,9 @@ def run_komica_scraper() -> bool:
     print("🎯 執行 Komica(K島) 熱門文章爬蟲")
     print("=" * 50)
     try:
-        komica_main()
+        if not komica_main():
+            print("❌ Komica 熱門文章爬蟲沒有取得資料\n")
+            return False
         print("✅ Komica 熱門文章爬蟲執行完成\n")
         return True
     except Exception as e:
@@ -70,7 +93,9 @@ def run_reddit_scraper() -> bool:
     print("🔥 執行 Reddit 熱門文章爬蟲")
     print("=" * 50)
     try:
-        reddit_main()
+        if not reddit_main():
+            print("❌ Reddit 熱門文章爬蟲沒有取得資料\n")
+            return False
         print("✅ Reddit 熱門文章爬蟲執行完成\n")
         return True
     except Exception as e:
@@ -83,7 +108,9 @@ def run_bbc_scraper() -> bool:
     print("📰 執行 BBC 中文新聞爬蟲")
     print("=" * 50)
     try:
-        bbc_main()
+        if not bbc_main():
+            print("❌ BBC 中文新聞爬蟲沒有取得資料\n")
+            return False
         print("✅ BBC 中文新聞爬蟲執行完成\n")
         return True
     except Exception as e:
@@ -91,47 +118,401 @@ def run_bbc_scraper() -> bool:
         return False
 
 
-def run_all_scrapers() -> bool:
-    """執行所有爬蟲"""
+def run_scraper_process(source: str, timeout: float, profile: bool = False) -> Optional[bool]:
+    """在子行程執行單一爬蟲，超過 timeout 秒時中止整個行程群組 (包含瀏覽器)
+
+    回傳是否成功，逾時回傳 None
+    """
+    command = [sys.executable, os.path.abspath(__file__), source, '--supervised']
+    if profile:
+        command.append('--profile')
+    process = subprocess.Popen(command, start_new_session=True)
+    try:
+        return process.wait(timeout=timeout) == 0
+    except subprocess.TimeoutExpired:
+        return None
+    finally:
+        if process.poll() is None:
+            if hasattr(os, 'killpg'):
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+            process.wait()
+
+
+def run_single_scraper(source: str, scraper_func: Callable[[], bool], use_health: bool = True,
+                       profiler: Optional[RunProfiler] = None, record_health: bool = True) -> bool:
+    """執行單一爬蟲並記錄來源健康狀態
+
+    斷路器開啟中時略過 (保留上次成功的資料檔，不視為失敗)；
+    all 模式的子行程傳入 record_health=False，健康狀態由父行程判斷與記錄
+    """
+    if not record_health:
+        return profiler.run(source, scraper_func) if profiler else scraper_func()
+    
+    health = SourceHealth()
+    if use_health and not health.allow(source):
+        print(f"🔌 略過 {source}: 斷路器開啟中，{health.retry_in(source) / 60:.0f} 分鐘後再試\n")
+        return True
+    
+    started = time.monotonic()
+    success = profiler.run(source, scraper_func) if profiler else scraper_func()
+    duration = time.monotonic() - started
+    if success:
+        health.record_success(source, duration)
+    else:
+        health.record_failure(source, "沒有取得資料或執行失敗", duration)
+    health.save()
+    return success
+
+
+def run_all_scrapers(deadline: Optional[float] = None, use_health: bool = True,
+                     profiler: Optional[RunProfiler] = None, use_schedule: bool = False) -> bool:
+    """執行所有爬蟲
+
+    斷路器開啟中的來源會直接略過 (保留上次成功的資料檔)；
+    use_schedule 時尚未到達自適應輪詢時間的來源也會略過 (預設不略過，但仍記錄每次的變動以更新排程)；
+    設定 deadline (秒) 時，預估會超過剩餘時間的爬蟲也會略過，
+    其餘爬蟲在子行程以剩餘時間為上限執行，到期即中止；
+    傳入 profiler 時每個爬蟲各自輸出效能分析檔案 (有 deadline 時由子行程各自輸出)
+    """
     print("🚀 執行所有爬蟲任務")
     print("=" * 60)
     
     scrapers = [
-        ("Google 熱搜", run_google_scraper),
-        ("PTT 熱門文章", run_ptt_scraper),
-        ("Komica 熱門文章", run_komica_scraper),
-        ("Reddit 熱門文章", run_reddit_scraper),
-        ("BBC 中文新聞", run_bbc_scraper)
+        ("google", "Google 熱搜", run_google_scraper),
+        ("ptt", "PTT 熱門文章", run_ptt_scraper),
+        ("komica", "Komica 熱門文章", run_komica_scraper),
+        ("reddit", "Reddit 熱門文章", run_reddit_scraper),
+        ("bbc", "BBC 中文新聞", run_bbc_scraper)
     ]
     
+    health = SourceHealth()
+    schedule = PollSchedule()
+    run_started = time.monotonic()
     results = []
     
-    for name, scraper_func in scrapers:
-        success = scraper_func()
-        results.append((name, success))
+    for source, name, scraper_func in scrapers:
+        if use_health and not health.allow(source):
+            print(f"🔌 略過 {name}: 斷路器開啟中，{health.retry_in(source) / 60:.0f} 分鐘後再試\n")
+            results.append((name, "circuit_open"))
+            continue
+        
+        if use_schedule and schedule.due_in(source) > 0:
+            print(f"🕒 略過 {name}: {schedule.due_in(source) / 60:.0f} 分鐘後才需要再次輪詢\n")
+            results.append((name, "not_due"))
+            continue
+        
+        if deadline is not None:
+            remaining = deadline - (time.monotonic() - run_started)
+            expected = health.expected_duration(source) or 0
+            if remaining <= 0 or expected > remaining:
+                print(f"⏰ 略過 {name}: 剩餘 {max(remaining, 0):.0f} 秒，不足以執行 (上次耗時 {expected:.0f} 秒)\n")
+                results.append((name, "deadline"))
+                continue
+        
+        started = time.monotonic()
+        if deadline is not None:
+            print(f"⏰ 執行 {name}，最多 {remaining:.0f} 秒")
+            success = run_scraper_process(source, remaining, profile=profiler is not None)
+        else:
+            success = profiler.run(source, scraper_func) if profiler else scraper_func()
+        duration = time.monotonic() - started
+        
+        if success:
+            health.record_success(source, duration)
+        elif success is None:
+            print(f"⏰ {name} 執行超過期限，已中止\n")
+            health.record_failure(source, "執行超過期限被中止", duration)
+        else:
+            health.record_failure(source, "沒有取得資料或執行失敗", duration)
+        health.save()
+        
+        fingerprint = source_fingerprint(source) if success else None
+        previous = schedule.state(source)["fingerprint"]
+        interval = schedule.record_poll(source, fingerprint, success)
+        schedule.save()
+        if success:
+            change_label = "有變動" if fingerprint != previous else "沒有變動"
+            print(f"🕒 {name} 內容{change_label}，下次輪詢間隔 {interval / 60:.0f} 分鐘\n")
+        results.append((name, "success" if success else "timeout" if success is None else "failed"))
     
     # 顯示總結
     print("=" * 60)
     print("📊 執行結果總結:")
     print("=" * 60)
     
+    status_labels = {
+        "success": "✅ 成功",
+        "failed": "❌ 失敗",
+        "circuit_open": "🔌 略過 (斷路器開啟)",
+        "deadline": "⏰ 略過 (超過期限)",
+        "timeout": "⏰ 中止 (執行超過期限)",
+        "not_due": "🕒 略過 (尚未到期)",
+    }
     success_count = 0
-    for name, success in results:
-        status = "✅ 成功" if success else "❌ 失敗"
-        print(f"{status} - {name}")
-        if success:
+    for name, status in results:
+        print(f"{status_labels[status]} - {name}")
+        if status == "success":
             success_count += 1
     
     print("-" * 60)
     print(f"🎯 成功執行: {success_count}/{len(scrapers)} 個爬蟲")
+    print(f"⏱️ 總耗時: {time.monotonic() - run_started:.1f} 秒")
+    
+    # 斷路器略過的來源是已知故障，尚未到期的來源沒有需要更新，都不視為本次執行失敗
+    return all(status in ("success", "circuit_open", "not_due") for _, status in results)
+
+# 各來源離線重新解析時使用的解析器
+REPARSERS = {
+    "google": parse_google_trends_html,
+    "google_feed": parse_google_trends_feed,
+    "google_api": parse_google_trends_batchexecute,
+    "ptt": parse_ptt_html,
+    "ptt_api": parse_ptt_api_body,
+    "komica": parse_komica_page,
+    "reddit": parse_reddit_payload,
+    "bbc": parse_rss_feed,
+}
+
+
+def run_reparse(source: Optional[str], since: Optional[str]) -> bool:
+    """以目前的解析器重新解析封存的原始內容 (不會發出任何網路請求)"""
+    print("🗄️ 重新解析封存的原始內容")
+    print("=" * 50)
+    try:
+        counts = reparse_archive(REPARSERS, source=source, since=since)
+    except Exception as e:
+        print(f"❌ 重新解析失敗: {e}\n")
+        return False
+    
+    if not counts:
+        print("⚠️ 沒有符合條件的封存內容")
+    for name, count in counts.items():
+        print(f"✅ {name}: {count} 筆 → archive/reparsed/{name}.ndjson")
+    return True
+
+
+def run_enrichment(fetch_budget: int) -> bool:
+    """為 PTT、Komica、BBC 資料檔補充文章摘要與圖片"""
+    print("📝 補充文章內容")
+    print("=" * 50)
+    try:
+        fetched = enrich_data_files(fetch_budget=fetch_budget)
+    except Exception as e:
+        print(f"❌ 補充文章內容失敗: {e}\n")
+        return False
+    
+    print(f"✅ 補充完成，本次下載 {fetched} 頁\n")
+    return True
+
+
+def run_image_cache() -> bool:
+    """下載資料檔中的縮圖並改寫為本機路徑"""
+    print("🖼️ 快取縮圖")
+    print("=" * 50)
+    try:
+        downloaded = cache_data_images()
+    except Exception as e:
+        print(f"❌ 快取縮圖失敗: {e}\n")
+        return False
+    
+    print(f"✅ 縮圖快取完成，本次下載 {downloaded} 張\n")
+    return True
+
+def run_index() -> bool:
+    """把所有資料檔的項目增量寫入全文搜尋索引"""
+    print("🔎 更新全文搜尋索引")
+    print("=" * 50)
+    try:
+        index = SearchIndex()
+        started = time.monotonic()
+        counts = index.index_data_files()
+        index.close()
+    except Exception as e:
+        print(f"❌ 更新搜尋索引失敗: {e}\n")
+        return False
+    
+    print(f"✅ 新增 {counts['inserted']} 筆、更新 {counts['updated']} 筆、未變動 {counts['unchanged']} 筆 "
+          f"({time.monotonic() - started:.2f} 秒)\n")
+    return True
+
+
+def run_search(query: Optional[str], days: Optional[float], source: Optional[str], limit: int) -> bool:
+    """在全文搜尋索引中查詢"""
+    if not query:
+        print("❌ 請提供搜尋字串，例如: python src/main.py search 颱風 --days 7")
+        return False
+    
+    try:
+        index = SearchIndex()
+        started = time.monotonic()
+        results = index.search(query, days=days, source=source, limit=limit)
+        elapsed_ms = (time.monotonic() - started) * 1000
+        index.close()
+    except Exception as e:
+        print(f"❌ 搜尋失敗: {e}")
+        return False
+    
+    print(f"🔎 「{query}」共 {len(results)} 筆 ({elapsed_ms:.1f} ms)")
+    print("-" * 60)
+    for result in results:
+        print(f"[{result['source']}] {result['title']}")
+        print(f"    {result['link'] or '-'}  (最後出現 {result['last_seen'][:16]})")
+    return True
+
+def run_schedule_status() -> bool:
+    """顯示各來源的自適應輪詢排程"""
+    print("🕒 自適應輪詢排程")
+    print("=" * 50)
+    rows = PollSchedule().summary()
+    if not rows:
+        print("⚠️ 尚無排程紀錄，請先執行 all 模式")
+        return True
+    
+    for row in rows:
+        gap = f"{row['change_gap'] / 60:.0f} 分鐘" if row['change_gap'] else "未知"
+        ratio = f"{row['change_ratio']:.0%}" if row['change_ratio'] is not None else "-"
+        print(f"{row['source']:<8} 間隔 {row['interval'] / 60:>4.0f} 分鐘  "
+              f"{row['due_in'] / 60:>4.0f} 分鐘後到期  平均變動間隔 {gap}  變動比例 {ratio}")
+    return True
+
+
+def run_change_stream(host: str, port: int) -> bool:
+    """啟動 SSE 變動事件串流伺服器"""
+    print("📡 啟動變動事件串流")
+    print("=" * 50)
+    try:
+        serve_changes(host, port)
+    except KeyboardInterrupt:
+        print("\n⏹️ 串流伺服器已停止")
+    except OSError as e:
+        print(f"❌ 無法啟動串流伺服器: {e}")
+        return False
+    return True
+
+
+def run_publish(store_url: str, source: Optional[str]) -> bool:
+    """把資料檔與增量發佈到物件儲存"""
+    print("☁️ 發佈資料檔到物件儲存")
+    print("=" * 50)
+    if not store_url:
+        print("❌ 請以 --store 或 PUBLISH_URL 指定發佈目的地 (s3://bucket/前綴 或 file:///目錄)")
+        return False
+    group = source or "all"
+    if group != "all" and group not in PUBLISH_GROUPS:
+        print(f"❌ {group} 沒有可發佈的資料檔")
+        return False
+    
+    try:
+        files = collect_files(group)
+        if not files:
+            print(f"⚠️ {group} 沒有資料檔")
+            return False
+        Publisher(create_store(store_url)).publish(group, files)
+    except Exception as e:
+        print(f"❌ 發佈失敗: {e}")
+        return False
+    return True
+
+
+def run_restore(store_url: str, source: Optional[str]) -> bool:
+    """從物件儲存取回上次發佈的資料檔與增量 (CI 爬取前使用)"""
+    print("📥 從物件儲存取回資料檔")
+    print("=" * 50)
+    if not store_url:
+        print("❌ 請以 --store 或 PUBLISH_URL 指定發佈目的地 (s3://bucket/前綴 或 file:///目錄)")
+        return False
+    group = source or "all"
+    if group != "all" and group not in PUBLISH_GROUPS:
+        print(f"❌ {group} 沒有可取回的資料檔")
+        return False
+    
+    try:
+        restore_files(create_store(store_url), group)
+    except Exception as e:
+        print(f"❌ 取回失敗: {e}")
+        return False
+    return True
+
+
+def run_enqueue(queue_url: str, source: Optional[str]) -> bool:
+    """把爬蟲目標排入分散式工作佇列"""
+    print(f"📥 排入爬蟲工作 ({queue_url})")
+    print("=" * 50)
+    if source and source not in JOB_RUNNERS:
+        print(f"❌ 不支援排入的來源: {source}")
+        return False
+    try:
+        queue = create_queue(queue_url)
+        added = enqueue_jobs(queue, [source] if source else None)
+        print(f"✅ 新增 {added} 個工作，佇列狀態: {queue.stats()}\n")
+        return True
+    except Exception as e:
+        print(f"❌ 排入工作失敗: {e}\n")
+        return False
+
+
+def run_queue_worker(queue_url: str, worker_id: Optional[str], lease_seconds: float,
+                     max_jobs: Optional[int], once: bool) -> bool:
+    """以 worker 身分租用並執行佇列中的爬蟲工作"""
+    print(f"👷 執行爬蟲 worker ({queue_url})")
+    print("=" * 50)
+    try:
+        queue = create_queue(queue_url)
+        completed = run_worker(queue, worker_id or default_worker_id(), lease_seconds=lease_seconds,
+                               max_jobs=max_jobs, exit_when_idle=once)
+    except KeyboardInterrupt:
+        print("\n⏹️ Worker 已停止")
+        return True
+    except Exception as e:
+        print(f"❌ Worker 執行失敗: {e}\n")
+        return False
     
-    return success_count == len(scrapers)
+    print(f"✅ 完成 {completed} 個工作\n")
+    return True
+
+
+def run_collect(queue_url: str) -> bool:
+    """把 worker 回報的結果寫入 data/"""
+    print(f"📦 收集爬蟲結果 ({queue_url})")
+    print("=" * 50)
+    try:
+        queue = create_queue(queue_url)
+        results = queue.results()
+        saved = save_job_results(results)
+        # 寫入成功後才移除結果，寫入失敗時下次收集會重試
+        queue.ack_results([entry["id"] for entry in results])
+        print(f"✅ 寫入 {saved} 個結果，佇列狀態: {queue.stats()}\n")
+        return True
+    except Exception as e:
+        print(f"❌ 收集結果失敗: {e}\n")
+        return False
 
 def main() -> None:
     """主函數"""
     parser = argparse.ArgumentParser(description='熱門趨勢爬蟲 - Python 版本')
-    parser.add_argument('scraper', nargs='?', choices=['google', 'ptt', 'komica', 'reddit', 'bbc', 'all'], 
-                       default='all', help='選擇要執行的爬蟲 (預設: all)')
+    parser.add_argument('scraper', nargs='?', choices=['google', 'ptt', 'komica', 'reddit', 'bbc', 'all', 'reparse', 'enrich', 'images', 'index', 'search', 'enqueue', 'worker', 'collect', 'schedule', 'serve', 'publish', 'restore'], 
+                       default='all', help='選擇要執行的爬蟲 (預設: all)，reparse 為離線重新解析封存內容，enrich 為補充文章內容，images 為快取縮圖，index/search 為全文搜尋，enqueue/worker/collect 為分散式執行，schedule 為顯示輪詢排程，serve 為 SSE 變動事件串流，publish/restore 為發佈到物件儲存與取回')
+    parser.add_argument('query', nargs='?', help='search 時的搜尋字串 (多個詞以空白分隔，需同時符合)')
+    parser.add_argument('--source', choices=list(REPARSERS), help='reparse/search/enqueue/publish/restore 時只處理指定來源')
+    parser.add_argument('--since', help='reparse 時只處理此時間 (ISO 格式，例如 2025-07-01) 之後的封存內容')
+    parser.add_argument('--days', type=float, help='search 時只列出最近幾天出現過的項目')
+    parser.add_argument('--limit', type=int, default=20, help='search 時最多列出的筆數')
+    parser.add_argument('--deadline', type=float, help='all 模式的整體執行期限 (秒)，爬蟲在子行程執行，到期即中止')
+    parser.add_argument('--fetch-budget', type=int, default=ENRICHMENT_FETCH_BUDGET, help='enrich 時本次最多下載的頁面數')
+    parser.add_argument('--ignore-health', action='store_true', help='忽略斷路器，斷路器開啟中的來源也照常執行')
+    parser.add_argument('--schedule', action='store_true', help='all 模式依自適應輪詢排程略過尚未到期的來源 (預設執行所有爬蟲)')
+    parser.add_argument('--queue', default=DEFAULT_QUEUE_URL, help='工作佇列網址 (sqlite:///cache/jobs.db 或 redis://主機:6379/0)')
+    parser.add_argument('--worker-id', help='worker 名稱 (預設: 主機名稱-行程編號)')
+    parser.add_argument('--lease', type=float, default=DEFAULT_LEASE_SECONDS, help='worker 每次租用工作的秒數 (執行中會自動延長)')
+    parser.add_argument('--max-jobs', type=int, help='worker 最多處理的工作數')
+    parser.add_argument('--once', action='store_true', help='worker 在佇列清空後結束')
+    parser.add_argument('--host', default='0.0.0.0', help='serve 時監聽的位址')
+    parser.add_argument('--port', type=int, default=8765, help='serve 時監聽的埠號')
+    parser.add_argument('--store', default=PUBLISH_URL, help='publish/restore 的目的地 (s3://bucket/前綴 或 file:///目錄，預設為 PUBLISH_URL)')
+    parser.add_argument('--supervised', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--profile', action='store_true', help='以 cProfile、堆疊取樣與 tracemalloc 分析每個爬蟲 (輸出到 cache/profiles/)')
     
     args = parser.parse_args()
     
@@ -140,22 +521,53 @@ def main() -> None:
     print("🌐 Hot Now: https://hotnow.garylin.dev")
     print("=" * 60)
     
-    if args.scraper == 'google':
-        success = run_google_scraper()
-    elif args.scraper == 'ptt':
-        success = run_ptt_scraper()
-    elif args.scraper == 'komica':
-        success = run_komica_scraper()
-    elif args.scraper == 'reddit':
-        success = run_reddit_scraper()
-    elif args.scraper == 'bbc':
-        success = run_bbc_scraper()
+    single_scrapers = {
+        'google': run_google_scraper,
+        'ptt': run_ptt_scraper,
+        'komica': run_komica_scraper,
+        'reddit': run_reddit_scraper,
+        'bbc': run_bbc_scraper,
+    }
+    profiler = RunProfiler() if args.profile else None
+    
+    if args.scraper in single_scrapers:
+        success = run_single_scraper(args.scraper, single_scrapers[args.scraper],
+                                     use_health=not args.ignore_health, profiler=profiler,
+                                     record_health=not args.supervised)
     elif args.scraper == 'all':
-        success = run_all_scrapers()
+        success = run_all_scrapers(deadline=args.deadline, use_health=not args.ignore_health,
+                                   profiler=profiler, use_schedule=args.schedule)
+    elif args.scraper == 'reparse':
+        success = run_reparse(args.source, args.since)
+    elif args.scraper == 'enrich':
+        success = run_enrichment(args.fetch_budget)
+    elif args.scraper == 'images':
+        success = run_image_cache()
+    elif args.scraper == 'index':
+        success = run_index()
+    elif args.scraper == 'search':
+        success = run_search(args.query, args.days, args.source, args.limit)
+    elif args.scraper == 'schedule':
+        success = run_schedule_status()
+    elif args.scraper == 'serve':
+        success = run_change_stream(args.host, args.port)
+    elif args.scraper == 'publish':
+        success = run_publish(args.store, args.source)
+    elif args.scraper == 'restore':
+        success = run_restore(args.store, args.source)
+    elif args.scraper == 'enqueue':
+        success = run_enqueue(args.queue, args.source)
+    elif args.scraper == 'worker':
+        success = run_queue_worker(args.queue, args.worker_id, args.lease, args.max_jobs, args.once)
+    elif args.scraper == 'collect':
+        success = run_collect(args.queue)
     else:
         print(f"❌ 未知的爬蟲類型: {args.scraper}")
         success = False
     
+    if profiler and profiler.summary:
+        print(f"📈 效能分析檔案: {profiler.output_dir}")
+    
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
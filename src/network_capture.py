@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+網路回應擷取
+開啟 Chrome performance log 後，從 DevTools 的 Network 事件挑出符合網址樣式的 API 回應，
+直接讀取 JSON 內容，不需要等待頁面渲染也不需要走訪 DOM
+"""
+
+import base64
+import json
+import re
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+# XSSI 防護前綴 (例如 Google 的 )]}')
+XSSI_PREFIX_PATTERN = re.compile(r"^\)\]\}'?\s*")
+
+
+class CapturedResponse(NamedTuple):
+    """擷取到的單一回應"""
+    url: str
+    status: int
+    mime_type: str
+    body: str
+
+
+def enable_network_capture(options) -> None:
+    """在 Chrome Options 開啟 performance log (chromedriver 會一併啟用 Network 事件)"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def parse_json_body(body: str) -> Any:
+    """解析 JSON 回應內容 (會先移除 XSSI 前綴)"""
+    return json.loads(XSSI_PREFIX_PATTERN.sub('', body, count=1))
+
+
+def find_records(payload: Any, required: Sequence[str]) -> Iterator[Dict[str, Any]]:
+    """遞迴尋找包含所有必要欄位的物件"""
+    if isinstance(payload, dict):
+        if all(key in payload for key in required):
+            yield payload
+            return
+        for value in payload.values():
+            yield from find_records(value, required)
+    elif isinstance(payload, list):
+        for value in payload:
+            yield from find_records(value, required)
+
+
+def first_value(record: Dict[str, Any], aliases: Sequence[str], default: Any = "") -> Any:
+    """依序取第一個存在且非空的欄位"""
+    for alias in aliases:
+        value = record.get(alias)
+        if value not in (None, ""):
+            return value
+    return default
+
+
+class NetworkCapture:
+    """讀取 performance log，收集符合網址樣式的回應內容"""
+    def __init__(self, driver, url_patterns: Sequence[str]):
+        self.driver = driver
+        self.patterns = [re.compile(pattern) for pattern in url_patterns]
+        self.pending: Dict[str, Tuple[str, int, str]] = {}
+        self.responses: List[CapturedResponse] = []
+    
+    def matches(self, url: str) -> bool:
+        return any(pattern.search(url) for pattern in self.patterns)
+    
+    def reset(self) -> None:
+        """丟棄目前為止的事件 (導覽前呼叫，避免混入上一頁的回應)"""
+        self.driver.get_log('performance')
+        self.pending.clear()
+        self.responses = []
+    
+    def drain(self) -> None:
+        """處理新的 Network 事件，已完成載入的回應會讀取內容"""
+        for entry in self.driver.get_log('performance'):
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            
+            method = message.get('method')
+            params = message.get('params', {})
+            request_id = params.get('requestId')
+            
+            if method == 'Network.responseReceived':
+                response = params.get('response', {})
+                if self.matches(response.get('url', '')):
+                    self.pending[request_id] = (
+                        response['url'], response.get('status', 0), response.get('mimeType', ''))
+            elif method == 'Network.loadingFinished' and request_id in self.pending:
+                self._read_body(request_id)
+            elif method == 'Network.loadingFailed':
+                self.pending.pop(request_id, None)
+    
+    def _read_body(self, request_id: str) -> None:
+        url, status, mime_type = self.pending.pop(request_id)
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            print(f"⚠️ 無法讀取回應內容 {url}: {e}")
+            return
+        
+        body = result.get('body', '')
+        if result.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        self.responses.append(CapturedResponse(url, status, mime_type, body))
+    
+    def wait(self, min_responses: int = 1, timeout: float = 10.0,
+             settle: float = 0.5, poll: float = 0.2) -> List[CapturedResponse]:
+        """等待至少 min_responses 個回應，之後再多等 settle 秒收集接續的請求"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self.drain()
+            if len(self.responses) >= min_responses and not self.pending:
+                time.sleep(settle)
+                self.drain()
+                break
+            time.sleep(poll)
+        return list(self.responses)
+
+
+def capture_responses(supervisor, url: str, url_patterns: Sequence[str],
+                      timeout: float = 10.0, min_responses: int = 1) -> List[CapturedResponse]:
+    """以 DriverSupervisor 導覽到 url，回傳頁面發出且符合樣式的 API 回應"""
+    # 先決定是否回收瀏覽器，確保擷取的是導覽時實際使用的 driver
+    supervisor.maybe_recycle()
+    capture = NetworkCapture(supervisor.driver, url_patterns)
+    capture.reset()
+    supervisor.get(url)
+    return capture.wait(min_responses=min_responses, timeout=timeout)
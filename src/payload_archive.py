@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原始回應封存與離線重新解析
+將每次爬取看到的 HTML/XML/JSON 以內容雜湊壓縮封存，並可在不連網的情況下重新執行解析器
+"""
+
+import gzip
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# 封存目錄結構:
+#   archive/objects/<前兩碼>/<sha256>.gz  壓縮後的原始內容 (相同內容只存一份)
+#   archive/index.ndjson                  每次爬取一行的索引
+#   archive/reparsed/<source>.ndjson      重新解析的結果
+ARCHIVE_DIR = Path("archive")
+
+
+def payload_digest(payload: bytes) -> str:
+    """計算原始內容的 SHA-256 雜湊"""
+    return hashlib.sha256(payload).hexdigest()
+
+
+def object_path(digest: str, archive_dir: Path = ARCHIVE_DIR) -> Path:
+    """回傳雜湊對應的封存檔路徑"""
+    return archive_dir / "objects" / digest[:2] / f"{digest}.gz"
+
+
+def archive_payload(source: str, target: str, payload: str,
+                    content_type: str = "text/html",
+                    archive_dir: Path = ARCHIVE_DIR) -> Optional[str]:
+    """封存一次爬取的原始內容，回傳內容雜湊；封存失敗不影響爬蟲本身"""
+    try:
+        data = payload.encode('utf-8')
+        digest = payload_digest(data)
+        
+        path = object_path(digest, archive_dir)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            with gzip.open(tmp_path, 'wb', compresslevel=6) as f:
+                f.write(data)
+            tmp_path.replace(path)
+        
+        entry = {
+            "source": source,
+            "target": target,
+            "digest": digest,
+            "content_type": content_type,
+            "size": len(data),
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with open(archive_dir / "index.ndjson", 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        
+        print(f"🗄️ 已封存原始內容: {digest[:12]} ({len(data)} bytes)")
+        return digest
+    
+    except Exception as e:
+        print(f"⚠️ 封存原始內容時出錯: {e}")
+        return None
+
+
+def load_payload(digest: str, archive_dir: Path = ARCHIVE_DIR) -> str:
+    """讀取封存的原始內容"""
+    with gzip.open(object_path(digest, archive_dir), 'rb') as f:
+        return f.read().decode('utf-8')
+
+
+def iter_archive_index(source: Optional[str] = None, since: Optional[str] = None,
+                       archive_dir: Path = ARCHIVE_DIR) -> Iterator[Dict[str, Any]]:
+    """依序讀取封存索引，可依來源與起始時間 (ISO 格式) 篩選"""
+    index_file = archive_dir / "index.ndjson"
+    if not index_file.exists():
+        return
+    
+    with open(index_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if source and entry.get("source") != source:
+                continue
+            if since and entry.get("fetched_at", "") < since:
+                continue
+            yield entry
+
+
+def _to_json(obj: Any) -> Any:
+    """解析結果中的 TrendItem 轉成輸出格式"""
+    if hasattr(obj, 'to_dict'):
+        return obj.to_dict()
+    raise TypeError(f"無法序列化 {type(obj).__name__}")
+
+
+def reparse_archive(parsers: Dict[str, Callable[[str], Any]],
+                    source: Optional[str] = None,
+                    since: Optional[str] = None,
+                    archive_dir: Path = ARCHIVE_DIR) -> Dict[str, int]:
+    """以目前的解析器重新解析封存內容
+
+    相同雜湊的內容只會讀取與解析一次，結果依來源寫入 archive/reparsed/<source>.ndjson
+    """
+    memo: Dict[str, Any] = {}
+    outputs: Dict[str, Any] = {}
+    counts: Dict[str, int] = {}
+    output_dir = archive_dir / "reparsed"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    try:
+        for entry in iter_archive_index(source, since, archive_dir):
+            entry_source = entry["source"]
+            parser = parsers.get(entry_source)
+            if parser is None:
+                continue
+            
+            memo_key = f"{entry_source}:{entry['digest']}"
+            if memo_key not in memo:
+                try:
+                    memo[memo_key] = parser(load_payload(entry["digest"], archive_dir))
+                except Exception as e:
+                    print(f"⚠️ 重新解析 {entry['digest'][:12]} 時出錯: {e}")
+                    memo[memo_key] = None
+            
+            if entry_source not in outputs:
+                outputs[entry_source] = open(output_dir / f"{entry_source}.ndjson", 'w', encoding='utf-8')
+                counts[entry_source] = 0
+            
+            record = {
+                "fetched_at": entry.get("fetched_at"),
+                "target": entry.get("target"),
+                "digest": entry["digest"],
+                "result": memo[memo_key],
+            }
+            outputs[entry_source].write(json.dumps(record, ensure_ascii=False, default=_to_json) + "\n")
+            counts[entry_source] += 1
+    
+    finally:
+        for f in outputs.values():
+            f.close()
+    
+    print(f"🧮 共解析 {len(memo)} 份不重複的原始內容")
+    return counts
+
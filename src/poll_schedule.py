@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自適應輪詢排程
+每次爬取後以內容雜湊比對前一次的資料，估計每個來源平均多久變動一次，
+變動快的來源 (Google 熱搜、Reddit r/all) 縮短間隔，變動慢的 (BBC RSS、Komica) 拉長間隔，
+間隔限制在各來源的上下限內，同一主機兩次請求之間也保留最短間隔
+"""
+
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from data_sources import DATA_DIR, DATA_SOURCES, REDDIT_FILES
+from trend_item import TrendItem, reddit_item
+
+SCHEDULE_FILE = Path("cache") / "poll-schedule.json"
+
+# 各來源的輪詢間隔上下限 (秒)
+POLL_BOUNDS = {
+    "google": (15 * 60, 2 * 60 * 60),
+    "ptt": (10 * 60, 2 * 60 * 60),
+    "komica": (30 * 60, 12 * 60 * 60),
+    "reddit": (15 * 60, 3 * 60 * 60),
+    "bbc": (30 * 60, 12 * 60 * 60),
+}
+DEFAULT_POLL_BOUNDS = (30 * 60, 6 * 60 * 60)
+
+# 各來源請求的主機與同一主機兩次請求的最短間隔 (秒)
+SOURCE_HOSTS = {
+    "google": "trends.google.com",
+    "ptt": "www.pttweb.cc",
+    "komica": "gita.komica1.org",
+    "reddit": "www.reddit.com",
+    "bbc": "feeds.bbci.co.uk",
+}
+HOST_MIN_INTERVAL = 5 * 60
+
+# 變動間隔的指數移動平均權重，以及每個預期變動週期內輪詢的次數
+CHANGE_GAP_ALPHA = 0.3
+POLLS_PER_CHANGE = 2
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def source_fingerprint(source: str, data_dir: Path = DATA_DIR) -> Optional[str]:
+    """以來源資料檔中項目的識別鍵與順序計算內容雜湊 (忽略 updated 等每次都會變的欄位)
+
+    資料檔不完整或無法讀取時回傳 None，該來源視為需要重新爬取
+    """
+    keys: List[str] = []
+    
+    try:
+        if source == "reddit":
+            for path in sorted(data_dir.glob(REDDIT_FILES)):
+                with open(path, 'r', encoding='utf-8') as f:
+                    listing = json.load(f).get("original_data") or {}
+                keys.append(path.name)
+                keys.extend(reddit_item(child.get("data") or {}).key
+                            for child in (listing.get("data") or {}).get("children") or [])
+        else:
+            for name, pattern, items_key in DATA_SOURCES:
+                if name != source:
+                    continue
+                for path in sorted(data_dir.glob(pattern)):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        items = json.load(f).get(items_key) or []
+                    keys.append(path.name)
+                    keys.extend(TrendItem.from_dict(source, item).key for item in items)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ 讀取 {source} 資料檔失敗，無法計算內容雜湊: {e}")
+        return None
+    
+    if not keys:
+        return None
+    return hashlib.sha1("\n".join(keys).encode('utf-8')).hexdigest()
+
+
+class PollSchedule:
+    """所有來源的輪詢排程 (持久化在 cache/poll-schedule.json)"""
+    def __init__(self, path: Path = SCHEDULE_FILE):
+        self.path = path
+        self.sources: Dict[str, Dict[str, Any]] = self._load()
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ 讀取輪詢排程失敗: {e}")
+            return {}
+    
+    def state(self, source: str) -> Dict[str, Any]:
+        """取得 (必要時建立) 某來源的排程狀態"""
+        return self.sources.setdefault(source, {
+            "interval": POLL_BOUNDS.get(source, DEFAULT_POLL_BOUNDS)[0],
+            "next_due": 0,
+            "last_polled": None,
+            "last_changed": None,
+            "change_gap": None,
+            "fingerprint": None,
+            "polls": 0,
+            "changes": 0,
+        })
+    
+    def host_ready_in(self, source: str, now: Optional[float] = None) -> float:
+        """同一主機距離允許下一次請求的秒數"""
+        now = time.time() if now is None else now
+        host = SOURCE_HOSTS.get(source)
+        last_polled = max((state.get("last_polled") or 0 for name, state in self.sources.items()
+                           if SOURCE_HOSTS.get(name) == host), default=0)
+        return max(0.0, last_polled + HOST_MIN_INTERVAL - now)
+    
+    def due_in(self, source: str, now: Optional[float] = None) -> float:
+        """距離該來源下一次輪詢的秒數 (0 表示已到期)"""
+        now = time.time() if now is None else now
+        return max(self.state(source)["next_due"] - now, self.host_ready_in(source, now), 0.0)
+    
+    def record_poll(self, source: str, fingerprint: Optional[str], success: bool = True,
+                    now: Optional[float] = None) -> float:
+        """記錄一次輪詢結果並重新計算間隔，回傳新的間隔 (秒)"""
+        now = time.time() if now is None else now
+        state = self.state(source)
+        min_interval, max_interval = POLL_BOUNDS.get(source, DEFAULT_POLL_BOUNDS)
+        state["last_polled"] = now
+        
+        if not success or fingerprint is None:
+            # 失敗時以最短間隔重試 (連續失敗由斷路器處理)
+            state["next_due"] = now + min_interval
+            return min_interval
+        
+        state["polls"] += 1
+        last_changed = state["last_changed"]
+        if fingerprint != state["fingerprint"]:
+            state["changes"] += 1
+            if state["fingerprint"] is not None and last_changed is not None:
+                gap = now - last_changed
+                previous_gap = state["change_gap"]
+                state["change_gap"] = gap if previous_gap is None else (
+                    CHANGE_GAP_ALPHA * gap + (1 - CHANGE_GAP_ALPHA) * previous_gap)
+            state["fingerprint"] = fingerprint
+            state["last_changed"] = now
+            expected_gap = state["change_gap"]
+        else:
+            # 沒有變動時，已經等待的時間就是變動間隔的下限
+            waited = now - (last_changed or now)
+            expected_gap = max(state["change_gap"] or 0, waited) or None
+        
+        if expected_gap is None:
+            interval = state["interval"]
+        else:
+            interval = expected_gap / POLLS_PER_CHANGE
+        interval = min(max(interval, min_interval), max_interval)
+        state["interval"] = round(interval)
+        state["next_due"] = now + interval
+        return interval
+    
+    def summary(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """各來源的排程狀態 (供 CLI 顯示)"""
+        now = time.time() if now is None else now
+        rows = []
+        for source in sorted(self.sources):
+            state = self.sources[source]
+            rows.append({
+                "source": source,
+                "interval": state["interval"],
+                "due_in": self.due_in(source, now),
+                "change_gap": state["change_gap"],
+                "change_ratio": state["changes"] / state["polls"] if state["polls"] else None,
+                "last_changed": _isoformat(state["last_changed"]),
+            })
+        return rows
+    
+    def save(self) -> None:
+        """寫回排程檔案"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.sources, f, ensure_ascii=False, indent=2)
+            tmp_path.replace(self.path)
+        except OSError as e:
+            print(f"⚠️ 儲存輪詢排程失敗: {e}")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+效能分析
+以 cProfile (決定性) 與取樣器 (所有執行緒的呼叫堆疊) 包裝爬蟲，並用 tracemalloc 記錄記憶體峰值。
+每個爬蟲輸出 <名稱>.pstats、<名稱>.collapsed (可直接交給 flamegraph.pl / speedscope) 與 summary.json
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+PROFILE_DIR = Path("cache") / "profiles"
+# 取樣間隔 (秒)
+SAMPLE_INTERVAL = 0.005
+# 終端機顯示的函式數
+TOP_FUNCTIONS = 15
+
+
+def frame_label(frame: Any) -> str:
+    """堆疊中單一層的名稱 (不可包含分號)"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+
+
+class StackSampler:
+    """背景執行緒定期取樣所有執行緒的呼叫堆疊，累計為 collapsed stack 格式"""
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+    
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(thread_id, str(thread_id)).replace(';', ':'))
+                self.stacks[';'.join(reversed(labels))] += 1
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+    
+    def write(self, path: Path) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RunProfiler:
+    """為每個爬蟲輸出效能分析檔案到同一個目錄"""
+    def __init__(self, output_dir: Optional[Path] = None):
+        self.output_dir = output_dir or PROFILE_DIR / datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.summary: Dict[str, Dict[str, Any]] = {}
+    
+    def run(self, name: str, func: Callable[[], Any]) -> Any:
+        """執行 func 並記錄 cProfile、取樣堆疊與記憶體峰值"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        profiler = cProfile.Profile()
+        sampler = StackSampler()
+        
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        elif hasattr(tracemalloc, 'reset_peak'):  # Python 3.9+
+            tracemalloc.reset_peak()
+        
+        started = time.perf_counter()
+        sampler.start()
+        profiler.enable()
+        try:
+            return func()
+        finally:
+            profiler.disable()
+            sampler.stop()
+            duration = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            if not tracing:
+                tracemalloc.stop()
+            self._write(name, profiler, sampler, duration, peak)
+    
+    def wrap(self, name: str, func: Callable[[], Any]) -> Callable[[], Any]:
+        return lambda: self.run(name, func)
+    
+    def _write(self, name: str, profiler: cProfile.Profile, sampler: StackSampler,
+               duration: float, peak: int) -> None:
+        pstats_path = self.output_dir / f"{name}.pstats"
+        collapsed_path = self.output_dir / f"{name}.collapsed"
+        profiler.dump_stats(str(pstats_path))
+        sampler.write(collapsed_path)
+        
+        self.summary[name] = {
+            "duration_seconds": round(duration, 3),
+            "tracemalloc_peak_mb": round(peak / 1024 / 1024, 2),
+            "samples": sum(sampler.stacks.values()),
+            "pstats": pstats_path.as_posix(),
+            "collapsed": collapsed_path.as_posix(),
+        }
+        with open(self.output_dir / "summary.json", 'w', encoding='utf-8') as f:
+            json.dump(self.summary, f, ensure_ascii=False, indent=2)
+        
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        print(f"📈 {name} 效能分析: {duration:.1f} 秒，記憶體峰值 {peak / 1024 / 1024:.1f} MB")
+        print(output.getvalue())
+        print(f"💾 已輸出: {pstats_path}、{collapsed_path}")
@@ -5,24 +5,126 @@ PTT 熱門文章爬蟲 - Python 版本
 爬取 PTT 24小時熱門文章資料
 """
 
-import json
+import os
 import time
 import random
 import re
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
+from urllib.parse import urljoin
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
 from fake_useragent import UserAgent
 
+from bs4 import BeautifulSoup
+
+from browser_profile import BrowserProfile, apply_browser_profile, apply_profile_options
+from browser_tabs import open_tabs
+from cdp_browser import BROWSER_BACKEND, CdpBrowser, cdp_available
+from checkpoint import CheckpointJournal
+from driver_watchdog import MANAGED_BROWSER_FLAG, DriverSupervisor
+from network_capture import capture_responses, enable_network_capture, find_records, first_value, parse_json_body
+from payload_archive import archive_payload
+from remote_browser import create_driver
+from snapshot_writer import SnapshotBatch, write_snapshot
+from trend_item import TrendItem, parse_count, parse_local_time, parse_ptt_score
+from selector_cache import SelectorCache
+
+# 文章容器與各欄位的選擇器 (依優先順序嘗試)
+ARTICLE_SELECTORS = [
+    ".e7-container",
+    "[class*='container']",
+    ".article-item",
+    ".hot-article"
+]
+RECOMMEND_SCORE_SELECTORS = [
+    ".e7-recommendScore",
+    "[class*='recommendScore']",
+    ".recommend-score"
+]
+RECOMMEND_COUNT_SELECTORS = [
+    "[e7description='推文:']",
+    "[class*='recommendCount']",
+    ".recommend-count"
+]
+TITLE_SELECTORS = [
+    "a[href*='/bbs/']",
+    ".title a",
+    ".article-title a"
+]
+AUTHOR_SELECTORS = [
+    ".author",
+    "[class*='author']",
+    ".article-author"
+]
+PUBLISH_TIME_SELECTORS = [
+    ".publish-time",
+    "[class*='publishTime']",
+    ".article-time"
+]
+
+PTT_BASE_URL = 'https://www.pttweb.cc'
+
+class PttTarget:
+    """PTT 熱門列表目標配置類"""
+    def __init__(self, board: str, window: str, filename: str, description: str,
+                 max_articles: int = 30):
+        self.board = board
+        self.window = window
+        self.filename = filename
+        self.description = description
+        self.max_articles = max_articles
+    
+    @property
+    def url(self) -> str:
+        return f'{PTT_BASE_URL}/hot/{self.board}/{self.window}'
+
+# PTT 熱門列表配置 (看板為 all 代表全站，時間區間為 today/week)
+# 第一個目標沿用原本的 ptt-trends.json 檔名
+PTT_TARGETS = [
+    PttTarget(
+        board='all',
+        window='today',
+        filename='data/ptt-trends.json',
+        description='PTT 全站今日熱門'
+    ),
+    PttTarget(
+        board='all',
+        window='week',
+        filename='data/ptt-all-week.json',
+        description='PTT 全站本週熱門'
+    ),
+]
+
+# 多個目標合併後的輸出檔案
+PTT_MERGED_FILENAME = 'data/ptt-trends-merged.json'
+
+# 瀏覽器資源阻擋設定 (PTT 只讀取 img 的 src 屬性，不需要真的下載圖片)
+BROWSER_PROFILE = BrowserProfile(block=('images', 'media', 'fonts', 'trackers'))
+
+# 網路擷取模式: 直接讀取頁面向 API 取得的 JSON，取不到時才改用 DOM 解析
+# (需逐一目標載入並開啟 performance log，預設關閉以使用多分頁並行爬取，設定 PTT_NETWORK_CAPTURE=1 開啟)
+PTT_NETWORK_CAPTURE = os.environ.get('PTT_NETWORK_CAPTURE', '0') == '1'
+PTT_CAPTURE_PATTERNS = [r'pttweb\.cc/api/']
+PTT_CAPTURE_TIMEOUT = 10
+
+# API 回應中各欄位可能使用的名稱 (依序嘗試)
+PTT_API_FIELDS = {
+    'link': ('url', 'link', 'href'),
+    'aid': ('aid', 'articleId', 'article_id'),
+    'board': ('board', 'boardName', 'board_name'),
+    'author': ('author', 'owner', 'poster'),
+    'recommendScore': ('recommendScore', 'pushCount', 'push', 'recommend', 'score'),
+    'recommendCount': ('recommendCount', 'commentCount', 'comments'),
+    'publishTime': ('publishTime', 'postTime', 'createdAt', 'created_at', 'date'),
+    'imageUrl': ('imageUrl', 'thumbnail', 'image', 'preview'),
+}
+
 def setup_driver():
     """設定 Chrome WebDriver"""
     options = Options()
@@ -32,6 +134,7 @@ def setup_driver():
     options.add_argument('--disable-setuid-sandbox')
     options.add_argument('--disable-blink-features=AutomationControlled')
     options.add_argument('--disable-features=VizDisplayCompositor')
+    options.add_argument(MANAGED_BROWSER_FLAG)
     
     # 設定隨機 User-Agent
     ua = UserAgent()
@@ -41,45 +144,68 @@ def setup_driver():
     # 設定視窗大小
     options.add_argument('--window-size=1920,1080')
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    # 套用資源阻擋的偏好設定
+    apply_profile_options(options, BROWSER_PROFILE)
+    
+    if PTT_NETWORK_CAPTURE:
+        enable_network_capture(options)
+    
+    driver = create_driver(options)
+    apply_browser_profile(driver, BROWSER_PROFILE)
     
     # 移除 webdriver 痕跡
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
     return driver
 
-def extract_article_info(article_element, driver) -> Optional[Dict]:
-    """從文章元素中提取資訊"""
+def build_ptt_item(recommend_score: str, recommend_count: str, title: str, link: str,
+                   author: str, board: str, publish_time: str, image_url: str = "") -> TrendItem:
+    """建立 PTT 文章項目 (推文分數與發文時間在這裡轉成數值與 UTC 時間)"""
+    extra = {
+        "recommendScore": recommend_score,
+        "recommendCount": recommend_count,
+        "author": author,
+        "board": board,
+        "publishTime": publish_time
+    }
+    if image_url:
+        extra["imageUrl"] = image_url
+    
+    return TrendItem(
+        "ptt",
+        title,
+        link,
+        # 只有沒有推文分數欄位時才改用推文數，分數 0 也是有效的分數
+        score=parse_ptt_score(recommend_score) if recommend_score.strip() else parse_count(recommend_count),
+        timestamp=parse_local_time(publish_time),
+        extra=extra,
+    )
+
+def extract_article_info(article_element, driver,
+                         selector_cache: Optional[SelectorCache] = None) -> Optional[TrendItem]:
+    """從文章元素中提取資訊 (依選擇器快取的順序嘗試，並記錄命中的選擇器)"""
+    selector_cache = selector_cache or SelectorCache('ptt', path=None)
+    
     try:
-        article_data = {}
-        
         # 使用多種選擇器策略來提取推文分數
         recommend_score = ""
-        recommend_selectors = [
-            ".e7-recommendScore",
-            "[class*='recommendScore']",
-            ".recommend-score"
-        ]
         
-        for selector in recommend_selectors:
+        for selector in selector_cache.order('recommendScore', RECOMMEND_SCORE_SELECTORS):
             try:
                 score_elem = article_element.find_element(By.CSS_SELECTOR, selector)
                 recommend_score = score_elem.text.strip()
                 if recommend_score:
+                    selector_cache.record_hit('recommendScore', selector)
                     break
             except NoSuchElementException:
                 continue
+        else:
+            selector_cache.record_miss('recommendScore')
         
         # 提取推文數量
         recommend_count = ""
-        count_selectors = [
-            "[e7description='推文:']",
-            "[class*='recommendCount']",
-            ".recommend-count"
-        ]
         
-        for selector in count_selectors:
+        for selector in selector_cache.order('recommendCount', RECOMMEND_COUNT_SELECTORS):
             try:
                 count_elem = article_element.find_element(By.CSS_SELECTOR, selector)
                 # 找到父元素中的數字
@@ -88,20 +214,18 @@ def extract_article_info(article_element, driver) -> Optional[Dict]:
                 count_match = re.search(r'(\d+)', count_text)
                 if count_match:
                     recommend_count = count_match.group(1)
+                    selector_cache.record_hit('recommendCount', selector)
                     break
             except NoSuchElementException:
                 continue
+        else:
+            selector_cache.record_miss('recommendCount')
         
         # 提取標題和連結
         title = ""
         link = ""
-        title_selectors = [
-            "a[href*='/bbs/']",
-            ".title a",
-            ".article-title a"
-        ]
         
-        for selector in title_selectors:
+        for selector in selector_cache.order('title', TITLE_SELECTORS):
             try:
                 title_elem = article_element.find_element(By.CSS_SELECTOR, selector)
                 title = title_elem.text.strip()
@@ -110,26 +234,27 @@ def extract_article_info(article_element, driver) -> Optional[Dict]:
                     # 確保連結格式正確
                     if link.startswith('/bbs/'):
                         link = link  # 保持相對路徑
+                    selector_cache.record_hit('title', selector)
                     break
             except NoSuchElementException:
                 continue
+        else:
+            selector_cache.record_miss('title')
         
         # 提取作者
         author = ""
-        author_selectors = [
-            ".author",
-            "[class*='author']",
-            ".article-author"
-        ]
         
-        for selector in author_selectors:
+        for selector in selector_cache.order('author', AUTHOR_SELECTORS):
             try:
                 author_elem = article_element.find_element(By.CSS_SELECTOR, selector)
                 author = author_elem.text.strip()
                 if author:
+                    selector_cache.record_hit('author', selector)
                     break
             except NoSuchElementException:
                 continue
+        else:
+            selector_cache.record_miss('author')
         
         # 從連結中提取看板名稱
         board = ""
@@ -140,20 +265,18 @@ def extract_article_info(article_element, driver) -> Optional[Dict]:
         
         # 提取發文時間
         publish_time = ""
-        time_selectors = [
-            ".publish-time",
-            "[class*='publishTime']",
-            ".article-time"
-        ]
         
-        for selector in time_selectors:
+        for selector in selector_cache.order('publishTime', PUBLISH_TIME_SELECTORS):
             try:
                 time_elem = article_element.find_element(By.CSS_SELECTOR, selector)
                 publish_time = time_elem.text.strip()
                 if publish_time:
+                    selector_cache.record_hit('publishTime', selector)
                     break
             except NoSuchElementException:
                 continue
+        else:
+            selector_cache.record_miss('publishTime')
         
         # 提取圖片 URL（如果有的話）
         image_url = ""
@@ -165,32 +288,157 @@ def extract_article_info(article_element, driver) -> Optional[Dict]:
         
         # 只有當基本資訊都存在時才返回資料
         if title and link:
-            article_data = {
-                "recommendScore": recommend_score,
-                "recommendCount": recommend_count,
-                "title": title,
-                "link": link,
-                "author": author,
-                "board": board,
-                "publishTime": publish_time
-            }
-            
-            if image_url:
-                article_data["imageUrl"] = image_url
-            
-            return article_data
+            return build_ptt_item(recommend_score, recommend_count, title, link,
+                                  author, board, publish_time, image_url)
         
     except Exception as e:
         print(f"⚠️ 提取文章資訊時出錯: {e}")
     
     return None
 
-def smart_scroll(driver, target_count=20) -> None:
+def select_first_text(node, selectors: List[str]) -> str:
+    """依序嘗試選擇器，回傳第一個非空的文字"""
+    for selector in selectors:
+        elem = node.select_one(selector)
+        if elem is not None:
+            text = elem.get_text().strip()
+            if text:
+                return text
+    return ""
+
+def extract_article_from_soup(node) -> Optional[TrendItem]:
+    """從封存頁面的文章節點中提取資訊 (與 extract_article_info 相同的欄位規則)"""
+    recommend_score = select_first_text(node, RECOMMEND_SCORE_SELECTORS)
+    
+    recommend_count = ""
+    for selector in RECOMMEND_COUNT_SELECTORS:
+        count_elem = node.select_one(selector)
+        if count_elem is not None and count_elem.parent is not None:
+            count_match = re.search(r'(\d+)', count_elem.parent.get_text().strip())
+            if count_match:
+                recommend_count = count_match.group(1)
+                break
+    
+    title = ""
+    link = ""
+    for selector in TITLE_SELECTORS:
+        title_elem = node.select_one(selector)
+        if title_elem is not None:
+            title = title_elem.get_text().strip()
+            # 瀏覽器回傳的 href 為絕對網址，這裡補上相同的前綴
+            link = urljoin(PTT_BASE_URL, title_elem.get('href', ''))
+            if title and link:
+                break
+    
+    if not (title and link):
+        return None
+    
+    board_match = re.search(r'/bbs/([^/]+)/', link)
+    img_elem = node.select_one("img")
+    image_url = urljoin(PTT_BASE_URL, img_elem['src']) if img_elem is not None and img_elem.get('src') else ""
+    
+    return build_ptt_item(
+        recommend_score,
+        recommend_count,
+        title,
+        link,
+        select_first_text(node, AUTHOR_SELECTORS),
+        board_match.group(1) if board_match else "",
+        select_first_text(node, PUBLISH_TIME_SELECTORS),
+        image_url
+    )
+
+def parse_ptt_html(html: str, max_articles: int = 30) -> List[TrendItem]:
+    """從封存的頁面原始碼解析熱門文章"""
+    soup = BeautifulSoup(html, 'lxml')
+    
+    article_nodes = []
+    for selector in ARTICLE_SELECTORS:
+        article_nodes = soup.select(selector)
+        if article_nodes:
+            break
+    
+    articles = []
+    seen_titles = set()
+    for node in article_nodes:
+        article_data = extract_article_from_soup(node)
+        if article_data and article_data.title not in seen_titles:
+            articles.append(article_data)
+            seen_titles.add(article_data.title)
+        if len(articles) >= max_articles:
+            break
+    
+    return articles
+
+def parse_ptt_api_payload(payload, max_articles: int = 30) -> List[TrendItem]:
+    """從 API 回應的 JSON 中找出文章資料 (不依賴固定的巢狀結構)"""
+    articles = []
+    seen = set()
+    
+    for record in find_records(payload, ('title',)):
+        title = str(record.get('title') or '').strip()
+        board = str(first_value(record, PTT_API_FIELDS['board']))
+        link = str(first_value(record, PTT_API_FIELDS['link']))
+        aid = first_value(record, PTT_API_FIELDS['aid'])
+        if not link and board and aid:
+            link = f'/bbs/{board}/{aid}'
+        if not (title and link):
+            continue
+        
+        link = urljoin(PTT_BASE_URL, link)
+        if not board:
+            board_match = re.search(r'/bbs/([^/]+)/', link)
+            board = board_match.group(1) if board_match else ""
+        image_url = first_value(record, PTT_API_FIELDS['imageUrl'])
+        
+        article = build_ptt_item(
+            str(first_value(record, PTT_API_FIELDS['recommendScore'])),
+            str(first_value(record, PTT_API_FIELDS['recommendCount'])),
+            title,
+            link,
+            str(first_value(record, PTT_API_FIELDS['author'])),
+            board,
+            str(first_value(record, PTT_API_FIELDS['publishTime'])),
+            urljoin(PTT_BASE_URL, image_url) if isinstance(image_url, str) and image_url else ""
+        )
+        if article.key not in seen:
+            seen.add(article.key)
+            articles.append(article)
+        if len(articles) >= max_articles:
+            break
+    
+    return articles
+
+def parse_ptt_api_body(body: str) -> List[TrendItem]:
+    """解析封存的 API 回應內容"""
+    return parse_ptt_api_payload(parse_json_body(body))
+
+def capture_target_articles(supervisor: DriverSupervisor, target: PttTarget) -> List[TrendItem]:
+    """以網路擷取模式載入目標頁面，直接解析頁面發出的 API 回應"""
+    articles = []
+    responses = capture_responses(supervisor, target.url, PTT_CAPTURE_PATTERNS, timeout=PTT_CAPTURE_TIMEOUT)
+    
+    for response in responses:
+        archive_payload("ptt_api", response.url, response.body, "application/json")
+        try:
+            articles.extend(parse_ptt_api_payload(parse_json_body(response.body), target.max_articles))
+        except ValueError as e:
+            print(f"⚠️ API 回應不是 JSON ({response.url}): {e}")
+    
+    # 多個回應可能包含同一篇文章
+    unique = {}
+    for article in articles:
+        unique.setdefault(article.key, article)
+    print(f"📡 擷取 {len(responses)} 個 API 回應，解析出 {len(unique)} 篇文章")
+    return list(unique.values())[:target.max_articles]
+
+def smart_scroll(driver, target_count=20,
+                 container_selector: str = ".e7-container, [class*='container']") -> None:
     """智慧滾動策略：初始不滾動保持順序，不足20篇才輕微滾動補充"""
     print("📜 檢查是否需要滾動載入更多內容...")
     
     # 先檢查當前有多少文章
-    articles = driver.find_elements(By.CSS_SELECTOR, ".e7-container, [class*='container']")
+    articles = driver.find_elements(By.CSS_SELECTOR, container_selector)
     current_count = len(articles)
     print(f"📊 目前找到 {current_count} 篇文章")
     
@@ -207,7 +455,7 @@ def smart_scroll(driver, target_count=20) -> None:
         time.sleep(2)
         
         # 檢查是否有新文章載入
-        new_articles = driver.find_elements(By.CSS_SELECTOR, ".e7-container, [class*='container']")
+        new_articles = driver.find_elements(By.CSS_SELECTOR, container_selector)
         new_count = len(new_articles)
         
         if new_count > current_count:
@@ -218,133 +466,274 @@ def smart_scroll(driver, target_count=20) -> None:
         else:
             print(f"📜 第 {i+1} 次滾動未增加新內容")
 
-def scrape_ptt_trends():
-    """爬取 PTT 熱門文章"""
-    driver = setup_driver()
+def extract_target_articles(driver, target: PttTarget,
+                            selector_cache: Optional[SelectorCache] = None) -> List[TrendItem]:
+    """從目前分頁中解析單一目標的熱門文章"""
+    selector_cache = selector_cache or SelectorCache('ptt', path=None)
     articles = []
     
+    # 等待頁面載入
     try:
-        print("🚀 開始爬取 PTT 熱門文章...")
-        
-        # 前往 PTT 熱門頁面
-        driver.get('https://www.pttweb.cc/hot/all/today')
-        
-        # 等待頁面載入
-        try:
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            print("✅ 頁面載入完成")
-        except TimeoutException:
-            print("⚠️ 頁面載入超時")
-        
-        # 等待一段時間讓動態內容載入
-        time.sleep(3)
-        
-        # 智慧滾動
+        WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+        print(f"✅ {target.description} 頁面載入完成")
+    except TimeoutException:
+        print(f"⚠️ {target.description} 頁面載入超時")
+    
+    # 智慧滾動 (有快取時只計算上次勝出的容器選擇器，避免寬鬆的選擇器掃過大量節點)
+    container_selector = selector_cache.winner('article')
+    if container_selector:
+        smart_scroll(driver, target_count=20, container_selector=container_selector)
+    else:
         smart_scroll(driver, target_count=20)
-        
-        # 尋找文章容器
-        article_selectors = [
-            ".e7-container",
-            "[class*='container']",
-            ".article-item",
-            ".hot-article"
-        ]
-        
-        article_elements = []
-        for selector in article_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    article_elements = elements
-                    print(f"✅ 使用選擇器 '{selector}' 找到 {len(elements)} 個文章元素")
-                    break
-            except Exception as e:
-                print(f"⚠️ 選擇器 '{selector}' 失敗: {e}")
+    
+    # 封存滾動後的頁面供離線重新解析
+    archive_payload("ptt", target.url, driver.page_source)
+    
+    # 尋找文章容器
+    article_elements = []
+    for selector in selector_cache.order('article', ARTICLE_SELECTORS):
+        try:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                article_elements = elements
+                selector_cache.record_hit('article', selector, matches=len(elements))
+                print(f"✅ 使用選擇器 '{selector}' 找到 {len(elements)} 個文章元素")
+                break
+        except Exception as e:
+            print(f"⚠️ 選擇器 '{selector}' 失敗: {e}")
+            continue
+    else:
+        selector_cache.record_miss('article')
+    
+    if not article_elements:
+        print(f"❌ {target.description} 無法找到文章元素")
+        return []
+    
+    print(f"📊 開始解析 {len(article_elements)} 個文章...")
+    
+    # 解析每篇文章
+    seen_titles = set()  # 用於去重
+    
+    for i, article_elem in enumerate(article_elements):
+        try:
+            article_data = extract_article_info(article_elem, driver, selector_cache)
+            
+            if article_data and article_data.title:
+                # 去重檢查
+                title = article_data.title
+                if title not in seen_titles:
+                    articles.append(article_data)
+                    seen_titles.add(title)
+                    print(f"✅ 第 {len(articles)} 篇: {title[:50]}...")
+                else:
+                    print(f"🔄 重複文章已跳過: {title[:30]}...")
+            
+            # 限制每個目標最多爬取的篇數
+            if len(articles) >= target.max_articles:
+                break
+                
+        except Exception as e:
+            print(f"⚠️ 解析第 {i+1} 篇文章時出錯: {e}")
+            continue
+    
+    return articles
+
+def scrape_ptt_targets_cdp(targets: List[PttTarget], target_count: int = 20) -> Dict[str, List[TrendItem]]:
+    """以 CDP 後端在同一條連線的多個分頁並行爬取 (不經過 chromedriver)，滾動後一次解析頁面原始碼"""
+    targets_by_url = {target.url: target for target in targets}
+    results: Dict[str, List[TrendItem]] = {target.filename: [] for target in targets}
+    container_selector = ", ".join(ARTICLE_SELECTORS)
+    
+    def handle(page, url: str) -> List[TrendItem]:
+        if not page.wait_for(container_selector, timeout=10):
+            print(f"⚠️ {targets_by_url[url].description} 頁面載入超時")
+        # 文章不足時輕微滾動補充 (與 smart_scroll 相同的策略)
+        for _ in range(3):
+            if page.count(ARTICLE_SELECTORS[0]) >= target_count:
+                break
+            page.evaluate("window.scrollBy(0, 800)")
+            time.sleep(2)
+        page_source = page.page_source()
+        archive_payload("ptt", url, page_source)
+        return parse_ptt_html(page_source, targets_by_url[url].max_articles)
+    
+    print(f"🚀 開始以 CDP 爬取 PTT 熱門文章 ({len(targets)} 個目標)...")
+    with CdpBrowser(BROWSER_PROFILE, UserAgent().random) as browser:
+        for url, articles in browser.render_pages(list(targets_by_url), handle).items():
+            target = targets_by_url[url]
+            if isinstance(articles, Exception):
+                print(f"❌ 處理 {target.description} 時出錯: {articles}")
                 continue
+            results[target.filename] = articles
+            print(f"📊 {target.description} 找到 {len(articles)} 篇文章")
+    
+    return results
+
+def scrape_ptt_targets(targets: Optional[List[PttTarget]] = None,
+                       journal: Optional[CheckpointJournal] = None) -> Dict[str, List[TrendItem]]:
+    """以同一個瀏覽器的多個分頁並行爬取多個看板/時間區間 (傳入 journal 時略過已完成的目標並記錄進度)"""
+    targets = targets or PTT_TARGETS
+    results: Dict[str, List[TrendItem]] = {target.filename: [] for target in targets}
+    
+    if journal is not None:
+        for target in targets:
+            if journal.is_done(target.filename):
+                results[target.filename] = [TrendItem.from_dict("ptt", item) for item in journal.items(target.filename)]
+                print(f"♻️ {target.description}: 沿用檢查點的 {len(results[target.filename])} 篇文章")
+        targets = [target for target in targets if not journal.is_done(target.filename)]
+        if not targets:
+            return results
+    
+    def checkpoint(target: PttTarget) -> None:
+        if journal is not None and results[target.filename]:
+            journal.record(target.filename, [article.to_dict() for article in results[target.filename]])
+    
+    if BROWSER_BACKEND == 'cdp' and cdp_available():
+        try:
+            results.update(scrape_ptt_targets_cdp(targets))
+            for target in targets:
+                checkpoint(target)
+            return results
+        except Exception as e:
+            print(f"⚠️ CDP 後端失敗，改用 Selenium: {e}")
+    
+    selector_cache = SelectorCache('ptt')
+    supervisor = DriverSupervisor(setup_driver)
+    
+    try:
+        print(f"🚀 開始爬取 PTT 熱門文章 ({len(targets)} 個目標)...")
         
-        if not article_elements:
-            print("❌ 無法找到文章元素")
-            return []
-        
-        print(f"📊 開始解析 {len(article_elements)} 個文章...")
+        if PTT_NETWORK_CAPTURE:
+            # 擷取模式依序載入每個目標，API 回應才能對應到正確的目標
+            for target in targets:
+                print(f"\n📋 處理: {target.description} ({target.url})")
+                print("-" * 40)
+                try:
+                    articles = capture_target_articles(supervisor, target)
+                    if not articles:
+                        # 頁面已經載入，直接改用 DOM 解析
+                        print("⚠️ 沒有擷取到 API 資料，改用 DOM 解析")
+                        articles = extract_target_articles(supervisor.driver, target, selector_cache)
+                    results[target.filename] = articles
+                    checkpoint(target)
+                except Exception as e:
+                    print(f"❌ 處理 {target.description} 時出錯: {e}")
+            return results
         
-        # 解析每篇文章
-        seen_titles = set()  # 用於去重
+        # 所有分頁同時載入，動態內容的等待只需支付一次
+        handles = open_tabs(supervisor, [target.url for target in targets])
+        driver = supervisor.driver
+        time.sleep(3)
         
-        for i, article_elem in enumerate(article_elements):
+        for i, (target, handle) in enumerate(zip(targets, handles)):
+            print(f"\n📋 處理: {target.description} ({target.url})")
+            print("-" * 40)
             try:
-                article_data = extract_article_info(article_elem, driver)
+                driver.switch_to.window(handle)
+                results[target.filename] = extract_target_articles(driver, target, selector_cache)
+                checkpoint(target)
                 
-                if article_data and article_data.get('title'):
-                    # 去重檢查
-                    title = article_data['title']
-                    if title not in seen_titles:
-                        articles.append(article_data)
-                        seen_titles.add(title)
-                        print(f"✅ 第 {len(articles)} 篇: {title[:50]}...")
-                    else:
-                        print(f"🔄 重複文章已跳過: {title[:30]}...")
-                
-                # 限制最多爬取30篇
-                if len(articles) >= 30:
-                    break
-                    
+                # 解析完的分頁立即關閉以釋放記憶體 (保留最後一個分頁讓瀏覽器正常結束)
+                if i < len(handles) - 1:
+                    driver.close()
+                print(f"🧠 瀏覽器記憶體: {supervisor.rss_mb():.0f} MB")
             except Exception as e:
-                print(f"⚠️ 解析第 {i+1} 篇文章時出錯: {e}")
-                continue
+                print(f"❌ 處理 {target.description} 時出錯: {e}")
     
     except Exception as e:
         print(f"❌ 爬取過程中出錯: {e}")
     
     finally:
-        driver.quit()
+        supervisor.quit()
+        selector_cache.save()
     
-    return articles
+    return results
+
+def scrape_ptt_trends() -> List[TrendItem]:
+    """爬取 PTT 今日熱門文章"""
+    target = PTT_TARGETS[0]
+    return scrape_ptt_targets([target])[target.filename]
 
-def save_ptt_data(articles):
+def merge_ptt_articles(results: Dict[str, List[TrendItem]]) -> List[TrendItem]:
+    """合併多個目標的文章，依連結去重並依推文分數排序"""
+    merged: Dict[str, TrendItem] = {}
+    
+    for articles in results.values():
+        for article in articles:
+            if article.key not in merged:
+                merged[article.key] = article
+    
+    return sorted(merged.values(), key=lambda article: article.score, reverse=True)
+
+def save_ptt_data(articles: List[TrendItem], filename: str = PTT_TARGETS[0].filename,
+                  batch: Optional[SnapshotBatch] = None):
     """儲存 PTT 資料到 JSON 檔案"""
     data = {
         "updated": datetime.now().isoformat() + "Z",
         "total_found": len(articles),
         "returned_count": len(articles),
-        "articles": articles
+        "articles": [article.to_dict() for article in articles]
     }
     
     # 確保 data 資料夾存在
     data_dir = Path("data")
     data_dir.mkdir(exist_ok=True)
     
-    # 寫入 JSON 檔案
-    output_file = data_dir / "ptt-trends.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # 寫入 JSON 檔案 (傳入 batch 時暫存，commit 時與同一批的檔案一起寫入)
+    output_file = Path(filename)
+    if batch is not None:
+        batch.add(output_file, data)
+        return output_file
+    write_snapshot(output_file, data)
     
     print(f"💾 資料已儲存至: {output_file}")
     return output_file
 
-def main():
-    """主函數"""
+def main() -> bool:
+    """主函數，回傳是否成功取得資料"""
     print("📰 PTT 熱門文章爬蟲 - Python 版本")
     print("=" * 50)
     
-    # 爬取資料
-    articles = scrape_ptt_trends()
+    # 爬取資料 (每個目標完成時寫入檢查點，中斷後重新執行會接續)
+    journal = CheckpointJournal("ptt")
+    results = scrape_ptt_targets(PTT_TARGETS, journal)
     
-    if articles:
-        # 儲存資料
-        save_ptt_data(articles)
+    # 各目標與合併檔同一批寫入，讀者不會看到新舊混雜的一組檔案
+    with SnapshotBatch("ptt") as batch:
+        for target in PTT_TARGETS:
+            articles = results.get(target.filename, [])
+            if articles:
+                # 儲存資料
+                save_ptt_data(articles, target.filename, batch)
+                print(f"✅ {target.description}: {len(articles)} 篇文章")
+            else:
+                print(f"❌ {target.description}: 沒有找到任何文章")
         
+        if len(PTT_TARGETS) > 1:
+            merged = merge_ptt_articles(results)
+            if merged:
+                save_ptt_data(merged, PTT_MERGED_FILENAME, batch)
+        else:
+            merged = results.get(PTT_TARGETS[0].filename, [])
+    
+    # 所有目標都有資料才清除檢查點，否則重新執行時只補爬失敗的目標
+    if all(results.get(target.filename) for target in PTT_TARGETS):
+        journal.finish()
+    
+    if merged:
         # 顯示結果摘要
         print("✅ 爬取完成!")
-        print(f"📊 總共找到 {len(articles)} 篇文章")
+        print(f"📊 總共找到 {len(merged)} 篇文章")
         
         # 顯示前幾篇文章標題
-        for i, article in enumerate(articles[:5], 1):
-            print(f"{i}. {article.get('title', 'N/A')[:60]}...")
+        for i, article in enumerate(merged[:5], 1):
+            print(f"{i}. {article.title[:60]}...")
+        return True
     else:
         print("❌ 沒有找到任何文章")
+        return False
 
 if __name__ == "__main__":
     main()
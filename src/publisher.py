@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+資料檔發佈到物件儲存
+把 data/ 的資料檔與增量並行上傳到 S3 相容的物件儲存 (AWS S3、MinIO、R2 等，需要安裝 boto3)，
+內容沒有變動的物件不重新上傳，全部上傳完成後才替換 latest/<群組>.json 指標，讀者永遠看到完整的一組檔案；
+CI 每次從舊的 checkout 開始，爬取前以 restore 從指標取回上一版資料檔與增量，增量才能接續編號
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:  # 沒有 boto3 時只能發佈到本機目錄
+    boto3 = None
+    ClientError = None
+
+from data_lock import locked_files
+from data_sources import DATA_DIR, DATA_SOURCES, REDDIT_FILES
+from snapshot_writer import DELTA_DIR
+
+# 發佈目的地: s3://bucket/前綴 或 file:///本機目錄 (未設定時不發佈)
+PUBLISH_URL = os.environ.get('PUBLISH_URL', '')
+# S3 相容服務的端點，例如本機 MinIO 的 http://localhost:9000 (AWS S3 不需設定)
+PUBLISH_ENDPOINT_URL = os.environ.get('PUBLISH_ENDPOINT_URL') or None
+
+PUBLISH_CONCURRENCY = 8
+PUBLISH_STATE_FILE = Path("cache") / "publish-state.json"
+
+# 內容定址的物件永不改變，可長期快取；指標需要很快看到更新
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+POINTER_CACHE_CONTROL = "public, max-age=15, must-revalidate"
+
+# 上傳前先壓縮的類型 (已是 .gz 的檔案直接上傳)
+COMPRESSIBLE_SUFFIXES = {'.json', '.ndjson', '.txt', '.html'}
+
+# 發佈群組對應的資料檔，與各爬蟲的輸出一致
+PUBLISH_GROUPS = {
+    **{name: pattern for name, pattern, _ in DATA_SOURCES},
+    "reddit": REDDIT_FILES,
+}
+
+
+class LocalObjectStore:
+    """以本機目錄模擬的物件儲存 (測試用)，標頭與中繼資料存在 <鍵>.meta.json"""
+    def __init__(self, root: Path):
+        self.root = root
+    
+    def head(self, key: str) -> Optional[Dict[str, str]]:
+        try:
+            with open(self.root / f"{key}.meta.json", 'r', encoding='utf-8') as f:
+                return json.load(f)["Metadata"]
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """取回物件內容 (已解壓)，不存在時回傳 None"""
+        try:
+            with open(self.root / f"{key}.meta.json", 'r', encoding='utf-8') as f:
+                headers = json.load(f)
+            body = (self.root / key).read_bytes()
+        except FileNotFoundError:
+            return None
+        return gzip.decompress(body) if headers.get("ContentEncoding") == "gzip" else body
+    
+    def put(self, key: str, body: bytes, headers: Dict[str, Any]) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先寫內容再寫中繼資料，中途失敗時 head 看不到這個物件
+        for target, content in ((path, body), (Path(f"{path}.meta.json"), json.dumps(headers).encode('utf-8'))):
+            tmp_path = Path(f"{target}.tmp")
+            tmp_path.write_bytes(content)
+            tmp_path.replace(target)
+    
+    def __str__(self) -> str:
+        return f"file://{self.root}"
+
+
+class S3ObjectStore:
+    """S3 相容的物件儲存 (boto3 client 可在多個執行緒共用)"""
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = PUBLISH_ENDPOINT_URL):
+        if boto3 is None:
+            raise RuntimeError("發佈到 S3 需要安裝 boto3: uv add boto3")
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+    
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+    
+    def head(self, key: str) -> Optional[Dict[str, str]]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))["Metadata"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """取回物件內容 (已解壓)，不存在時回傳 None"""
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        body = response["Body"].read()
+        return gzip.decompress(body) if response.get("ContentEncoding") == "gzip" else body
+    
+    def put(self, key: str, body: bytes, headers: Dict[str, Any]) -> None:
+        # 單一 PUT 在 S3 上是原子的，讀者只會看到舊版或新版
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=body, **headers)
+    
+    def __str__(self) -> str:
+        return f"s3://{self.bucket}/{self.prefix}"
+
+
+def create_store(url: str = PUBLISH_URL):
+    """依網址建立物件儲存: s3://bucket/前綴 或 file:///目錄"""
+    if url.startswith('s3://'):
+        bucket, _, prefix = url[len('s3://'):].partition('/')
+        return S3ObjectStore(bucket, prefix)
+    if url.startswith('file://'):
+        return LocalObjectStore(Path(url[len('file://'):]))
+    raise ValueError(f"不支援的發佈網址: {url}")
+
+
+def _sha256(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class PublishFile:
+    """一個待發佈的檔案 (讀入記憶體，避免上傳途中被爬蟲改寫)"""
+    __slots__ = ('name', 'key', 'content', 'sha256')
+    
+    def __init__(self, name: str, content: bytes):
+        self.name = name
+        self.content = content
+        self.sha256 = _sha256(content)
+        # 預先壓縮的檔案以解壓後的名稱發佈，由 Content-Encoding 告知瀏覽器
+        base = name[:-3] if name.endswith('.gz') else name
+        # 資料檔與增量都以內容雜湊命名：增量序號重新開始時也不會覆寫已被快取的物件
+        stem, suffix = os.path.splitext(base)
+        self.key = f"objects/{stem}.{self.sha256[:16]}{suffix}"
+    
+    def body_and_headers(self) -> Tuple[bytes, Dict[str, Any]]:
+        """上傳內容與標頭，可壓縮的類型以 gzip 上傳並設定 Content-Encoding"""
+        content_type = mimetypes.guess_type(self.key)[0] or 'application/octet-stream'
+        if content_type == 'application/json' or self.key.endswith('.json'):
+            content_type = 'application/json; charset=utf-8'
+        headers: Dict[str, Any] = {
+            "ContentType": content_type,
+            "CacheControl": IMMUTABLE_CACHE_CONTROL,
+            "Metadata": {"sha256": self.sha256},
+        }
+        body = self.content
+        if self.name.endswith('.gz'):
+            headers["ContentEncoding"] = "gzip"
+        elif Path(self.key).suffix in COMPRESSIBLE_SUFFIXES:
+            # mtime=0 讓相同內容產生相同的壓縮結果
+            body = gzip.compress(self.content, mtime=0)
+            headers["ContentEncoding"] = "gzip"
+        return body, headers
+
+
+def collect_files(group: str, data_dir: Path = DATA_DIR, delta_dir: Path = DELTA_DIR) -> List[PublishFile]:
+    """群組的資料檔、增量清單與清單中列出的增量 (持有共享鎖讀取，不會讀到寫到一半的一批資料檔)"""
+    paths = group_paths(group, data_dir)
+    files: Dict[str, PublishFile] = {}
+    with locked_files(paths, shared=True):
+        for path in paths:
+            files[path.name] = PublishFile(path.name, path.read_bytes())
+            manifest_path = delta_dir / path.stem / "latest.json"
+            if not manifest_path.exists():
+                continue
+            manifest = manifest_path.read_bytes()
+            delta_paths = [manifest_path.parent / f"{seq}.json" for seq in json.loads(manifest).get("deltas", [])]
+            for delta_path in [manifest_path, *delta_paths]:
+                if delta_path.exists():
+                    name = delta_path.relative_to(delta_dir.parent).as_posix()
+                    files[name] = PublishFile(name, delta_path.read_bytes())
+    return list(files.values())
+
+
+def group_paths(group: str, data_dir: Path = DATA_DIR) -> List[Path]:
+    if group == "all":
+        patterns = list(dict.fromkeys(PUBLISH_GROUPS.values()))
+    elif group in PUBLISH_GROUPS:
+        patterns = [PUBLISH_GROUPS[group]]
+    else:
+        raise ValueError(f"未知的發佈群組: {group}")
+    return sorted({path for pattern in patterns for path in data_dir.glob(pattern)})
+
+
+def restore_files(store, group: str, data_dir: Path = DATA_DIR) -> int:
+    """依 latest/<群組>.json 指標取回上次發佈的資料檔與增量，回傳取回的檔案數 (沒有指標時為 0)
+
+    CI 不再把資料提交回 repo，爬取前需先取回上一版，否則增量會以舊的快照計算且序號重複
+    """
+    pointer_body = store.get(f"latest/{group}.json")
+    if pointer_body is None:
+        print(f"⚠️ {store} 沒有 {group} 的發佈指標，以目前的資料檔開始")
+        return 0
+    entries = json.loads(pointer_body)["files"]
+    
+    def fetch(entry: Dict[str, Any]) -> bytes:
+        body = store.get(entry["key"])
+        if body is None or _sha256(body) != entry["sha256"]:
+            raise RuntimeError(f"物件遺失或內容不符: {entry['key']}")
+        return body
+    
+    with ThreadPoolExecutor(max_workers=PUBLISH_CONCURRENCY) as executor:
+        bodies = dict(zip(entries, executor.map(fetch, entries.values())))
+    
+    # 先清掉舊 checkout 留下的增量，避免與取回的序號混在一起
+    restored_streams = {Path(name).parent for name in bodies if "/" in name}
+    data_files = [data_dir / name for name in bodies if "/" not in name]
+    with locked_files(data_files):
+        for stream in restored_streams:
+            for stale in (data_dir / stream).glob("*.json"):
+                stale.unlink()
+        for name, body in bodies.items():
+            path = data_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = Path(f"{path}.tmp")
+            tmp_path.write_bytes(body)
+            tmp_path.replace(path)
+    
+    print(f"📥 已從 {store} 取回 {group} 的 {len(bodies)} 個檔案")
+    return len(bodies)
+
+
+class Publisher:
+    """並行上傳變動的物件，最後替換群組指標"""
+    def __init__(self, store, state_path: Path = PUBLISH_STATE_FILE, concurrency: int = PUBLISH_CONCURRENCY):
+        self.store = store
+        self.state_path = state_path
+        self.concurrency = concurrency
+        self.state = self._load_state()
+    
+    def _load_state(self) -> Dict[str, str]:
+        """上次成功上傳的 鍵: sha256 (只對應同一個目的地)"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ 讀取發佈狀態失敗: {e}")
+            return {}
+        return state.get("objects", {}) if state.get("store") == str(self.store) else {}
+    
+    def _save_state(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"store": str(self.store), "objects": self.state}, f, indent=2)
+        tmp_path.replace(self.state_path)
+    
+    def _upload(self, file: PublishFile) -> bool:
+        """上傳單一物件，回傳是否實際上傳 (內容相同時略過)"""
+        if self.state.get(file.key) == file.sha256:
+            return False
+        # 本機沒有紀錄 (例如 CI 的全新環境) 時查詢遠端的中繼資料
+        remote = self.store.head(file.key)
+        if remote is not None and remote.get("sha256") == file.sha256:
+            self.state[file.key] = file.sha256
+            return False
+        body, headers = file.body_and_headers()
+        self.store.put(file.key, body, headers)
+        self.state[file.key] = file.sha256
+        return True
+    
+    def publish(self, group: str, files: List[PublishFile]) -> Dict[str, Any]:
+        """上傳所有物件後寫入 latest/<群組>.json 指標，任何物件上傳失敗時不替換指標"""
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {file.key: executor.submit(self._upload, file) for file in files}
+        
+        uploaded, failed = 0, []
+        for key, future in futures.items():
+            try:
+                uploaded += future.result()
+            except Exception as e:
+                print(f"❌ 上傳 {key} 失敗: {e}")
+                failed.append(key)
+        self._save_state()
+        if failed:
+            raise RuntimeError(f"{len(failed)} 個物件上傳失敗，未更新指標")
+        
+        pointer = {
+            "group": group,
+            "published": datetime.now(timezone.utc).isoformat(),
+            "files": {
+                file.name: {"key": file.key, "sha256": file.sha256, "size": len(file.content)}
+                for file in files
+            },
+        }
+        body = json.dumps(pointer, ensure_ascii=False, indent=2).encode('utf-8')
+        self.store.put(f"latest/{group}.json", body, {
+            "ContentType": "application/json; charset=utf-8",
+            "CacheControl": POINTER_CACHE_CONTROL,
+            "Metadata": {"sha256": _sha256(body)},
+        })
+        
+        summary = {
+            "files": len(files),
+            "uploaded": uploaded,
+            "skipped": len(files) - uploaded,
+            "seconds": round(time.monotonic() - start, 2),
+        }
+        print(f"☁️ 發佈 {group}: 上傳 {uploaded} 個、略過 {summary['skipped']} 個未變動物件 "
+              f"({summary['seconds']} 秒) → {self.store}/latest/{group}.json")
+        return summary
@@ -6,28 +6,39 @@ Reddit 熱門文章爬蟲 - Python 版本
 """
 
 import json
+import os
 import time
 import random
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
 from fake_useragent import UserAgent
 
+from browser_profile import BrowserProfile, apply_browser_profile, apply_profile_options
+from checkpoint import CheckpointJournal
+from driver_watchdog import MANAGED_BROWSER_FLAG, DriverSupervisor
+from payload_archive import archive_payload
+from remote_browser import create_driver
+from snapshot_writer import SnapshotBatch, write_snapshot
+
 class RedditUrl:
     """Reddit URL 配置類"""
     def __init__(self, url: str, filename: str, description: str):
         self.url = url
         self.filename = filename
         self.description = description
+    
+    @property
+    def stream_filename(self) -> str:
+        """深度分頁的 NDJSON 輸出檔"""
+        return str(Path(self.filename).with_suffix('.ndjson'))
 
 # Reddit 子版塊配置
 REDDIT_URLS = [
@@ -48,6 +59,18 @@ REDDIT_URLS = [
     )
 ]
 
+# 瀏覽器資源阻擋設定 (Reddit 只讀取 JSON 回應)
+BROWSER_PROFILE = BrowserProfile(block=('images', 'media', 'fonts', 'trackers'))
+
+# 同一個瀏覽器最多載入的頁數，超過後重新啟動 (同時更換 User-Agent)
+REDDIT_MAX_PAGES_PER_DRIVER = 10
+
+# 深度分頁: 每個子版塊最多讀取的頁數與每頁文章數 (Reddit 上限 100)
+# 每次執行會多載入約 15 頁，預設關閉，設定 REDDIT_DEEP_PAGING=1 開啟
+REDDIT_DEEP_PAGING = os.environ.get('REDDIT_DEEP_PAGING', '0') == '1'
+REDDIT_DEEP_PAGES = 5
+REDDIT_PAGE_LIMIT = 100
+
 def setup_driver():
     """設定 Chrome WebDriver"""
     options = Options()
@@ -57,23 +80,34 @@ def setup_driver():
     options.add_argument('--disable-setuid-sandbox')
     options.add_argument('--disable-blink-features=AutomationControlled')
     options.add_argument('--disable-features=VizDisplayCompositor')
+    options.add_argument(MANAGED_BROWSER_FLAG)
     
     # 設定隨機 User-Agent
     ua = UserAgent()
     user_agent = ua.random
     options.add_argument(f'--user-agent={user_agent}')
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    # 套用資源阻擋的偏好設定
+    apply_profile_options(options, BROWSER_PROFILE)
+    
+    driver = create_driver(options)
+    apply_browser_profile(driver, BROWSER_PROFILE)
     
     # 移除 webdriver 痕跡
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     
     return driver
 
-def fetch_reddit_data_with_selenium(url: str) -> Optional[Dict]:
-    """使用 Selenium 獲取 Reddit JSON 資料"""
-    driver = setup_driver()
+def parse_reddit_payload(json_text: str) -> Dict:
+    """解析 Reddit JSON API 回應"""
+    return json.loads(json_text)
+
+def fetch_reddit_data_with_selenium(url: str,
+                                    supervisor: Optional[DriverSupervisor] = None) -> Optional[Dict]:
+    """使用 Selenium 獲取 Reddit JSON 資料 (傳入 supervisor 時沿用同一個瀏覽器)"""
+    owns_supervisor = supervisor is None
+    if supervisor is None:
+        supervisor = DriverSupervisor(setup_driver)
     
     try:
         print(f"🔗 正在存取: {url}")
@@ -84,7 +118,8 @@ def fetch_reddit_data_with_selenium(url: str) -> Optional[Dict]:
         time.sleep(delay)
         
         # 前往 Reddit JSON API
-        driver.get(url)
+        supervisor.get(url)
+        driver = supervisor.driver
         
         # 等待頁面載入
         try:
@@ -113,8 +148,9 @@ def fetch_reddit_data_with_selenium(url: str) -> Optional[Dict]:
                     # 如果沒有 pre 標籤，直接使用頁面內容
                     json_text = driver.find_element(By.TAG_NAME, "body").text
                 
-                # 解析 JSON
-                data = json.loads(json_text)
+                # 封存原始回應並解析 JSON
+                archive_payload("reddit", url, json_text, "application/json")
+                data = parse_reddit_payload(json_text)
                 print("✅ 成功獲取 JSON 資料")
                 return data
                 
@@ -133,7 +169,8 @@ def fetch_reddit_data_with_selenium(url: str) -> Optional[Dict]:
         return None
     
     finally:
-        driver.quit()
+        if owns_supervisor:
+            supervisor.quit()
 
 def process_reddit_data(data: Dict, description: str) -> Optional[Dict]:
     """處理 Reddit 資料"""
@@ -159,8 +196,8 @@ def process_reddit_data(data: Dict, description: str) -> Optional[Dict]:
         print(f"❌ 處理資料時發生錯誤: {e}")
         return None
 
-def save_reddit_data(data: Dict, filename: str) -> Optional[Path]:
-    """儲存 Reddit 資料到檔案"""
+def save_reddit_data(data: Dict, filename: str, batch: Optional[SnapshotBatch] = None) -> Optional[Path]:
+    """儲存 Reddit 資料到檔案 (傳入 batch 時暫存，commit 時與其他子版塊一起寫入)"""
     try:
         # 確保 data 資料夾存在
         data_dir = Path("data")
@@ -168,10 +205,11 @@ def save_reddit_data(data: Dict, filename: str) -> Optional[Path]:
         
         # 建立完整檔案路徑
         output_file = Path(filename)
+        if batch is not None:
+            return batch.add(output_file, data)
         
         # 寫入 JSON 檔案
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        write_snapshot(output_file, data)
         
         print(f"💾 資料已儲存至: {output_file}")
         return output_file
@@ -180,79 +218,234 @@ def save_reddit_data(data: Dict, filename: str) -> Optional[Path]:
         print(f"❌ 儲存檔案時發生錯誤: {e}")
         return None
 
-def scrape_all_reddit_data():
-    """爬取所有 Reddit 子版塊資料"""
+def page_url(url: str, after: Optional[str] = None, limit: int = REDDIT_PAGE_LIMIT,
+             count: int = 0) -> str:
+    """在 listing 網址加上分頁參數"""
+    parts = urlparse(url)
+    query = dict(parse_qsl(parts.query))
+    query['limit'] = str(limit)
+    if after:
+        query['after'] = after
+        query['count'] = str(count)
+    else:
+        query.pop('after', None)
+        query.pop('count', None)
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+def load_cursor(cursor_file: Path) -> Optional[Dict]:
+    """讀取上次中斷時的分頁游標"""
+    if not cursor_file.exists():
+        return None
+    try:
+        with open(cursor_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ 讀取分頁游標失敗: {e}")
+        return None
+
+def save_cursor(cursor_file: Path, cursor: Dict) -> None:
+    """每讀完一頁就更新游標，中斷後可從這裡繼續"""
+    tmp_file = cursor_file.with_suffix('.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(cursor, f, ensure_ascii=False)
+    tmp_file.replace(cursor_file)
+
+def read_partial_ids(partial_file: Path) -> set:
+    """讀取進行中輸出的文章 ID，寫到一半中斷的最後一行直接截掉 (該頁會從游標重新讀取)"""
+    seen = set()
+    with open(partial_file, 'r+b') as f:
+        good = 0
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("truncated line")
+                seen.add(json.loads(line).get('name'))
+            except ValueError:
+                print(f"⚠️ 截掉 {partial_file} 中斷時寫到一半的內容")
+                f.truncate(good)
+                break
+            good += len(line)
+    return seen
+
+def stream_reddit_listing(reddit_config: RedditUrl, supervisor: DriverSupervisor,
+                          max_pages: int = REDDIT_DEEP_PAGES, resume: bool = True) -> int:
+    """依 after 游標逐頁讀取 listing，每篇文章讀到就寫入 NDJSON，回傳本次寫入的文章數
+
+    進行中的輸出寫在 <檔名>.ndjson.partial，游標記錄在 <檔名>.ndjson.cursor；
+    全部讀完才改名為正式檔案，中斷後重新執行會從上次的游標繼續
+    """
+    output_file = Path(reddit_config.stream_filename)
+    partial_file = output_file.with_suffix('.ndjson.partial')
+    cursor_file = output_file.with_suffix('.ndjson.cursor')
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    
+    cursor = load_cursor(cursor_file) if resume and partial_file.exists() else None
+    seen = set()
+    if cursor:
+        # 只保留文章 ID，不把整份檔案載入記憶體
+        seen = read_partial_ids(partial_file)
+        print(f"↩️ 從第 {cursor['pages'] + 1} 頁繼續 (after={cursor['after']}, 已有 {len(seen)} 篇)")
+    else:
+        cursor = {"after": None, "pages": 0, "count": 0, "started": datetime.now().isoformat() + "Z"}
+        partial_file.write_text('', encoding='utf-8')
+    
+    written = 0
+    with open(partial_file, 'a', encoding='utf-8') as output:
+        while cursor["pages"] < max_pages:
+            url = page_url(reddit_config.url, cursor["after"], count=cursor["count"])
+            page = fetch_reddit_data_with_selenium(url, supervisor)
+            if not page or 'data' not in page:
+                print(f"⚠️ 第 {cursor['pages'] + 1} 頁讀取失敗，保留游標供下次繼續")
+                return written
+            
+            listing = page['data']
+            for child in listing.get('children', []):
+                post = child.get('data', {})
+                # 分頁期間排名會變動，同一篇文章可能出現在相鄰兩頁
+                if post.get('name') in seen:
+                    continue
+                seen.add(post.get('name'))
+                output.write(json.dumps(post, ensure_ascii=False) + "\n")
+                written += 1
+            output.flush()
+            
+            cursor["pages"] += 1
+            cursor["count"] += len(listing.get('children', []))
+            cursor["after"] = listing.get('after')
+            save_cursor(cursor_file, cursor)
+            print(f"📄 第 {cursor['pages']} 頁完成，累計 {len(seen)} 篇")
+            
+            if not cursor["after"]:
+                break
+    
+    partial_file.replace(output_file)
+    cursor_file.unlink(missing_ok=True)
+    print(f"💾 {len(seen)} 篇文章已寫入: {output_file}")
+    return written
+
+def scrape_reddit_streams(max_pages: int = REDDIT_DEEP_PAGES, resume: bool = True) -> Dict[str, int]:
+    """為每個子版塊執行深度分頁，回傳 {NDJSON 檔名: 本次寫入文章數}"""
+    written: Dict[str, int] = {}
+    supervisor = DriverSupervisor(setup_driver, max_pages=REDDIT_MAX_PAGES_PER_DRIVER)
+    
+    try:
+        for reddit_config in REDDIT_URLS:
+            print(f"\n📚 深度分頁: {reddit_config.description} (最多 {max_pages} 頁)")
+            try:
+                written[reddit_config.stream_filename] = stream_reddit_listing(
+                    reddit_config, supervisor, max_pages=max_pages, resume=resume)
+            except Exception as e:
+                print(f"❌ 深度分頁 {reddit_config.description} 時發生錯誤: {e}")
+                written[reddit_config.stream_filename] = 0
+    finally:
+        supervisor.quit()
+    
+    return written
+
+def scrape_all_reddit_data(journal: Optional[CheckpointJournal] = None):
+    """爬取所有 Reddit 子版塊資料 (傳入 journal 時略過已完成的子版塊並記錄進度)
+
+    所有子版塊的資料檔在最後同一批寫入，讀者不會看到新舊混雜的子版塊
+    """
     results = []
+    batch = SnapshotBatch("reddit")
+    # 所有子版塊共用一個瀏覽器，依頁數或記憶體上限自動回收
+    supervisor = DriverSupervisor(setup_driver, max_pages=REDDIT_MAX_PAGES_PER_DRIVER)
     
     print("🚀 開始爬取所有 Reddit 子版塊...")
     print("=" * 60)
     
-    for reddit_config in REDDIT_URLS:
-        print(f"\n📋 處理: {reddit_config.description}")
-        print("-" * 40)
-        
-        try:
-            # 獲取原始資料
-            raw_data = fetch_reddit_data_with_selenium(reddit_config.url)
+    try:
+        for reddit_config in REDDIT_URLS:
+            print(f"\n📋 處理: {reddit_config.description}")
+            print("-" * 40)
+            
+            # 上次執行已完成的子版塊，直接沿用日誌中的資料與結果
+            if journal is not None and journal.is_done(reddit_config.filename):
+                record = journal.targets[reddit_config.filename]
+                if record.get("data") is not None:
+                    save_reddit_data(record["data"], reddit_config.filename, batch)
+                results.append(record["result"])
+                print(f"♻️ 沿用檢查點: {reddit_config.filename}")
+                continue
             
-            if raw_data:
-                # 處理資料
-                processed_data = process_reddit_data(raw_data, reddit_config.description)
+            try:
+                # 獲取原始資料
+                raw_data = fetch_reddit_data_with_selenium(reddit_config.url, supervisor)
                 
-                if processed_data:
-                    # 儲存資料
-                    output_file = save_reddit_data(processed_data, reddit_config.filename)
+                if raw_data:
+                    # 處理資料
+                    processed_data = process_reddit_data(raw_data, reddit_config.description)
                     
-                    if output_file:
-                        results.append({
-                            'description': reddit_config.description,
-                            'filename': reddit_config.filename,
-                            'posts_count': processed_data.get('total_posts', 0),
-                            'status': 'success'
-                        })
+                    if processed_data:
+                        # 儲存資料
+                        output_file = save_reddit_data(processed_data, reddit_config.filename, batch)
+                        
+                        if output_file:
+                            result = {
+                                'description': reddit_config.description,
+                                'filename': reddit_config.filename,
+                                'posts_count': processed_data.get('total_posts', 0),
+                                'status': 'success'
+                            }
+                            results.append(result)
+                            if journal is not None:
+                                journal.record(reddit_config.filename, [], result=result, data=processed_data)
+                        else:
+                            results.append({
+                                'description': reddit_config.description,
+                                'filename': reddit_config.filename,
+                                'status': 'save_failed'
+                            })
                     else:
                         results.append({
                             'description': reddit_config.description,
                             'filename': reddit_config.filename,
-                            'status': 'save_failed'
+                            'status': 'process_failed'
                         })
                 else:
                     results.append({
                         'description': reddit_config.description,
                         'filename': reddit_config.filename,
-                        'status': 'process_failed'
+                        'status': 'fetch_failed'
                     })
-            else:
+            
+            except Exception as e:
+                print(f"❌ 處理 {reddit_config.description} 時發生錯誤: {e}")
                 results.append({
                     'description': reddit_config.description,
                     'filename': reddit_config.filename,
-                    'status': 'fetch_failed'
+                    'status': 'error',
+                    'error': str(e)
                 })
+            
+            # 在子版塊之間添加延遲
+            if reddit_config != REDDIT_URLS[-1]:  # 不是最後一個
+                delay = random.uniform(3, 6)
+                print(f"⏳ 等待 {delay:.2f} 秒後繼續下一個子版塊...")
+                time.sleep(delay)
         
-        except Exception as e:
-            print(f"❌ 處理 {reddit_config.description} 時發生錯誤: {e}")
-            results.append({
-                'description': reddit_config.description,
-                'filename': reddit_config.filename,
-                'status': 'error',
-                'error': str(e)
-            })
-        
-        # 在子版塊之間添加延遲
-        if reddit_config != REDDIT_URLS[-1]:  # 不是最後一個
-            delay = random.uniform(3, 6)
-            print(f"⏳ 等待 {delay:.2f} 秒後繼續下一個子版塊...")
-            time.sleep(delay)
+    finally:
+        supervisor.quit()
+    
+    try:
+        batch.commit()
+    except Exception as e:
+        print(f"❌ 寫入 Reddit 資料檔時發生錯誤: {e}")
+        for result in results:
+            if result.get('status') == 'success':
+                result['status'] = 'save_failed'
     
     return results
 
-def main():
-    """主函數"""
+def main() -> bool:
+    """主函數，回傳是否所有子版塊都成功"""
     print("🔥 Reddit 熱門文章爬蟲 - Python 版本")
     print("=" * 50)
     
-    # 爬取所有資料
-    results = scrape_all_reddit_data()
+    # 爬取所有資料 (每個子版塊完成時寫入檢查點，中斷後重新執行會接續)
+    journal = CheckpointJournal("reddit")
+    results = scrape_all_reddit_data(journal)
     
     # 顯示總結
     print("\n" + "=" * 60)
@@ -278,7 +471,17 @@ def main():
     
     print("-" * 60)
     print(f"🎯 成功爬取: {success_count}/{len(REDDIT_URLS)} 個子版塊")
+    
+    # 所有子版塊都成功才清除檢查點，否則重新執行時只補爬失敗的子版塊
+    if success_count == len(REDDIT_URLS):
+        journal.finish()
     print(f"📈 總文章數: {total_posts} 篇")
+    
+    # 深度分頁輸出 NDJSON (失敗時保留游標，下次執行繼續)
+    if REDDIT_DEEP_PAGING:
+        scrape_reddit_streams()
+    
+    return success_count == len(REDDIT_URLS)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+遠端瀏覽器 (Selenium Grid / Remote WebDriver)
+設定 SELENIUM_REMOTE_URL 後，爬蟲的瀏覽器改由遠端節點提供：依各端點 /status 回報的空閒容量分派，
+用完的工作階段放回池中重複使用，遠端沒有容量或無法連線時改用本機 Chrome
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+from selenium.webdriver.remote.command import Command
+from webdriver_manager.chrome import ChromeDriverManager
+
+# 遠端端點 (多個以逗號分隔)，例如 http://localhost:4444
+SELENIUM_REMOTE_URL = os.environ.get('SELENIUM_REMOTE_URL', '')
+# 遠端不可用時是否改用本機 Chrome
+SELENIUM_REMOTE_FALLBACK = os.environ.get('SELENIUM_REMOTE_FALLBACK', '1') != '0'
+
+# 每種設定最多保留的閒置工作階段數、閒置工作階段的最長保留時間 (秒，需短於 Grid 的 session timeout)
+REMOTE_POOL_SIZE = 4
+REMOTE_SESSION_MAX_IDLE = 240
+# 所有端點都滿載時等待空位的秒數，以及查詢 /status 的逾時
+REMOTE_CAPACITY_WAIT = 60
+REMOTE_STATUS_TIMEOUT = 5
+
+
+def remote_endpoints(value: str = SELENIUM_REMOTE_URL) -> List[str]:
+    return [url.strip().rstrip('/') for url in value.split(',') if url.strip()]
+
+
+def free_slots(endpoint: str) -> Optional[int]:
+    """查詢端點的空閒瀏覽器數量 (Selenium 4 Grid/standalone 的 /status)，無法連線時回傳 None"""
+    try:
+        response = requests.get(f"{endpoint}/status", timeout=REMOTE_STATUS_TIMEOUT)
+        response.raise_for_status()
+        status = response.json().get("value", {})
+    except (requests.RequestException, ValueError) as e:
+        print(f"⚠️ 無法取得遠端狀態 {endpoint}: {e}")
+        return None
+    
+    if not status.get("ready"):
+        return 0
+    nodes = status.get("nodes")
+    if nodes is None:
+        # 舊版或其他相容服務沒有節點資訊，只知道可以接受工作階段
+        return 1
+    return sum(
+        1
+        for node in nodes if node.get("availability", "UP") == "UP"
+        for slot in node.get("slots", []) if not slot.get("session")
+    )
+
+
+class RemoteChrome(webdriver.Remote):
+    """遠端 Chrome，額外支援 CDP 指令與 performance log (透過 chromedriver 的廠商擴充端點)"""
+    def __init__(self, endpoint: str, options, pool: Optional['RemoteSessionPool'] = None,
+                 pool_key: str = ""):
+        executor = ChromiumRemoteConnection(endpoint, "goog", "chrome")
+        super().__init__(command_executor=executor, options=options)
+        self.endpoint = endpoint
+        self.pool = pool
+        self.pool_key = pool_key
+        self.idle_since = 0.0
+    
+    def execute_cdp_cmd(self, cmd: str, cmd_args: dict) -> dict:
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+    
+    def get_log(self, log_type: str) -> list:
+        return self.execute(Command.GET_LOG, {"type": log_type})["value"]
+    
+    def quit(self) -> None:
+        """歸還工作階段到池中，池已滿或狀態異常時才真正關閉"""
+        if self.pool is None or not self.pool.release(self):
+            self.discard()
+    
+    def discard(self) -> None:
+        """直接結束遠端工作階段"""
+        try:
+            super().quit()
+        except Exception as e:
+            print(f"⚠️ 關閉遠端工作階段時出錯: {e}")
+
+
+def options_key(options) -> str:
+    """相同啟動設定的工作階段才能互相重複使用 (隨機 User-Agent 不列入比較)"""
+    capabilities = options.to_capabilities()
+    chrome_options = dict(capabilities.get("goog:chromeOptions", {}))
+    chrome_options["args"] = [arg for arg in chrome_options.get("args", []) if not arg.startswith("--user-agent=")]
+    return json.dumps(dict(capabilities, **{"goog:chromeOptions": chrome_options}), sort_keys=True, default=str)
+
+
+class RemoteSessionPool:
+    """遠端工作階段池，依端點空閒容量分派新的工作階段"""
+    def __init__(self, endpoints: List[str], max_idle: int = REMOTE_POOL_SIZE):
+        self.endpoints = endpoints
+        self.max_idle = max_idle
+        self.idle: Dict[str, List[RemoteChrome]] = {}
+        self.lock = threading.Lock()
+        atexit.register(self.close_all)
+    
+    def pick_endpoint(self, wait: float = REMOTE_CAPACITY_WAIT) -> Optional[str]:
+        """選擇空閒容量最多的端點，全部滿載時等待空位，逾時或全部無法連線回傳 None"""
+        deadline = time.monotonic() + wait
+        while True:
+            capacity = {endpoint: free_slots(endpoint) for endpoint in self.endpoints}
+            reachable = {endpoint: slots for endpoint, slots in capacity.items() if slots is not None}
+            if not reachable:
+                return None
+            endpoint, slots = max(reachable.items(), key=lambda entry: entry[1])
+            if slots > 0:
+                return endpoint
+            if time.monotonic() >= deadline:
+                print(f"⚠️ 遠端瀏覽器已滿載超過 {wait:.0f} 秒")
+                return None
+            time.sleep(2)
+    
+    def _take_idle(self, key: str) -> Optional[RemoteChrome]:
+        with self.lock:
+            sessions = self.idle.get(key, [])
+            while sessions:
+                driver = sessions.pop()
+                if time.monotonic() - driver.idle_since > REMOTE_SESSION_MAX_IDLE:
+                    driver.discard()
+                    continue
+                try:
+                    driver.current_url  # 確認工作階段仍然存在
+                    return driver
+                except WebDriverException:
+                    continue
+        return None
+    
+    def acquire(self, options) -> Optional[RemoteChrome]:
+        """取得遠端工作階段 (優先重複使用閒置的)，沒有可用容量時回傳 None"""
+        key = options_key(options)
+        driver = self._take_idle(key)
+        if driver is not None:
+            print(f"♻️ 重複使用遠端瀏覽器: {driver.endpoint}")
+            return driver
+        
+        endpoint = self.pick_endpoint()
+        if endpoint is None:
+            return None
+        try:
+            driver = RemoteChrome(endpoint, options, self, key)
+        except WebDriverException as e:
+            print(f"⚠️ 無法建立遠端瀏覽器 {endpoint}: {e.msg}")
+            return None
+        print(f"🌐 使用遠端瀏覽器: {endpoint}")
+        return driver
+    
+    def release(self, driver: RemoteChrome) -> bool:
+        """清除狀態後放回池中，回傳是否成功放回"""
+        with self.lock:
+            sessions = self.idle.setdefault(driver.pool_key, [])
+            if len(sessions) >= self.max_idle:
+                return False
+        try:
+            # 只保留第一個分頁並清除 Cookie，避免影響下一個使用者
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            driver.get('about:blank')
+        except WebDriverException:
+            return False
+        driver.idle_since = time.monotonic()
+        with self.lock:
+            self.idle[driver.pool_key].append(driver)
+        return True
+    
+    def close_all(self) -> None:
+        """結束所有閒置的工作階段"""
+        with self.lock:
+            sessions = [driver for drivers in self.idle.values() for driver in drivers]
+            self.idle.clear()
+        for driver in sessions:
+            driver.discard()
+
+
+_pool: Optional[RemoteSessionPool] = None
+
+
+def remote_pool() -> Optional[RemoteSessionPool]:
+    """依 SELENIUM_REMOTE_URL 建立的共用工作階段池 (未設定時為 None)"""
+    global _pool
+    endpoints = remote_endpoints()
+    if _pool is None and endpoints:
+        _pool = RemoteSessionPool(endpoints)
+    return _pool
+
+
+def create_driver(options):
+    """建立瀏覽器: 有設定遠端端點時優先使用遠端，否則 (或遠端不可用時) 啟動本機 Chrome"""
+    pool = remote_pool()
+    if pool is not None:
+        driver = pool.acquire(options)
+        if driver is not None:
+            return driver
+        if not SELENIUM_REMOTE_FALLBACK:
+            raise WebDriverException("沒有可用的遠端瀏覽器")
+        print("⚠️ 遠端瀏覽器不可用，改用本機 Chrome")
+    
+    service = Service(ChromeDriverManager().install())
+    return webdriver.Chrome(service=service, options=options)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分散式爬蟲工作
+協調者把每個爬蟲目標排入工作佇列，worker 租用工作後呼叫既有的爬蟲函式，
+結果放回佇列的共用結果區，最後由協調者統一寫入 data/ (沿用各爬蟲的 save 函式)
+"""
+
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from google_trends import GOOGLE_TARGETS, GoogleTrendsTarget, collect_google_trends, save_trends_data
+from ptt_trends import PTT_MERGED_FILENAME, PTT_TARGETS, PttTarget, merge_ptt_articles, save_ptt_data, scrape_ptt_targets
+from komica_trends import (
+    KOMICA_BOARDS, KOMICA_MERGED_FILENAME, KomicaBoard, merge_komica_trends, save_komica_data, scrape_komica_boards
+)
+from reddit_trends import REDDIT_URLS, RedditUrl, fetch_reddit_data_with_selenium, process_reddit_data, save_reddit_data
+from bbc_trends import BBC_FEEDS, save_bbc_data, scrape_bbc_rss
+from job_queue import DEFAULT_LEASE_SECONDS, Job
+from snapshot_writer import SnapshotBatch
+from trend_item import TrendItem
+
+# 沒有工作時的輪詢間隔 (秒)
+WORKER_IDLE_SECONDS = 10
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def build_jobs(sources: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """把各爬蟲的目標配置轉成工作 (source、target 為輸出檔名、params 為建立配置所需的參數)"""
+    jobs = []
+    for target in GOOGLE_TARGETS:
+        jobs.append({"source": "google", "target": target.filename, "params": vars(target)})
+    for target in PTT_TARGETS:
+        jobs.append({"source": "ptt", "target": target.filename, "params": vars(target)})
+    for board in KOMICA_BOARDS:
+        jobs.append({"source": "komica", "target": board.filename, "params": vars(board)})
+    for reddit_config in REDDIT_URLS:
+        jobs.append({"source": "reddit", "target": reddit_config.filename, "params": vars(reddit_config)})
+    jobs.append({"source": "bbc", "target": "data/bbc-trends.json", "params": {"feeds": BBC_FEEDS}})
+    return [job for job in jobs if not sources or job["source"] in sources]
+
+
+def run_google_job(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [trend.to_dict() for trend in collect_google_trends(GoogleTrendsTarget(**params))]
+
+
+def run_ptt_job(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    target = PttTarget(**params)
+    return [article.to_dict() for article in scrape_ptt_targets([target])[target.filename]]
+
+
+def run_komica_job(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    board = KomicaBoard(**params)
+    return [trend.to_dict() for trend in scrape_komica_boards([board])[board.filename]]
+
+
+def run_reddit_job(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    reddit_config = RedditUrl(**params)
+    raw_data = fetch_reddit_data_with_selenium(reddit_config.url)
+    return process_reddit_data(raw_data, reddit_config.description) if raw_data else None
+
+
+def run_bbc_job(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [article.to_dict() for article in scrape_bbc_rss(params["feeds"]) or []]
+
+
+# 各來源的工作執行函式 (回傳可 JSON 序列化的結果，沒有資料時回傳空值)
+JOB_RUNNERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "google": run_google_job,
+    "ptt": run_ptt_job,
+    "komica": run_komica_job,
+    "reddit": run_reddit_job,
+    "bbc": run_bbc_job,
+}
+
+
+def enqueue_jobs(queue, sources: Optional[List[str]] = None) -> int:
+    """把工作排入佇列，回傳實際新增的數量 (已在佇列或執行中的目標會略過)"""
+    added = 0
+    for job in build_jobs(sources):
+        if queue.enqueue(job["source"], job["target"], job["params"]):
+            added += 1
+            print(f"📥 已排入: {job['source']} → {job['target']}")
+        else:
+            print(f"⏭️ 已在佇列中: {job['source']} → {job['target']}")
+    return added
+
+
+class LeaseKeeper:
+    """工作執行期間在背景定期延長租約"""
+    def __init__(self, queue, job: Job, lease_seconds: float):
+        self.queue = queue
+        self.job = job
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+    
+    def _run(self) -> None:
+        while not self.stopped.wait(self.lease_seconds / 3):
+            try:
+                if not self.queue.extend(self.job, self.lease_seconds):
+                    print(f"⚠️ 租約已被接手: {self.job}")
+                    return
+            except Exception as e:
+                print(f"⚠️ 延長租約失敗: {e}")
+    
+    def __enter__(self) -> 'LeaseKeeper':
+        self.thread.start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+
+def run_worker(queue, worker_id: str, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+               max_jobs: Optional[int] = None, exit_when_idle: bool = False) -> int:
+    """持續租用並執行工作，回傳完成的工作數"""
+    completed = 0
+    processed = 0
+    print(f"👷 Worker {worker_id} 開始處理工作")
+    
+    while max_jobs is None or processed < max_jobs:
+        job = queue.lease(worker_id, lease_seconds)
+        if job is None:
+            if exit_when_idle:
+                break
+            time.sleep(WORKER_IDLE_SECONDS)
+            continue
+        
+        processed += 1
+        runner = JOB_RUNNERS.get(job.source)
+        print(f"\n🔧 執行 {job}")
+        started = time.monotonic()
+        try:
+            if runner is None:
+                raise ValueError(f"未知的來源: {job.source}")
+            with LeaseKeeper(queue, job, lease_seconds):
+                result = runner(job.params)
+            if not result:
+                raise RuntimeError("沒有取得資料")
+        except Exception as e:
+            status = queue.fail(job, str(e))
+            print(f"❌ {job.target} 失敗 ({e})，狀態: {status}")
+            continue
+        
+        if queue.complete(job, result):
+            completed += 1
+            print(f"✅ {job.target} 完成 ({time.monotonic() - started:.1f} 秒)")
+        else:
+            print(f"⚠️ {job.target} 租約已失效，結果捨棄")
+    
+    return completed
+
+
+def save_job_results(results: List[Dict[str, Any]]) -> int:
+    """把 worker 回報的結果寫入 data/，多個 PTT/Komica 目標同時完成時一併更新合併檔
+
+    同一個來源的資料檔同一批寫入 (與單機執行各爬蟲時相同)；寫入失敗時拋出例外，
+    呼叫端確認寫入成功後才從佇列移除結果
+    """
+    items_by_source: Dict[str, Dict[str, List[TrendItem]]] = {}
+    batches = {source: SnapshotBatch(source) for source in ("google", "ptt", "komica", "reddit", "bbc")}
+    
+    for entry in results:
+        source, target, result = entry["source"], entry["target"], entry["result"]
+        if source == "reddit":
+            save_reddit_data(result, target, batches["reddit"])
+            continue
+        
+        items = [TrendItem.from_dict(source, data) for data in result]
+        items_by_source.setdefault(source, {})[target] = items
+        if source == "google":
+            save_trends_data(items, target, batches["google"])
+        elif source == "ptt":
+            save_ptt_data(items, target, batches["ptt"])
+        elif source == "komica":
+            save_komica_data(items, target, batches["komica"])
+        elif source == "bbc":
+            save_bbc_data(items, batches["bbc"])
+    
+    ptt_results = items_by_source.get("ptt", {})
+    if len(PTT_TARGETS) > 1 and len(ptt_results) == len(PTT_TARGETS):
+        save_ptt_data(merge_ptt_articles(ptt_results), PTT_MERGED_FILENAME, batches["ptt"])
+    komica_results = items_by_source.get("komica", {})
+    if len(KOMICA_BOARDS) > 1 and len(komica_results) == len(KOMICA_BOARDS):
+        save_komica_data(merge_komica_trends(komica_results), KOMICA_MERGED_FILENAME, batches["komica"])
+    
+    for batch in batches.values():
+        batch.commit()
+    return len(results)
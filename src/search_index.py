@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全文搜尋索引
+把各來源資料檔中的項目增量寫入 SQLite FTS5 索引，中日韓文字先切成二元詞 (bigram) 再交給 unicode61 分詞
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from data_sources import DATA_DIR, DATA_SOURCES, REDDIT_FILES
+from trend_item import TrendItem, reddit_item
+
+SEARCH_INDEX_FILE = Path("cache") / "search-index.db"
+
+# 中日韓文字 (含假名與諺文)
+CJK_RUN_PATTERN = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL,
+    link TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_last_seen ON items (last_seen);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(title, body, tokenize='unicode61 remove_diacritics 2');
+"""
+
+# 全文索引的斷詞版本 (PRAGMA user_version)，變更 cjk_tokens 的索引方式時遞增，開啟舊索引會重建
+TOKENIZER_VERSION = 2
+
+
+def cjk_tokens(text: str, index: bool = False) -> List[str]:
+    """把文字轉為索引用的詞: 中日韓文字切成相鄰二元詞，其他文字保持原樣交給 unicode61
+
+    index=True 時在每段中日韓文字最後再加上末字的單字詞，每個字都是某個詞的開頭，
+    單字查詢以前綴比對 ("台"*) 就能找到所有出現位置；查詢時不加，片語才能對上相鄰的二元詞
+    """
+    tokens: List[str] = []
+    position = 0
+    for match in CJK_RUN_PATTERN.finditer(text):
+        if match.start() > position:
+            tokens.append(text[position:match.start()])
+        run = match.group()
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+            if index:
+                tokens.append(run[-1])
+        position = match.end()
+    if position < len(text):
+        tokens.append(text[position:])
+    return [token.strip() for token in tokens if token.strip()]
+
+
+def build_match_query(query: str) -> str:
+    """把搜尋字串轉為 FTS5 MATCH 語法: 每個以空白分隔的詞是一個片語，多個詞之間為 AND"""
+    phrases = []
+    for term in query.split():
+        tokens = cjk_tokens(term)
+        if len(tokens) == 1 and len(tokens[0]) == 1 and CJK_RUN_PATTERN.match(tokens[0]):
+            # 單一中日韓文字沒有對應的二元詞，以前綴比對所有以該字開頭的詞
+            phrases.append(f'"{tokens[0]}"*')
+        elif tokens:
+            phrases.append('"' + ' '.join(tokens).replace('"', '""') + '"')
+    if not phrases:
+        raise ValueError("搜尋字串不可為空")
+    return ' '.join(phrases)
+
+
+def iter_source_items(data_dir: Path = DATA_DIR) -> Iterator[TrendItem]:
+    """逐一產生各資料檔中的項目"""
+    for source, pattern, items_key in DATA_SOURCES:
+        for path in sorted(data_dir.glob(pattern)):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for item in data.get(items_key) or []:
+                trend = TrendItem.from_dict(source, item)
+                if trend.title:
+                    yield trend
+    
+    for path in sorted(data_dir.glob(REDDIT_FILES)):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        listing = data.get("original_data", data)
+        for child in (listing.get("data") or {}).get("children") or []:
+            trend = reddit_item(child.get("data") or {})
+            if trend.title:
+                yield trend
+    
+    # 深度分頁的 NDJSON 逐行讀取
+    for path in sorted(data_dir.glob("reddit-*.ndjson")):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                trend = reddit_item(json.loads(line))
+                if trend.title:
+                    yield trend
+
+
+def item_body(item: TrendItem) -> str:
+    """索引用的內文: 描述、Reddit 內文或補充的摘要"""
+    extra = item.extra
+    body = extra.get("description") or extra.get("selftext") or (extra.get("enrichment") or {}).get("summary")
+    return str(body).strip() if body else ""
+
+
+class SearchIndex:
+    """SQLite FTS5 搜尋索引"""
+    def __init__(self, path: Path = SEARCH_INDEX_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(path))
+        self.connection.executescript(SCHEMA)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] < TOKENIZER_VERSION:
+            self.rebuild_fts()
+    
+    def rebuild_fts(self) -> None:
+        """以目前的斷詞方式重建全文索引 (項目資料不變)"""
+        with self.connection:
+            self.connection.execute("DELETE FROM items_fts")
+            rows = self.connection.execute("SELECT id, title, body FROM items").fetchall()
+            self.connection.executemany(
+                "INSERT INTO items_fts (rowid, title, body) VALUES (?, ?, ?)",
+                [(row_id, ' '.join(cjk_tokens(title, index=True)), ' '.join(cjk_tokens(body, index=True)))
+                 for row_id, title, body in rows])
+            self.connection.execute(f"PRAGMA user_version = {TOKENIZER_VERSION}")
+    
+    def upsert(self, item: TrendItem, seen: Optional[str] = None) -> str:
+        """新增或更新一筆項目，回傳 inserted / updated / unchanged
+
+        內容雜湊相同時只更新 last_seen，不會重新寫入全文索引
+        """
+        source, key, title, link = item.source, item.key, item.title, item.link
+        body = item_body(item)
+        seen = seen or datetime.now(timezone.utc).isoformat()
+        content_hash = hashlib.sha1(f"{title}\n{body}\n{link}".encode('utf-8')).hexdigest()
+        row = self.connection.execute(
+            "SELECT id, content_hash FROM items WHERE key = ?", (key,)).fetchone()
+        
+        if row and row[1] == content_hash:
+            self.connection.execute("UPDATE items SET last_seen = ? WHERE id = ?", (seen, row[0]))
+            return "unchanged"
+        
+        tokens = (' '.join(cjk_tokens(title, index=True)), ' '.join(cjk_tokens(body, index=True)))
+        if row:
+            self.connection.execute(
+                "UPDATE items SET title = ?, body = ?, link = ?, content_hash = ?, last_seen = ? WHERE id = ?",
+                (title, body, link, content_hash, seen, row[0]))
+            self.connection.execute("DELETE FROM items_fts WHERE rowid = ?", (row[0],))
+            self.connection.execute(
+                "INSERT INTO items_fts (rowid, title, body) VALUES (?, ?, ?)", (row[0], *tokens))
+            return "updated"
+        
+        cursor = self.connection.execute(
+            "INSERT INTO items (key, source, title, body, link, content_hash, first_seen, last_seen) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, source, title, body, link, content_hash, seen, seen))
+        self.connection.execute(
+            "INSERT INTO items_fts (rowid, title, body) VALUES (?, ?, ?)", (cursor.lastrowid, *tokens))
+        return "inserted"
+    
+    def index_data_files(self, data_dir: Path = DATA_DIR) -> Dict[str, int]:
+        """把資料檔中的所有項目寫入索引 (單一交易)，回傳各狀態的數量"""
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        seen = datetime.now(timezone.utc).isoformat()
+        with self.connection:
+            for item in iter_source_items(data_dir):
+                counts[self.upsert(item, seen=seen)] += 1
+        return counts
+    
+    def search(self, query: str, days: Optional[float] = None, source: Optional[str] = None,
+               limit: int = 20) -> List[Dict[str, str]]:
+        """全文搜尋，可限制最近出現的天數與來源，依 bm25 排序 (標題權重較高)"""
+        sql = (
+            "SELECT items.source, items.title, items.link, items.first_seen, items.last_seen "
+            "FROM items_fts JOIN items ON items.id = items_fts.rowid "
+            "WHERE items_fts MATCH ?"
+        )
+        params: List[Any] = [build_match_query(query)]
+        if days is not None:
+            sql += " AND items.last_seen >= ?"
+            params.append((datetime.now(timezone.utc) - timedelta(days=days)).isoformat())
+        if source:
+            sql += " AND items.source = ?"
+            params.append(source)
+        sql += " ORDER BY bm25(items_fts, 5.0, 1.0) LIMIT ?"
+        params.append(limit)
+        
+        columns = ("source", "title", "link", "first_seen", "last_seen")
+        return [dict(zip(columns, row)) for row in self.connection.execute(sql, params)]
+    
+    def close(self) -> None:
+        self.connection.close()
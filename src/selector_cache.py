@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+選擇器策略快取
+記錄每個欄位實際命中的選擇器與命中元素數，下次優先嘗試，並在命中率或元素數改變時提出版面變動警告
+"""
+
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+SELECTOR_CACHE_FILE = Path("cache") / "selector-cache.json"
+
+# 命中率下降超過此比例視為版面變動
+DRIFT_HIT_RATE_DROP = 0.2
+# 平均命中元素數變化超過此倍數視為版面變動
+DRIFT_MATCH_RATIO = 2.0
+
+
+class SelectorCache:
+    """單一網站的選擇器策略快取"""
+    def __init__(self, site: str, path: Optional[Path] = SELECTOR_CACHE_FILE):
+        self.site = site
+        self.path = path
+        self.previous: Dict[str, Dict] = self._load().get(site, {}).get("groups", {})
+        # 本次執行的統計: 欄位 -> 選擇器 -> {"hits": 次數, "matches": 命中元素總數}
+        self.stats: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self.attempts: Dict[str, int] = {}
+    
+    def _load(self) -> Dict:
+        if not self.path or not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ 讀取選擇器快取失敗: {e}")
+            return {}
+    
+    def order(self, group: str, selectors: Sequence[str]) -> List[str]:
+        """回傳嘗試順序：上次的勝出者優先，其餘維持原本順序"""
+        winner = self.winner(group)
+        if winner in selectors:
+            return [winner] + [s for s in selectors if s != winner]
+        return list(selectors)
+    
+    def winner(self, group: str) -> Optional[str]:
+        """回傳上次執行的勝出選擇器"""
+        return self.previous.get(group, {}).get("winner")
+    
+    def record_hit(self, group: str, selector: str, matches: int = 1) -> None:
+        """記錄某欄位由指定選擇器命中"""
+        self.attempts[group] = self.attempts.get(group, 0) + 1
+        selector_stats = self.stats.setdefault(group, {}).setdefault(selector, {"hits": 0, "matches": 0})
+        selector_stats["hits"] += 1
+        selector_stats["matches"] += matches
+    
+    def record_miss(self, group: str) -> None:
+        """記錄某欄位所有選擇器都沒有命中"""
+        self.attempts[group] = self.attempts.get(group, 0) + 1
+        self.stats.setdefault(group, {})
+    
+    def summarize(self) -> Dict[str, Dict]:
+        """彙整本次執行每個欄位的勝出選擇器、命中率與平均元素數"""
+        summary = {}
+        for group, selectors in self.stats.items():
+            attempts = self.attempts.get(group, 0)
+            if not attempts:
+                continue
+            
+            hits = sum(s["hits"] for s in selectors.values())
+            winner = max(selectors, key=lambda name: selectors[name]["hits"]) if selectors else None
+            summary[group] = {
+                "winner": winner,
+                "hit_rate": round(hits / attempts, 3),
+                "avg_matches": round(selectors[winner]["matches"] / selectors[winner]["hits"], 2) if winner else 0,
+                "attempts": attempts,
+            }
+        return summary
+    
+    def detect_drift(self, summary: Dict[str, Dict]) -> List[str]:
+        """與上次的結果比較，回傳版面變動的描述"""
+        drift = []
+        for group, current in summary.items():
+            previous = self.previous.get(group)
+            if not previous:
+                continue
+            
+            if current["winner"] != previous.get("winner"):
+                drift.append(f"{group}: 勝出選擇器由 {previous.get('winner')} 變為 {current['winner']}")
+            
+            if previous.get("hit_rate", 0) - current["hit_rate"] > DRIFT_HIT_RATE_DROP:
+                drift.append(f"{group}: 命中率由 {previous['hit_rate']:.0%} 降至 {current['hit_rate']:.0%}")
+            
+            prev_matches = previous.get("avg_matches", 0)
+            cur_matches = current["avg_matches"]
+            if prev_matches and cur_matches and max(prev_matches, cur_matches) / min(prev_matches, cur_matches) > DRIFT_MATCH_RATIO:
+                drift.append(f"{group}: 平均命中元素數由 {prev_matches} 變為 {cur_matches}")
+        return drift
+    
+    def save(self) -> List[str]:
+        """儲存本次結果並回傳偵測到的版面變動"""
+        summary = self.summarize()
+        drift = self.detect_drift(summary)
+        
+        for message in drift:
+            print(f"🚨 版面變動 ({self.site}) {message}")
+        
+        if not self.path or not summary:
+            return drift
+        
+        try:
+            data = self._load()
+            # 沒有執行到的欄位保留上次的結果
+            groups = dict(self.previous)
+            groups.update(summary)
+            data[self.site] = {
+                "updated": datetime.now(timezone.utc).isoformat(),
+                "groups": groups,
+                "drift": drift,
+            }
+            
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            tmp_path.replace(self.path)
+        except OSError as e:
+            print(f"⚠️ 儲存選擇器快取失敗: {e}")
+        
+        return drift
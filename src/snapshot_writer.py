@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+快照寫入與增量輸出
+寫入完整資料檔前先讀取上一版快照，計算 RFC 6902 JSON Patch 並依序號存到 data/deltas/，
+已持有上一版的客戶端只需依序套用增量即可；寫入時持有資料檔的跨行程鎖，
+需要一起更新的多個資料檔以 SnapshotBatch 一次寫入，最後才遞增 data/generations/ 的世代編號
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from change_stream import append_change, item_diff
+from data_lock import locked_files
+
+DELTA_DIR = Path("data") / "deltas"
+GENERATION_DIR = Path("data") / "generations"
+# 每個資料檔保留的增量數量
+DELTA_RETENTION = 50
+# 判斷清單項目是否為同一筆時依序使用的欄位
+ITEM_KEY_FIELDS = ("link", "guid", "url", "id", "name", "googleTrend", "title")
+
+
+def escape_pointer(token: Any) -> str:
+    """JSON Pointer 片段跳脫 (RFC 6901)"""
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _item_key(item: Any) -> str:
+    """取得清單項目的識別鍵，用來偵測排名移動"""
+    if isinstance(item, dict):
+        # Reddit listing 的項目為 {"kind": ..., "data": {...}}
+        if isinstance(item.get("data"), dict) and "kind" in item:
+            return _item_key(item["data"])
+        for field in ITEM_KEY_FIELDS:
+            if item.get(field):
+                return f"{field}:{item[field]}"
+    return json.dumps(item, ensure_ascii=False, sort_keys=True)
+
+
+def _diff_list(old: List, new: List, path: str, ops: List[Dict[str, Any]]) -> None:
+    """產生把 old 清單轉為 new 清單的 remove/move/add 操作，並遞迴比較同一項目的內容"""
+    working = list(old)
+    new_keys = [_item_key(item) for item in new]
+    remaining = set(new_keys)
+    
+    # 先移除新清單中不存在的項目 (由後往前避免索引位移)
+    for index in range(len(working) - 1, -1, -1):
+        if _item_key(working[index]) not in remaining:
+            ops.append({"op": "remove", "path": f"{path}/{index}"})
+            del working[index]
+    
+    for index, (key, item) in enumerate(zip(new_keys, new)):
+        if index < len(working) and _item_key(working[index]) == key:
+            _diff(working[index], item, f"{path}/{index}", ops)
+            continue
+        
+        source = next((j for j in range(index + 1, len(working)) if _item_key(working[j]) == key), None)
+        if source is not None:
+            ops.append({"op": "move", "from": f"{path}/{source}", "path": f"{path}/{index}"})
+            working.insert(index, working.pop(source))
+            _diff(working[index], item, f"{path}/{index}", ops)
+        else:
+            ops.append({"op": "add", "path": f"{path}/{index}", "value": item})
+            working.insert(index, item)
+    
+    # 重複項目多出來的部分
+    for index in range(len(working) - 1, len(new) - 1, -1):
+        ops.append({"op": "remove", "path": f"{path}/{index}"})
+
+
+def _diff(old: Any, new: Any, path: str, ops: List[Dict[str, Any]]) -> None:
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{escape_pointer(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{escape_pointer(key)}"
+            if key in old:
+                _diff(old[key], value, child, ops)
+            else:
+                ops.append({"op": "add", "path": child, "value": value})
+    elif isinstance(old, list) and isinstance(new, list):
+        _diff_list(old, new, path, ops)
+    elif type(old) is not type(new) or old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def make_patch(old: Any, new: Any) -> List[Dict[str, Any]]:
+    """產生 RFC 6902 JSON Patch"""
+    ops: List[Dict[str, Any]] = []
+    _diff(old, new, "", ops)
+    return ops
+
+
+def _resolve(doc: Any, path: str):
+    """回傳 (父節點, 最後一段鍵)"""
+    tokens = [token.replace('~1', '/').replace('~0', '~') for token in path.split('/')[1:]]
+    parent = doc
+    for token in tokens[:-1]:
+        parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+    last = tokens[-1]
+    return parent, (len(parent) if last == '-' else int(last)) if isinstance(parent, list) else last
+
+
+def apply_patch(doc: Any, ops: List[Dict[str, Any]]) -> Any:
+    """套用 JSON Patch (支援 add/remove/replace/move)，會直接修改並回傳 doc"""
+    for op in ops:
+        if op["path"] == "":
+            doc = op["value"]
+            continue
+        if op["op"] == "move":
+            parent, key = _resolve(doc, op["from"])
+            value = parent.pop(key)
+            parent, key = _resolve(doc, op["path"])
+            if isinstance(parent, list):
+                parent.insert(key, value)
+            else:
+                parent[key] = value
+            continue
+        
+        parent, key = _resolve(doc, op["path"])
+        if op["op"] == "add" and isinstance(parent, list):
+            parent.insert(key, op["value"])
+        elif op["op"] in ("add", "replace"):
+            parent[key] = op["value"]
+        elif op["op"] == "remove":
+            del parent[key]
+        else:
+            raise ValueError(f"不支援的操作: {op['op']}")
+    return doc
+
+
+def _load_json(path: Path) -> Optional[Any]:
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ 讀取 {path} 失敗: {e}")
+        return None
+
+
+def write_snapshot(path: Path, data: Any, delta_dir: Path = DELTA_DIR) -> Path:
+    """寫入完整資料檔，並輸出與上一版快照之間的增量
+
+    增量存於 data/deltas/<檔名>/<序號>.json，目前序號與可用的增量列在 latest.json；
+    整個讀取上一版、寫入、編號的過程持有資料檔的獨佔鎖，多個行程同時寫入時不會取得相同序號
+    """
+    path = Path(path)
+    with locked_files([path]):
+        return _write_locked(path, data, delta_dir)
+
+
+def _write_locked(path: Path, data: Any, delta_dir: Path) -> Path:
+    previous = _load_json(path)
+    stream_dir = delta_dir / path.stem
+    manifest_path = stream_dir / "latest.json"
+    manifest = _load_json(manifest_path) or {"seq": 0, "deltas": []}
+    
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    tmp_path.replace(path)
+    
+    seq = manifest["seq"] + 1
+    patch = make_patch(previous, data) if previous is not None else None
+    stream_dir.mkdir(parents=True, exist_ok=True)
+    if patch is not None:
+        delta = {
+            "seq": seq,
+            "base_seq": manifest["seq"],
+            "created": datetime.now(timezone.utc).isoformat(),
+            "patch": patch,
+        }
+        with open(stream_dir / f"{seq}.json", 'w', encoding='utf-8') as f:
+            json.dump(delta, f, ensure_ascii=False)
+        manifest["deltas"].append(seq)
+    else:
+        # 沒有上一版快照時無法銜接，舊的增量全部作廢
+        for expired in manifest["deltas"]:
+            (stream_dir / f"{expired}.json").unlink(missing_ok=True)
+        manifest["deltas"] = []
+    
+    # 只保留最近的增量
+    for expired in manifest["deltas"][:-DELTA_RETENTION]:
+        (stream_dir / f"{expired}.json").unlink(missing_ok=True)
+    manifest["deltas"] = manifest["deltas"][-DELTA_RETENTION:]
+    manifest["seq"] = seq
+    manifest["snapshot"] = path.as_posix()
+    
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    
+    if patch is not None:
+        print(f"🧩 增量 #{seq}: {len(patch)} 個操作 → {stream_dir / f'{seq}.json'}")
+        # 項目層級的變動事件 (供 SSE 串流推送)，失敗不影響快照本身
+        try:
+            append_change(path, seq, item_diff(previous, data, _item_key))
+        except OSError as e:
+            print(f"⚠️ 寫入變動事件失敗: {e}")
+    return path
+
+
+class SnapshotBatch:
+    """需要同時更新的一組資料檔 (例如所有 Reddit 子版塊)
+
+    add() 只暫存內容，commit() 鎖住所有資料檔後依序寫入，最後才寫入 data/generations/<名稱>.json
+    (世代編號與每個檔案的 sha256)；以共享鎖讀取這些檔案的讀者只會看到同一代的完整內容
+    """
+    def __init__(self, name: str, generation_dir: Path = GENERATION_DIR, delta_dir: Path = DELTA_DIR):
+        self.name = name
+        self.path = generation_dir / f"{name}.json"
+        self.delta_dir = delta_dir
+        self.pending: Dict[Path, Any] = {}
+    
+    def add(self, path: Path, data: Any) -> Path:
+        """暫存資料檔內容 (同一個檔案以最後一次為準)"""
+        path = Path(path)
+        self.pending[path] = data
+        return path
+    
+    def commit(self) -> Optional[int]:
+        """寫入所有暫存的資料檔並回傳新的世代編號，沒有暫存內容時回傳 None"""
+        if not self.pending:
+            return None
+        
+        with locked_files([*self.pending, self.path]):
+            record = _load_json(self.path) or {"generation": 0, "files": {}}
+            for path, data in self.pending.items():
+                _write_locked(path, data, self.delta_dir)
+                record["files"][path.as_posix()] = hashlib.sha256(path.read_bytes()).hexdigest()
+            record["generation"] += 1
+            record["committed"] = datetime.now(timezone.utc).isoformat()
+            
+            # 世代編號最後寫入：讀者看到新的編號時，所有資料檔都已是新內容
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False, indent=2)
+            tmp_path.replace(self.path)
+        
+        print(f"📦 {self.name} 第 {record['generation']} 代: {len(self.pending)} 個資料檔")
+        self.pending.clear()
+        return record["generation"]
+    
+    def __enter__(self) -> 'SnapshotBatch':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # 中途發生例外時捨棄暫存內容，保留上一代的完整資料
+        if exc_type is None:
+            self.commit()
+        else:
+            self.pending.clear()
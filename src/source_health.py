@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+來源健康狀態與斷路器
+持久化記錄每個來源的連續失敗次數，連續失敗後暫停該來源，冷卻後再以單次試探恢復
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+HEALTH_FILE = Path("cache") / "source-health.json"
+
+# 連續失敗幾次後開啟斷路器
+FAILURE_THRESHOLD = 3
+# 斷路器開啟後的冷卻時間 (秒)，之後允許一次試探執行
+COOLDOWN_SECONDS = 30 * 60
+
+# 斷路器狀態
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class SourceHealth:
+    """所有來源的健康狀態 (每個來源一個斷路器)"""
+    def __init__(self, path: Path = HEALTH_FILE,
+                 failure_threshold: int = FAILURE_THRESHOLD,
+                 cooldown_seconds: float = COOLDOWN_SECONDS):
+        self.path = path
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.sources: Dict[str, Dict[str, Any]] = self._load()
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ 讀取來源健康狀態失敗: {e}")
+            return {}
+    
+    def state(self, source: str) -> Dict[str, Any]:
+        """取得 (必要時建立) 某來源的狀態"""
+        return self.sources.setdefault(source, {
+            "state": CLOSED,
+            "consecutive_failures": 0,
+            "opened_at": None,
+            "last_success": None,
+            "last_failure": None,
+            "last_error": None,
+            "last_duration": None,
+        })
+    
+    def allow(self, source: str, now: Optional[float] = None) -> bool:
+        """判斷本次是否執行該來源；冷卻結束的開啟狀態會轉為半開並放行一次試探"""
+        now = time.time() if now is None else now
+        health = self.state(source)
+        
+        if health["state"] != OPEN:
+            return True
+        
+        if now - (health["opened_at"] or 0) >= self.cooldown_seconds:
+            health["state"] = HALF_OPEN
+            return True
+        return False
+    
+    def retry_in(self, source: str, now: Optional[float] = None) -> float:
+        """距離下一次允許試探的秒數"""
+        now = time.time() if now is None else now
+        health = self.state(source)
+        if health["state"] != OPEN:
+            return 0.0
+        return max(0.0, (health["opened_at"] or 0) + self.cooldown_seconds - now)
+    
+    def record_success(self, source: str, duration: Optional[float] = None) -> None:
+        """記錄成功，關閉斷路器"""
+        health = self.state(source)
+        health.update({
+            "state": CLOSED,
+            "consecutive_failures": 0,
+            "opened_at": None,
+            "last_success": _isoformat(time.time()),
+            "last_error": None,
+        })
+        if duration is not None:
+            health["last_duration"] = round(duration, 1)
+    
+    def record_failure(self, source: str, error: str = "", duration: Optional[float] = None) -> None:
+        """記錄失敗；半開狀態的試探失敗或連續失敗達門檻時開啟斷路器"""
+        now = time.time()
+        health = self.state(source)
+        health["consecutive_failures"] += 1
+        health["last_failure"] = _isoformat(now)
+        health["last_error"] = error or None
+        if duration is not None:
+            health["last_duration"] = round(duration, 1)
+        
+        if health["state"] == HALF_OPEN or health["consecutive_failures"] >= self.failure_threshold:
+            health["state"] = OPEN
+            health["opened_at"] = now
+            print(f"🔌 {source} 連續失敗 {health['consecutive_failures']} 次，暫停 {self.cooldown_seconds / 60:.0f} 分鐘")
+    
+    def expected_duration(self, source: str) -> Optional[float]:
+        """上次執行所花的時間 (秒)"""
+        return self.state(source).get("last_duration")
+    
+    def save(self) -> None:
+        """寫回健康狀態檔案"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.sources, f, ensure_ascii=False, indent=2)
+            tmp_path.replace(self.path)
+        except OSError as e:
+            print(f"⚠️ 儲存來源健康狀態失敗: {e}")
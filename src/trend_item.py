@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+統一的趨勢項目資料
+各爬蟲在擷取時就把字串欄位轉成數值分數與 UTC 時間，之後的去重、排序、索引都直接使用 TrendItem，
+只有寫出 JSON 時才轉回原本的欄位格式 (另外附上 score 與 timestamp)
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+# 台灣時間 (PTT、Komica 顯示的時間)
+TAIPEI = timezone(timedelta(hours=8))
+
+# 各來源在輸出 JSON 中的標題欄位名稱
+TITLE_FIELDS = {"google": "googleTrend"}
+
+LOCAL_TIME_FORMATS = (
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%y/%m/%d %H:%M:%S",
+    "%y/%m/%d %H:%M",
+    "%Y/%m/%d",
+)
+
+RELATIVE_UNITS = {
+    "分鐘": "minutes", "分": "minutes", "minute": "minutes", "min": "minutes",
+    "小時": "hours", "hour": "hours",
+    "天": "days", "day": "days",
+}
+
+
+class TrendItem:
+    """各來源共用的精簡項目 (source、穩定鍵、標題、連結、數值分數、UTC 時間與來源專屬欄位)"""
+    __slots__ = ('source', 'key', 'title', 'link', 'score', 'timestamp', 'extra')
+    
+    def __init__(self, source: str, title: str, link: str = "", score: int = 0,
+                 timestamp: Optional[datetime] = None, key: Optional[str] = None,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.source = source
+        self.title = title
+        self.link = link
+        self.score = score
+        self.timestamp = timestamp
+        self.key = key or f"{source}:{link or title}"
+        self.extra = extra or {}
+    
+    def __repr__(self) -> str:
+        return f"TrendItem({self.source!r}, {self.title!r}, score={self.score})"
+    
+    def with_extra(self, **fields: Any) -> 'TrendItem':
+        """回傳加上額外欄位的複本"""
+        return TrendItem(self.source, self.title, self.link, self.score, self.timestamp,
+                         self.key, dict(self.extra, **fields))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """轉成輸出 JSON 的欄位格式"""
+        data: Dict[str, Any] = {TITLE_FIELDS.get(self.source, "title"): self.title}
+        if self.link:
+            data["link"] = self.link
+        data.update(self.extra)
+        data["score"] = self.score
+        data["timestamp"] = self.timestamp.isoformat() if self.timestamp else None
+        return data
+    
+    @classmethod
+    def from_dict(cls, source: str, data: Dict[str, Any]) -> 'TrendItem':
+        """由輸出 JSON 的項目還原 (讀取已轉換好的 score 與 timestamp，不再解析原始字串)"""
+        title_field = TITLE_FIELDS.get(source, "title")
+        timestamp = data.get("timestamp")
+        extra = {
+            name: value for name, value in data.items()
+            if name not in (title_field, "link", "score", "timestamp")
+        }
+        return cls(
+            source,
+            data.get(title_field) or "",
+            data.get("link") or "",
+            score=data.get("score") or 0,
+            timestamp=datetime.fromisoformat(timestamp) if timestamp else None,
+            key=f"{source}:{extra['guid']}" if extra.get("guid") else None,
+            extra=extra,
+        )
+
+
+def parse_count(text: str) -> int:
+    """解析帶千分位或單位的數量 (例如 2,000+、2萬+、1.5K+)"""
+    match = re.search(r'([\d.,]+)\s*(萬|千|[kKmM])?', text or "")
+    if not match:
+        return 0
+    try:
+        value = float(match.group(1).replace(',', ''))
+    except ValueError:
+        return 0
+    multiplier = {"萬": 10000, "千": 1000, "k": 1000, "m": 1000000}.get((match.group(2) or "").lower(), 1)
+    return int(value * multiplier)
+
+
+def parse_relative_time(text: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """解析相對時間 (例如 1 小時前、20 分鐘前、3 hours ago)，回傳 UTC 時間
+
+    結果捨去到文字本身的精度 (小時前捨去到整點)，同一筆資料在不同時間爬取時不會每次產生不同的時間
+    """
+    match = re.search(r'(\d+)\s*(分鐘|分|小時|天|minute|min|hour|day)', text or "")
+    if not match:
+        return None
+    now = now or datetime.now(timezone.utc)
+    unit = RELATIVE_UNITS[match.group(2)]
+    started = now - timedelta(**{unit: int(match.group(1))})
+    started = started.replace(second=0, microsecond=0)
+    if unit in ("hours", "days"):
+        started = started.replace(minute=0)
+    if unit == "days":
+        started = started.replace(hour=0)
+    return started
+
+
+def parse_local_time(text: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """解析台灣時間字串 (可省略年份，例如 07/20 12:34)，回傳 UTC 時間"""
+    text = re.sub(r'\([^)]*\)', ' ', text or "")  # 移除星期 (例如 (日))
+    text = ' '.join(text.split())
+    if not text:
+        return None
+    
+    for fmt in LOCAL_TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).replace(tzinfo=TAIPEI).astimezone(timezone.utc)
+        except ValueError:
+            continue
+    
+    # 沒有年份時以今年為準，若因此落在未來則視為去年
+    now = now or datetime.now(timezone.utc)
+    for fmt in ("%m/%d %H:%M", "%m/%d"):
+        try:
+            parsed = datetime.strptime(f"{now.astimezone(TAIPEI).year}/{text}", f"%Y/{fmt}")
+        except ValueError:
+            continue
+        local = parsed.replace(tzinfo=TAIPEI)
+        if local > now + timedelta(days=1):
+            local = local.replace(year=local.year - 1)
+        return local.astimezone(timezone.utc)
+    return None
+
+
+def parse_rfc822(text: str) -> Optional[datetime]:
+    """解析 RSS 的 RFC 822 時間，回傳 UTC 時間"""
+    try:
+        published = parsedate_to_datetime(text)
+    except (TypeError, ValueError):
+        return None
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published.astimezone(timezone.utc)
+
+
+def parse_ptt_score(text: str) -> int:
+    """解析 PTT 推文分數: 爆 = 100，X1~X9 = -10~-90，XX = -100，其餘為帶正負號的整數"""
+    text = (text or "").strip()
+    if text == "爆":
+        return 100
+    if text == "XX":
+        return -100
+    if re.fullmatch(r'X\d', text):
+        return -10 * int(text[1])
+    match = re.search(r'[+-]?\d+', text)
+    return int(match.group()) if match else 0
+
+
+def reddit_item(post: Dict[str, Any]) -> TrendItem:
+    """由 Reddit listing 的貼文建立項目"""
+    created = post.get("created_utc")
+    return TrendItem(
+        "reddit",
+        post.get("title") or "",
+        f"https://www.reddit.com{post['permalink']}" if post.get("permalink") else post.get("url") or "",
+        score=int(post.get("score") or 0),
+        timestamp=datetime.fromtimestamp(created, timezone.utc) if created else None,
+        key=f"reddit:{post['name']}" if post.get("name") else None,
+        extra={
+            "subreddit": post.get("subreddit", ""),
+            "numComments": post.get("num_comments", 0),
+            "selftext": post.get("selftext", ""),
+        },
+    )
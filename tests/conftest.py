@@ -0,0 +1,13 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 模組以平面方式放在 src/ (與 main.py 相同的匯入方式)
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    """各模組以相對路徑寫入 cache/ 與 data/，測試時改在暫存目錄執行"""
+    monkeypatch.chdir(tmp_path)
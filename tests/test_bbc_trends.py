@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+
+from bbc_trends import merge_articles
+from trend_item import TrendItem
+
+
+def article(link, guid=None, hour=None):
+    timestamp = datetime(2025, 7, 1, hour, tzinfo=timezone.utc) if hour is not None else None
+    return TrendItem("bbc", link, link=link, timestamp=timestamp, extra={"guid": guid} if guid else {})
+
+
+def test_bbc_merge_dedupes_by_guid_or_link_and_sorts_newest_first():
+    merged = merge_articles([
+        [article("a", guid="g1", hour=1), article("b", hour=3)],
+        [article("a2", guid="g1", hour=5), article("b", hour=4), article("c"), article("d", hour=2)],
+    ])
+    # 重複文章以前面的來源為準，無法解析時間的排在最後
+    assert [item.link for item in merged] == ["b", "d", "a", "c"]
@@ -0,0 +1,33 @@
+from cdp_browser import CdpBrowser, CdpError
+
+
+class FakePage:
+    closed = 0
+    
+    def navigate(self, url):
+        pass
+    
+    def close(self):
+        FakePage.closed += 1
+
+
+class FlakyBrowser(CdpBrowser):
+    """不啟動 Chrome，第二個分頁開啟失敗"""
+    def __init__(self):
+        self.opened = 0
+    
+    def new_page(self):
+        self.opened += 1
+        if self.opened == 2:
+            raise CdpError("Target.createTarget 失敗")
+        return FakePage()
+
+
+def test_render_pages_reports_new_page_failure_per_url():
+    urls = ["https://example.com/a", "https://example.com/b", "https://example.com/c"]
+    results = FlakyBrowser().render_pages(urls, lambda page, url: url.upper(), max_pages=1)
+    
+    assert results[urls[0]] == urls[0].upper()
+    assert isinstance(results[urls[1]], CdpError)
+    assert results[urls[2]] == urls[2].upper()
+    assert FakePage.closed == 2
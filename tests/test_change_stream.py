@@ -0,0 +1,66 @@
+import threading
+import urllib.request
+from pathlib import Path
+
+from change_stream import ChangeStreamServer, append_change, events_since
+
+
+def start_server(log_path):
+    server = ChangeStreamServer(("127.0.0.1", 0), log_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def read_event(server):
+    url = f"http://127.0.0.1:{server.server_address[1]}/events?since=0"
+    response = urllib.request.urlopen(url, timeout=5)
+    return response, response.readline()
+
+
+def test_stopping_one_server_keeps_the_other_streaming():
+    log_path = Path("cache") / "changes.ndjson"
+    append_change(Path("data/ptt.json"), 1, {"added": ["a"], "removed": [], "changed": []}, log_path)
+    first, second = start_server(log_path), start_server(log_path)
+    first_response, first_line = read_event(first)
+    second_response, second_line = read_event(second)
+    assert first_line == second_line == b"id: 1\n"
+    
+    # 停止其中一個伺服器只結束它自己的串流
+    first.stopping.set()
+    first.shutdown()
+    assert not second.stopping.is_set()
+    first_response.read()
+    
+    append_change(Path("data/ptt.json"), 2, {"added": ["b"], "removed": [], "changed": []}, log_path)
+    lines = [second_response.readline() for _ in range(4)]
+    assert b"id: 2\n" in lines
+    
+    second.stopping.set()
+    second.shutdown()
+    for server in (first, second):
+        server.server_close()
+
+
+def test_reset_when_client_is_ahead_of_a_recreated_log():
+    log_path = Path("cache") / "changes.ndjson"
+    assert events_since(0, log_path) == ([], False)
+    # 事件檔不存在 (例如 CI 沒有保存 cache/) 時，舊客戶端的序號需要重設
+    assert events_since(57, log_path) == ([], True)
+    for seq in (1, 2):
+        append_change(Path("data/ptt.json"), seq, {"added": [str(seq)], "removed": [], "changed": []}, log_path)
+    assert events_since(2, log_path) == ([], False)
+    assert events_since(57, log_path)[1]
+    
+    server = start_server(log_path)
+    url = f"http://127.0.0.1:{server.server_address[1]}/events"
+    request = urllib.request.Request(url, headers={"Last-Event-ID": "57"})
+    response = urllib.request.urlopen(request, timeout=5)
+    assert [response.readline() for _ in range(2)] == [b"id: 2\n", b"event: reset\n"]
+    
+    # 重設後從事件檔目前的序號繼續推送
+    append_change(Path("data/ptt.json"), 3, {"added": ["3"], "removed": [], "changed": []}, log_path)
+    lines = [response.readline() for _ in range(6)]
+    assert b"id: 3\n" in lines
+    server.stopping.set()
+    server.shutdown()
+    server.server_close()
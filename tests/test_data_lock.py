@@ -0,0 +1,20 @@
+import pytest
+
+from data_lock import _held_locks, locked_files
+
+
+def test_reentrant_locks_cannot_upgrade_from_shared_to_exclusive(tmp_path):
+    path = tmp_path / "ptt-trends.json"
+    with locked_files([path]):
+        # 獨佔鎖已涵蓋共享鎖
+        with locked_files([path], shared=True):
+            pass
+    
+    with locked_files([path], shared=True):
+        with pytest.raises(RuntimeError):
+            with locked_files([tmp_path / "a.json", path]):
+                pass
+        # 失敗時已取得的其他鎖也會釋放，原本的共享鎖仍然持有
+        assert list(_held_locks().values())[0][1:] == [1, True]
+        assert len(_held_locks()) == 1
+    assert _held_locks() == {}
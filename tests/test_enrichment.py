@@ -0,0 +1,24 @@
+import hashlib
+import json
+from pathlib import Path
+
+from enrichment import EnrichmentCache, enrich_data_files
+from snapshot_writer import SnapshotBatch
+
+
+def test_enrichment_write_back_updates_generation():
+    path = Path("data/ptt-trends.json")
+    with SnapshotBatch("ptt") as batch:
+        batch.add(path, {"articles": [{"title": "a", "link": "https://example.com/a"}]})
+    cache = EnrichmentCache()
+    cache.put("https://example.com/a", {"summary": "摘要"})
+    cache.save()
+    
+    assert enrich_data_files([(str(path), "articles", "ptt")], fetch_budget=0) == 0
+    
+    with open(path, 'r', encoding='utf-8') as f:
+        assert json.load(f)["articles"][0]["enrichment"] == {"summary": "摘要"}
+    with open("data/generations/ptt.json", 'r', encoding='utf-8') as f:
+        record = json.load(f)
+    assert record["generation"] == 2
+    assert record["files"][path.as_posix()] == hashlib.sha256(path.read_bytes()).hexdigest()
@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+
+from google_trends import parse_google_trends_feed
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<rss xmlns:ht="https://trends.google.com/trending/rss" version="2.0">
+  <channel>
+    <item>
+      <title>颱風</title>
+      <ht:approx_traffic>2000+</ht:approx_traffic>
+      <pubDate>Mon, 20 Jan 2025 10:00:00 -0000</pubDate>
+    </item>
+    <item>
+      <title>地震</title>
+      <ht:approx_traffic>500+</ht:approx_traffic>
+      <pubDate>Mon, 20 Jan 2025 09:30:00 +0800</pubDate>
+    </item>
+  </channel>
+</rss>
+"""
+
+
+def test_feed_without_zone_offset_is_utc():
+    now = datetime(2025, 1, 20, 12, 0, tzinfo=timezone.utc)
+    trends = parse_google_trends_feed(FEED, hours=4, now=now)
+    assert [trend.title for trend in trends] == ["颱風"]
+    assert trends[0].timestamp == datetime(2025, 1, 20, 10, 0, tzinfo=timezone.utc)
+    assert trends[0].score == 2000
+
+
+def test_feed_items_do_not_change_between_runs():
+    first = parse_google_trends_feed(FEED, now=datetime(2025, 1, 20, 12, 0, tzinfo=timezone.utc))
+    second = parse_google_trends_feed(FEED, now=datetime(2025, 1, 20, 13, 30, tzinfo=timezone.utc))
+    assert [trend.to_dict() for trend in first] == [trend.to_dict() for trend in second]
+    assert first[0].extra["started"] == "2025-01-20 18:00"
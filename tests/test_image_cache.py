@@ -0,0 +1,46 @@
+import json
+from pathlib import Path
+
+import image_cache
+from image_cache import ImageCache, cache_data_images, image_slots
+from snapshot_writer import SnapshotBatch
+
+
+def test_reddit_thumbnails_are_read_from_original_data():
+    post = {"name": "t3_a", "thumbnail": "https://b.thumbs.redditmedia.com/a.jpg"}
+    data = {"total_posts": 1, "original_data": {"data": {"children": [{"data": post}]}}}
+    assert image_slots(Path("data/reddit-all-hot.json"), data) == [(post, "thumbnail", post["thumbnail"])]
+
+
+def test_article_images_skip_local_paths():
+    articles = [{"imageUrl": "https://i.imgur.com/a.jpg"}, {"imageUrl": "images/ab/abcdef.jpg"}]
+    slots = image_slots(Path("data/ptt-trends.json"), {"articles": articles})
+    assert slots == [(articles[0], "imageUrl", "https://i.imgur.com/a.jpg")]
+
+
+def test_rewritten_images_stay_in_use_and_update_generation(monkeypatch):
+    url = "https://i.imgur.com/a.jpg"
+    with SnapshotBatch("ptt") as batch:
+        batch.add(Path("data/ptt-trends.json"), {"articles": [{"title": "a", "imageUrl": url}]})
+    monkeypatch.setattr(image_cache, "download_image", lambda session, url: (b"image-a", "image/jpeg"))
+    # 大小上限設為 1 byte，沒有被資料檔引用的圖片都會被淘汰
+    monkeypatch.setattr(image_cache, "ImageCache", lambda: ImageCache(max_bytes=1))
+    
+    assert cache_data_images() == 1
+    with open("data/ptt-trends.json", 'r', encoding='utf-8') as f:
+        article = json.load(f)["articles"][0]
+    assert article["imageUrlOriginal"] == url
+    local_path = article["imageUrl"]
+    assert (Path("data") / local_path).exists()
+    with open("data/generations/ptt.json", 'r', encoding='utf-8') as f:
+        assert json.load(f)["generation"] == 2
+    
+    # 第二次執行: 欄位已是本機路徑，圖片仍在使用中，不重新下載也不淘汰
+    stale = ImageCache()
+    stale.store("https://example.com/stale.jpg", b"stale", "image/jpeg")
+    stale.save()
+    assert len(ImageCache().objects) == 2
+    assert cache_data_images() == 0
+    remaining = ImageCache()
+    assert [entry["thumbnail"] for entry in remaining.objects.values()] == [local_path]
+    assert (Path("data") / local_path).exists()
@@ -0,0 +1,95 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+import job_queue
+import snapshot_writer
+from job_queue import SqliteJobQueue, retry_delay
+from scrape_jobs import LeaseKeeper
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return tmp_path / "jobs.db"
+
+
+def test_enqueue_skips_duplicate_target(queue_path):
+    queue = SqliteJobQueue(queue_path)
+    assert queue.enqueue("ptt", "data/ptt-trends.json", {})
+    assert queue.enqueue("ptt", "data/ptt-trends.json", {}) is None
+    assert queue.stats() == {"queued": 1}
+
+
+def test_fail_requeues_with_backoff_until_attempts_exhausted(queue_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "RETRY_BACKOFF_SECONDS", 0)
+    queue = SqliteJobQueue(queue_path)
+    queue.enqueue("bbc", "data/bbc-trends.json", {}, max_attempts=2)
+    
+    job = queue.lease("worker-a")
+    assert job.attempts == 1
+    assert queue.fail(job, "timeout") == "queued"
+    
+    job = queue.lease("worker-a")
+    assert job.attempts == 2
+    assert queue.fail(job, "timeout") == "failed"
+    assert queue.lease("worker-a") is None
+
+
+def test_retry_delay_doubles_per_attempt():
+    base = job_queue.RETRY_BACKOFF_SECONDS
+    assert [retry_delay(n) for n in (1, 2, 3)] == [base, base * 2, base * 4]
+
+
+def test_expired_lease_is_reclaimed(queue_path):
+    queue = SqliteJobQueue(queue_path)
+    queue.enqueue("google", "data/google-trends.json", {})
+    job = queue.lease("worker-a", lease_seconds=0.1)
+    time.sleep(0.2)
+    
+    other = SqliteJobQueue(queue_path).lease("worker-b")
+    assert other is not None and other.id == job.id
+    assert not queue.complete(job, ["stale"])
+
+
+def test_lease_keeper_renews_long_running_job(queue_path):
+    """工作執行超過租約秒數時，背景執行緒延長租約，其他 worker 無法接手"""
+    queue = SqliteJobQueue(queue_path)
+    queue.enqueue("reddit", "data/reddit-all-hot.json", {})
+    job = queue.lease("worker-a", lease_seconds=0.3)
+    other = SqliteJobQueue(queue_path)
+    
+    with LeaseKeeper(queue, job, lease_seconds=0.3):
+        deadline = time.monotonic() + 1.0
+        while time.monotonic() < deadline:
+            assert other.lease("worker-b") is None
+            time.sleep(0.05)
+    
+    assert queue.complete(job, {"ok": True})
+    assert queue.results() == [{"id": job.id, "source": "reddit", "target": "data/reddit-all-hot.json",
+                                "result": {"ok": True}}]
+
+
+def test_results_stay_queued_until_written(monkeypatch):
+    from main import run_collect
+    
+    queue = SqliteJobQueue(Path("cache") / "jobs.db")
+    queue.enqueue("bbc", "data/bbc-trends.json", {})
+    job = queue.lease("worker-a")
+    article = {"title": "颱風", "link": "https://www.bbc.com/zhongwen/a", "score": 0, "timestamp": None}
+    assert queue.complete(job, [article])
+    
+    def broken_commit(self):
+        raise OSError("disk full")
+    
+    with monkeypatch.context() as patch:
+        patch.setattr(snapshot_writer.SnapshotBatch, "commit", broken_commit)
+        assert not run_collect("sqlite:///cache/jobs.db")
+    assert len(queue.results()) == 1
+    
+    # BBC 結果與其他來源一樣經由世代批次寫入
+    assert run_collect("sqlite:///cache/jobs.db")
+    assert queue.results() == []
+    with open("data/generations/bbc.json", 'r', encoding='utf-8') as f:
+        assert list(json.load(f)["files"]) == ["data/bbc-trends.json"]
@@ -0,0 +1,44 @@
+from poll_schedule import CHANGE_GAP_ALPHA, POLL_BOUNDS, POLLS_PER_CHANGE, PollSchedule, source_fingerprint
+
+
+def test_change_gap_is_an_ewma(tmp_path):
+    schedule = PollSchedule(tmp_path / "schedule.json")
+    min_interval, max_interval = POLL_BOUNDS["reddit"]
+    gaps = [3600, 7200, 3600]
+    now = 0
+    assert schedule.record_poll("reddit", "v0", now=now) == min_interval
+    
+    expected = None
+    for version, gap in enumerate(gaps, start=1):
+        now += gap
+        interval = schedule.record_poll("reddit", f"v{version}", now=now)
+        expected = gap if expected is None else CHANGE_GAP_ALPHA * gap + (1 - CHANGE_GAP_ALPHA) * expected
+        assert schedule.state("reddit")["change_gap"] == expected
+        assert interval == min(max(expected / POLLS_PER_CHANGE, min_interval), max_interval)
+    assert schedule.state("reddit")["changes"] == 4
+
+
+def test_interval_is_clamped(tmp_path):
+    schedule = PollSchedule(tmp_path / "schedule.json")
+    min_interval, max_interval = POLL_BOUNDS["ptt"]
+    schedule.record_poll("ptt", "v0", now=0)
+    # 變動很頻繁時不低於下限
+    assert schedule.record_poll("ptt", "v1", now=60) == min_interval
+    # 長時間沒有變動時不超過上限
+    assert schedule.record_poll("ptt", "v1", now=60 + 100 * max_interval) == max_interval
+    # 失敗時以下限重試
+    assert schedule.record_poll("ptt", None, success=False, now=0) == min_interval
+
+
+def test_same_host_is_spaced(tmp_path):
+    schedule = PollSchedule(tmp_path / "schedule.json")
+    schedule.record_poll("google", "v0", now=1000)
+    assert schedule.due_in("google", now=1000) > 0
+    assert schedule.due_in("ptt", now=1000) == 0
+
+
+def test_unreadable_data_file_has_no_fingerprint(tmp_path):
+    (tmp_path / "ptt-trends.json").write_text('{"articles": [{"title": "a", "li', encoding='utf-8')
+    assert source_fingerprint("ptt", tmp_path) is None
+    (tmp_path / "ptt-trends.json").write_text('{"articles": [{"title": "a", "link": "/a"}]}', encoding='utf-8')
+    assert source_fingerprint("ptt", tmp_path) is not None
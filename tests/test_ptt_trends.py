@@ -0,0 +1,16 @@
+from ptt_trends import build_ptt_item, merge_ptt_articles
+from trend_item import TrendItem
+
+
+def test_ptt_merge_dedupes_by_key_and_sorts_by_score():
+    first = {"hot": [TrendItem("ptt", "x", link="/x", score=10), TrendItem("ptt", "y", link="/y", score=50)]}
+    second = {"gossip": [TrendItem("ptt", "x again", link="/x", score=99), TrendItem("ptt", "z", link="/z", score=20)]}
+    merged = merge_ptt_articles({**first, **second})
+    assert [(item.link, item.score) for item in merged] == [("/y", 50), ("/z", 20), ("/x", 10)]
+
+
+def test_ptt_item_keeps_zero_score_and_falls_back_only_when_empty():
+    zero = build_ptt_item("0", "35", "a", "/a", "author", "Gossiping", "")
+    negative = build_ptt_item("-5", "35", "b", "/b", "author", "Gossiping", "")
+    missing = build_ptt_item("", "35", "c", "/c", "author", "Gossiping", "")
+    assert (zero.score, negative.score, missing.score) == (0, -5, 35)
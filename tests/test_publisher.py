@@ -0,0 +1,55 @@
+import json
+
+from publisher import LocalObjectStore, Publisher, collect_files, restore_files
+from snapshot_writer import write_snapshot
+
+
+def write_reddit(data_dir, titles):
+    write_snapshot(data_dir / "reddit-all-hot.json", {"trends": [{"title": title} for title in titles]},
+                   delta_dir=data_dir / "deltas")
+
+
+def publish(data_dir, store, state_path):
+    files = collect_files("reddit", data_dir, data_dir / "deltas")
+    return Publisher(store, state_path=state_path).publish("reddit", files)
+
+
+def test_unchanged_objects_are_skipped(tmp_path):
+    data_dir = tmp_path / "data"
+    store = LocalObjectStore(tmp_path / "bucket")
+    write_reddit(data_dir, ["a"])
+    
+    assert publish(data_dir, store, tmp_path / "state.json")["uploaded"] == 2
+    # 沒有本機狀態時以遠端中繼資料判斷
+    assert publish(data_dir, store, tmp_path / "fresh-state.json")["uploaded"] == 0
+
+
+def test_restore_continues_delta_sequence_without_overwriting(tmp_path):
+    """CI 從舊的 checkout 開始時先取回上一版，增量接續編號，已發佈的物件不被覆寫"""
+    store = LocalObjectStore(tmp_path / "bucket")
+    first_run = tmp_path / "run1" / "data"
+    write_reddit(first_run, ["a"])
+    write_reddit(first_run, ["a", "b"])
+    publish(first_run, store, tmp_path / "state1.json")
+    published = {path: path.read_bytes() for path in (tmp_path / "bucket" / "objects").rglob("*") if path.is_file()}
+    
+    # 第二次執行的 checkout 只有最初的快照
+    second_run = tmp_path / "run2" / "data"
+    write_reddit(second_run, ["a"])
+    assert restore_files(store, "reddit", second_run) == 3
+    assert json.loads((second_run / "reddit-all-hot.json").read_text())["trends"][-1] == {"title": "b"}
+    
+    write_reddit(second_run, ["a", "b", "c"])
+    manifest = json.loads((second_run / "deltas" / "reddit-all-hot" / "latest.json").read_text())
+    assert manifest["seq"] == 3 and manifest["deltas"] == [2, 3]
+    publish(second_run, store, tmp_path / "state2.json")
+    
+    for path, body in published.items():
+        assert path.read_bytes() == body
+    pointer = json.loads((tmp_path / "bucket" / "latest" / "reddit.json").read_text())
+    assert set(pointer["files"]) == {
+        "reddit-all-hot.json",
+        "deltas/reddit-all-hot/latest.json",
+        "deltas/reddit-all-hot/2.json",
+        "deltas/reddit-all-hot/3.json",
+    }
@@ -0,0 +1,11 @@
+from reddit_trends import read_partial_ids
+
+
+def test_truncated_last_line_is_trimmed(tmp_path):
+    """寫到一半被中斷的最後一行不影響接續執行"""
+    partial = tmp_path / "reddit-all-hot.ndjson.partial"
+    partial.write_bytes(b'{"name": "t3_a"}\n{"name": "t3_b"}\n{"name": "t3_')
+    
+    assert read_partial_ids(partial) == {"t3_a", "t3_b"}
+    assert partial.read_bytes() == b'{"name": "t3_a"}\n{"name": "t3_b"}\n'
+    assert read_partial_ids(partial) == {"t3_a", "t3_b"}
@@ -0,0 +1,134 @@
+import pytest
+import requests
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+
+import remote_browser
+from remote_browser import RemoteChrome, RemoteSessionPool, create_driver, free_slots, options_key
+
+GRID_STATUS = {
+    "value": {
+        "ready": True,
+        "nodes": [
+            {"availability": "UP", "slots": [{"session": {"sessionId": "a"}}, {"session": None}]},
+            {"availability": "DOWN", "slots": [{"session": None}]},
+        ],
+    }
+}
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.payload = payload
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return self.payload
+
+
+class FakeDriverManager:
+    def install(self):
+        return "chromedriver"
+
+
+def grid_reachable(monkeypatch, payload=GRID_STATUS):
+    requested = []
+    
+    def fake_get(url, timeout):
+        requested.append(url)
+        return FakeResponse(payload)
+    monkeypatch.setattr(remote_browser.requests, "get", fake_get)
+    return requested
+
+
+def grid_unreachable(monkeypatch):
+    def fake_get(url, timeout):
+        raise requests.ConnectionError("connection refused")
+    monkeypatch.setattr(remote_browser.requests, "get", fake_get)
+
+
+@pytest.fixture
+def remote_sessions(monkeypatch):
+    """以假的 webdriver.Remote 記錄建立工作階段時的端點與 capabilities"""
+    sessions = []
+    
+    def fake_init(self, command_executor, options):
+        sessions.append({"executor": command_executor, "capabilities": options.to_capabilities()})
+    monkeypatch.setattr(remote_browser, "ChromiumRemoteConnection", lambda *args: args)
+    monkeypatch.setattr(webdriver.Remote, "__init__", fake_init)
+    return sessions
+
+
+@pytest.fixture
+def local_chrome(monkeypatch):
+    started = []
+    
+    def fake_chrome(service, options):
+        started.append(options)
+        return "local"
+    monkeypatch.setattr(remote_browser, "ChromeDriverManager", FakeDriverManager)
+    monkeypatch.setattr(remote_browser, "Service", lambda path: path)
+    monkeypatch.setattr(remote_browser.webdriver, "Chrome", fake_chrome)
+    return started
+
+
+def use_pool(monkeypatch, endpoints):
+    pool = RemoteSessionPool(endpoints)
+    monkeypatch.setattr(remote_browser, "_pool", pool)
+    return pool
+
+
+def chrome_options(user_agent="agent-a"):
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument(f"--user-agent={user_agent}")
+    return options
+
+
+def test_free_slots_counts_idle_slots_on_nodes_that_are_up(monkeypatch):
+    requested = grid_reachable(monkeypatch)
+    assert free_slots("http://grid:4444") == 1
+    assert requested == ["http://grid:4444/status"]
+    
+    grid_reachable(monkeypatch, {"value": {"ready": False}})
+    assert free_slots("http://grid:4444") == 0
+    grid_unreachable(monkeypatch)
+    assert free_slots("http://grid:4444") is None
+
+
+def test_create_driver_uses_remote_endpoint_and_capabilities(monkeypatch, remote_sessions, local_chrome):
+    grid_reachable(monkeypatch)
+    use_pool(monkeypatch, ["http://grid:4444"])
+    
+    driver = create_driver(chrome_options())
+    assert isinstance(driver, RemoteChrome)
+    assert driver.endpoint == "http://grid:4444"
+    assert remote_sessions[0]["executor"] == ("http://grid:4444", "goog", "chrome")
+    capabilities = remote_sessions[0]["capabilities"]
+    assert capabilities["browserName"] == "chrome"
+    assert "--headless=new" in capabilities["goog:chromeOptions"]["args"]
+    assert local_chrome == []
+
+
+def test_sessions_are_pooled_by_options_except_user_agent():
+    assert options_key(chrome_options("agent-a")) == options_key(chrome_options("agent-b"))
+    other = chrome_options()
+    other.add_argument("--window-size=800,600")
+    assert options_key(other) != options_key(chrome_options())
+
+
+def test_falls_back_to_local_chrome_when_grid_is_unreachable(monkeypatch, remote_sessions, local_chrome):
+    grid_unreachable(monkeypatch)
+    use_pool(monkeypatch, ["http://grid:4444"])
+    options = chrome_options()
+    
+    assert create_driver(options) == "local"
+    assert local_chrome == [options]
+    assert remote_sessions == []
+    
+    monkeypatch.setattr(remote_browser, "SELENIUM_REMOTE_FALLBACK", False)
+    with pytest.raises(WebDriverException):
+        create_driver(options)
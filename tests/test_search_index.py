@@ -0,0 +1,26 @@
+from search_index import SearchIndex, build_match_query, cjk_tokens
+from trend_item import TrendItem
+
+
+def test_cjk_tokens_split_into_bigrams():
+    assert cjk_tokens("台灣 Python 新聞") == ["台灣", "Python", "新聞"]
+    assert cjk_tokens("颱風來了") == ["颱風", "風來", "來了"]
+    assert cjk_tokens("颱風來了", index=True) == ["颱風", "風來", "來了", "了"]
+    assert cjk_tokens("a台b") == ["a", "台", "b"]
+
+
+def test_match_query():
+    assert build_match_query("台灣 颱風") == '"台灣" "颱風"'
+    assert build_match_query("台") == '"台"*'
+
+
+def test_single_character_search(tmp_path):
+    """單字查詢要找到出現在詞首與段落末尾的字"""
+    index = SearchIndex(tmp_path / "search.db")
+    for title in ("台灣新聞", "總統訪台", "今日天氣"):
+        index.upsert(TrendItem("ptt", title, link=f"https://example.com/{title}"))
+    
+    assert sorted(row["title"] for row in index.search("台")) == ["台灣新聞", "總統訪台"]
+    assert [row["title"] for row in index.search("訪台")] == ["總統訪台"]
+    assert [row["title"] for row in index.search("灣新")] == ["台灣新聞"]
+    index.close()
@@ -0,0 +1,36 @@
+import copy
+import json
+
+from snapshot_writer import apply_patch, make_patch
+
+
+def round_trip(old, new):
+    patch = make_patch(old, new)
+    # 補丁要能序列化成差異檔
+    patch = json.loads(json.dumps(patch))
+    assert apply_patch(copy.deepcopy(old), patch) == new
+    return patch
+
+
+def test_patch_round_trips_nested_changes():
+    old = {"updated": "1", "trends": [{"title": "a", "score": 1}], "meta/x": {"k~": 1}}
+    new = {"updated": "2", "trends": [{"title": "a", "score": 2}, {"title": "b"}], "meta/x": {}}
+    patch = round_trip(old, new)
+    assert {"op": "replace", "path": "/trends/0/score", "value": 2} in patch
+    assert {"op": "remove", "path": "/meta~1x/k~0"} in patch
+
+
+def test_reordered_items_become_moves():
+    old = {"articles": [{"link": "a", "score": 1}, {"link": "b"}, {"link": "c"}]}
+    new = {"articles": [{"link": "c"}, {"link": "a", "score": 5}, {"link": "d"}]}
+    patch = round_trip(old, new)
+    assert [op["op"] for op in patch] == ["remove", "move", "replace", "add"]
+    assert {"op": "move", "from": "/articles/1", "path": "/articles/0"} in patch
+
+
+def test_duplicates_and_reddit_listing_items():
+    old = [{"kind": "t3", "data": {"id": "x"}}, {"kind": "t3", "data": {"id": "y"}}, 1, 1]
+    new = [{"kind": "t3", "data": {"id": "y"}}, {"kind": "t3", "data": {"id": "x", "ups": 3}}, 1]
+    round_trip(old, new)
+    round_trip([], [1, 2])
+    round_trip({"a": 1}, [1])
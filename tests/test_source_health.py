@@ -0,0 +1,61 @@
+import time
+
+from source_health import CLOSED, HALF_OPEN, OPEN, SourceHealth
+
+
+def test_breaker_opens_half_opens_and_closes(tmp_path):
+    health = SourceHealth(tmp_path / "health.json", failure_threshold=2, cooldown_seconds=60)
+    health.record_failure("ptt", "timeout")
+    assert health.allow("ptt")
+    health.record_failure("ptt", "timeout", duration=12.34)
+    assert health.state("ptt")["state"] == OPEN
+    assert health.expected_duration("ptt") == 12.3
+    
+    now = time.time()
+    assert not health.allow("ptt", now + 30)
+    assert 0 < health.retry_in("ptt", now) <= 60
+    
+    # 冷卻結束放行一次試探，試探失敗立刻重新開啟
+    assert health.allow("ptt", now + 61)
+    assert health.state("ptt")["state"] == HALF_OPEN
+    health.record_failure("ptt", "still down")
+    assert health.state("ptt")["state"] == OPEN
+    assert not health.allow("ptt", time.time() + 30)
+    
+    assert health.allow("ptt", time.time() + 61)
+    health.record_success("ptt", 3.0)
+    state = health.state("ptt")
+    assert state["state"] == CLOSED and state["consecutive_failures"] == 0
+    assert health.retry_in("ptt") == 0.0
+
+
+def test_state_persists(tmp_path):
+    path = tmp_path / "health.json"
+    health = SourceHealth(path, failure_threshold=1)
+    health.record_failure("bbc", "503")
+    health.save()
+    assert not SourceHealth(path).allow("bbc")
+
+
+def test_single_scraper_runs_through_the_breaker():
+    from main import run_single_scraper
+    
+    calls = []
+    
+    def failing_scraper():
+        calls.append(1)
+        return False
+    
+    for _ in range(3):
+        assert not run_single_scraper("ptt", failing_scraper)
+    assert SourceHealth().state("ptt")["state"] == OPEN
+    
+    # 斷路器開啟中時略過，不執行爬蟲也不視為失敗
+    assert run_single_scraper("ptt", failing_scraper)
+    assert len(calls) == 3
+    assert not run_single_scraper("ptt", failing_scraper, use_health=False)
+    assert len(calls) == 4
+    
+    # all 模式的子行程不記錄健康狀態
+    assert not run_single_scraper("bbc", failing_scraper, record_health=False)
+    assert SourceHealth().state("bbc")["consecutive_failures"] == 0
@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+
+from trend_item import parse_ptt_score, parse_relative_time
+
+
+def test_relative_time_is_truncated_to_text_granularity():
+    """同一段相對時間在不同時間點爬取時得到相同的時間"""
+    first = parse_relative_time("2 小時前", datetime(2025, 7, 20, 10, 5, 31, tzinfo=timezone.utc))
+    later = parse_relative_time("2 小時前", datetime(2025, 7, 20, 10, 48, 2, tzinfo=timezone.utc))
+    assert first == later == datetime(2025, 7, 20, 8, 0, tzinfo=timezone.utc)
+
+
+def test_relative_minutes_drop_seconds():
+    now = datetime(2025, 7, 20, 10, 5, 31, 250, tzinfo=timezone.utc)
+    assert parse_relative_time("20 分鐘前", now) == datetime(2025, 7, 20, 9, 45, tzinfo=timezone.utc)
+    assert parse_relative_time("3 days ago", now) == datetime(2025, 7, 17, tzinfo=timezone.utc)
+    assert parse_relative_time("剛剛", now) is None
+
+
+def test_ptt_score_is_signed():
+    assert parse_ptt_score("爆") == 100
+    assert parse_ptt_score("X3") == -30
+    assert parse_ptt_score("XX") == -100
+    assert parse_ptt_score("-5") == -5
+    assert parse_ptt_score("12") == 12
+    assert parse_ptt_score("") == 0